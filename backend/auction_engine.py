@@ -0,0 +1,802 @@
+import asyncio
+import logging
+import secrets
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
+
+logger = logging.getLogger(__name__)
+
+BID_TIMER_SECONDS = 30
+UNSOLD_LOT_SECONDS = 10
+MAX_TEAMS_PER_ROOM = 8
+MAX_PARALLEL_LOTS = 8
+
+# Fields the engine needs from a room document; players_pool is never loaded
+ROOM_STATE_PROJECTION = {
+    "_id": 0,
+    "code": 1,
+    "order_id": 1,
+    "teams": 1,
+    "auction_state": 1,
+    "current_player_index": 1,
+    "current_player_id": 1,
+    "current_bid": 1,
+    "current_bidder": 1,
+    "timer_end": 1,
+    "bid_seq": 1,
+    "broadcast_window_ms": 1,
+    "lots": 1,
+    "next_index": 1,
+    "lots_opened": 1,
+    "parallel_lots": 1,
+    "round": 1,
+    "unsold_round": 1,
+    "unsold_lot_seconds": 1,
+}
+
+# Bid fields are persisted together and guarded by bid_seq so a late write never
+# replaces a newer bid
+BID_FIELDS = ("current_bid", "current_bidder", "timer_end", "bid_seq")
+
+# Resolves the player at a position of the room's auction order, or None past the end
+PlayerLoader = Callable[[str, int], Awaitable[Optional[dict]]]
+
+# Looks up a player document by id, or None when the catalog no longer has it
+PlayerFinder = Callable[[str], Awaitable[Optional[dict]]]
+
+# Stores the order of a room's unsold players for its accelerated round; None when there are none
+UnsoldOrder = Callable[["RoomState"], Awaitable[Optional[str]]]
+
+
+class BidRejected(Exception):
+    """Raised when a bid or join is refused; the message is sent to the client."""
+
+
+async def compare_and_set_bid(
+    rooms, code: str, sid: str, amount: float, timer_end: datetime, player_id: Optional[str] = None,
+) -> Optional[dict]:
+    """Apply a bid with one conditional find_one_and_update.
+
+    The filter only matches while the stored bid is lower than `amount` and the bidding
+    team can afford it, so concurrent bids need no lock and a lower bid can never
+    overwrite a higher one. Every accepted bid bumps `bid_seq`, giving the room a total
+    order of bids. With `player_id`, the bid only lands while that player is on sale.
+    Returns the updated bid fields plus the bidder's `team`, or None when the room or
+    team does not exist; raises BidRejected for invalid bids.
+    """
+    bidder = {"$elemMatch": {"owner_id": sid}}
+    query = {
+        "code": code,
+        "auction_state": "active",
+        "current_bid": {"$lt": amount},
+        "teams": {"$elemMatch": {"owner_id": sid, "budget": {"$gte": amount}}},
+    }
+    if player_id:
+        query["current_player_id"] = player_id
+    before = await rooms.find_one_and_update(
+        query,
+        {
+            "$set": {"current_bid": amount, "current_bidder": sid, "timer_end": timer_end},
+            "$inc": {"bid_seq": 1},
+        },
+        projection={"_id": 0, "bid_seq": 1, "teams": bidder},
+        # The pre-image is enough: everything the update wrote is known here
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before is not None:
+        return {
+            "bid_seq": before.get("bid_seq", 0) + 1,
+            "current_bid": amount,
+            "timer_end": timer_end,
+            "team": before["teams"][0],
+        }
+
+    # Only the rejection path pays for a second read, to explain the failure
+    current = await rooms.find_one(
+        {"code": code}, {"_id": 0, "auction_state": 1, "current_player_id": 1, "current_bid": 1, "teams": bidder}
+    )
+    if current is None:
+        return None
+    if current.get("auction_state") != "active":
+        raise BidRejected("Auction is not active")
+    if player_id and current.get("current_player_id") != player_id:
+        raise BidRejected("Player is not on sale")
+    if amount <= current.get("current_bid", 0):
+        raise BidRejected("Bid must be higher than current bid")
+    if not current.get("teams"):
+        return None
+    raise BidRejected("Insufficient budget")
+
+
+class TeamState:
+    __slots__ = ("id", "name", "owner_id", "budget", "players", "roles", "spent")
+
+    def __init__(
+        self, id: str, name: str, owner_id: str, budget: float, players: List[str],
+        roles: Optional[Dict[str, int]] = None, spent: float = 0.0,
+    ):
+        self.id = id
+        self.name = name
+        self.owner_id = owner_id
+        self.budget = budget
+        self.players = players
+        self.roles = roles or {}  # role -> players bought, kept up to date at every sale
+        self.spent = spent
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "TeamState":
+        return cls(
+            doc["id"], doc["name"], doc["owner_id"], doc.get("budget", 8000.0), list(doc.get("players", [])),
+            dict(doc.get("roles") or {}), doc.get("spent", 0.0),
+        )
+
+    def to_doc(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "owner_id": self.owner_id,
+            "budget": self.budget,
+            # Copies: the doc may be queued (event log, emits) while the team keeps buying
+            "players": list(self.players),
+            "roles": dict(self.roles),
+            "spent": self.spent,
+        }
+
+    def sign(self, player: dict, amount: float):
+        self.budget -= amount
+        self.spent += amount
+        self.players.append(player["id"])
+        role = player.get("role")
+        if role:
+            self.roles[role] = self.roles.get(role, 0) + 1
+
+
+class LotState:
+    """One player on sale; a room in parallel-lots mode has several open at once."""
+
+    __slots__ = ("index", "player_id", "player", "bid", "bidder", "timer_end", "limits")
+
+    def __init__(
+        self, index: int, player_id: str, player: Optional[dict] = None, bid: float = 0.0, bidder: str = "",
+        timer_end: Optional[datetime] = None,
+    ):
+        self.index = index  # position in the room's auction order
+        self.player_id = player_id
+        self.player = player  # cached player document; None for lots reloaded from Mongo
+        self.bid = bid
+        self.bidder = bidder  # sid of the leading bidder
+        self.timer_end = timer_end
+        self.limits: Dict[str, Tuple[float, str]] = {}  # team id -> (max bid, why more fails)
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "LotState":
+        return cls(doc["index"], doc["player_id"], None, doc.get("bid", 0), doc.get("bidder", ""), doc.get("timer_end"))
+
+    def to_doc(self) -> dict:
+        return {
+            "index": self.index, "player_id": self.player_id, "bid": self.bid, "bidder": self.bidder,
+            "timer_end": self.timer_end,
+        }
+
+    def view(self, room: "RoomState") -> dict:
+        bidder = room.team_for(self.bidder) if self.bidder else None
+        return {
+            "index": self.index,
+            "player": self.player,
+            "current_bid": self.bid,
+            "current_bidder_team_id": bidder.id if bidder else "",
+            "timer_end": self.timer_end.isoformat() if self.timer_end else None,
+            "max_affordable_bid": room.max_bids(self),
+        }
+
+
+def _primary_field(name: str, default):
+    # The current_* room fields are those of the oldest open lot, the only one unless
+    # the room runs parallel lots
+    def get(room):
+        lot = room.primary
+        return default if lot is None else getattr(lot, name)
+
+    def set(room, value):
+        lot = room.primary
+        if lot is not None:
+            setattr(lot, name, value)
+
+    return property(get, set)
+
+
+class RoomState:
+    """Authoritative in-process state of one room; mutate only while holding `lock`."""
+
+    __slots__ = (
+        "code", "lock", "teams", "owners", "auction_state", "lots", "position", "next_index", "lots_opened", "bid_seq",
+        "broadcast_window_ms", "dirty", "resume_tokens", "order_id", "parallel_lots", "round", "unsold_round",
+        "unsold_lot_seconds",
+    )
+
+    def __init__(self, code: str):
+        self.code = code
+        self.lock = asyncio.Lock()
+        self.teams: Dict[str, TeamState] = {}
+        self.owners: Dict[str, str] = {}  # sid -> team id
+        self.auction_state = "waiting"
+        self.lots: Dict[str, LotState] = {}  # player id -> open lot, oldest first
+        self.position = 0  # current_player_index while no lot is open
+        self.next_index = 0  # next position of the order to put on sale
+        self.lots_opened = 0  # across rounds, unlike positions, which restart with the unsold round
+        self.bid_seq = 0
+        self.broadcast_window_ms = 0  # > 0 coalesces bid broadcasts within this window
+        self.dirty: set = set()
+        self.resume_tokens: Dict[str, str] = {}  # token -> team id; in memory only
+        self.order_id = ""
+        self.parallel_lots = 1
+        self.round = 0  # 1 once the unsold players are auctioned again
+        self.unsold_round = False
+        self.unsold_lot_seconds = UNSOLD_LOT_SECONDS
+
+    current_player_id = _primary_field("player_id", "")
+    current_player = _primary_field("player", None)
+    current_bid = _primary_field("bid", 0)
+    current_bidder = _primary_field("bidder", "")
+    timer_end = _primary_field("timer_end", None)
+    bid_limits = _primary_field("limits", {})
+
+    @property
+    def current_player_index(self) -> int:
+        lot = self.primary
+        return self.position if lot is None else lot.index
+
+    @property
+    def primary(self) -> Optional[LotState]:
+        return next(iter(self.lots.values()), None)
+
+    @property
+    def lot_seconds(self) -> float:
+        return self.unsold_lot_seconds if self.round else BID_TIMER_SECONDS
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "RoomState":
+        room = cls(doc["code"])
+        for team_doc in doc.get("teams", []):
+            team = TeamState.from_doc(team_doc)
+            room.teams[team.id] = team
+            room.owners[team.owner_id] = team.id
+        room.auction_state = doc.get("auction_state", "waiting")
+        room.position = doc.get("current_player_index", 0)
+        room.bid_seq = doc.get("bid_seq", 0)
+        room.broadcast_window_ms = doc.get("broadcast_window_ms", 0)
+        room.order_id = doc.get("order_id", "")
+        room.parallel_lots = doc.get("parallel_lots", 1)
+        room.round = doc.get("round", 0)
+        room.unsold_round = doc.get("unsold_round", False)
+        room.unsold_lot_seconds = doc.get("unsold_lot_seconds", UNSOLD_LOT_SECONDS)
+        if room.auction_state == "active":
+            # Single-lot rooms only keep their current_* fields up to date
+            if doc.get("lots") and room.parallel_lots > 1:
+                room.lots = {lot["player_id"]: LotState.from_doc(lot) for lot in doc["lots"]}
+            elif doc.get("current_player_id"):
+                room.lots[doc["current_player_id"]] = LotState(
+                    room.position, doc["current_player_id"], None, doc.get("current_bid", 0),
+                    doc.get("current_bidder", ""), doc.get("timer_end"),
+                )
+            room.next_index = doc.get("next_index", max((lot.index for lot in room.lots.values()), default=room.position - 1) + 1)
+        else:
+            room.next_index = doc.get("next_index", room.position)
+        room.lots_opened = doc.get("lots_opened", room.next_index)
+        return room
+
+    def team_for(self, sid: str) -> Optional[TeamState]:
+        team_id = self.owners.get(sid)
+        return self.teams.get(team_id) if team_id else None
+
+    def lot(self, player_id: Optional[str] = None) -> Optional[LotState]:
+        """The open lot of `player_id`, or the oldest open lot when no player is named."""
+        return self.lots.get(player_id) if player_id else self.primary
+
+    def held_by(self, team: TeamState, excluding: Optional[LotState] = None) -> List[LotState]:
+        """Other open lots `team` is winning."""
+        return [
+            lot for lot in self.lots.values()
+            if lot is not excluding and lot.bidder and self.owners.get(lot.bidder) == team.id
+        ]
+
+    def lot_view(self) -> dict:
+        """Client-facing state of the lot currently on sale (every open lot in parallel mode)."""
+        bidder = self.team_for(self.current_bidder) if self.current_bidder else None
+        view = {
+            "auction_state": self.auction_state,
+            "current_player_index": self.current_player_index,
+            "current_player_id": self.current_player_id,
+            "current_player": self.current_player,
+            "current_bid": self.current_bid,
+            "current_bidder_team_id": bidder.id if bidder else "",
+            "timer_end": self.timer_end.isoformat() if self.timer_end else None,
+            "bid_seq": self.bid_seq,
+            "max_affordable_bid": self.max_bids(self.primary),
+        }
+        if self.unsold_round:
+            view["round"] = self.round
+        if self.parallel_lots > 1:
+            view["lots"] = {player_id: lot.view(self) for player_id, lot in self.lots.items()}
+        return view
+
+    def max_bid(self, team: TeamState, lot: Optional[LotState] = None) -> Tuple[float, str]:
+        """Most `team` may bid on `lot`, less what it owes for the other lots it is winning."""
+        lot = lot or self.primary
+        if lot is None:
+            return team.budget, "Insufficient budget"
+        limit, reason = lot.limits.get(team.id, (team.budget, "Insufficient budget"))
+        committed = sum(other.bid for other in self.held_by(team, lot))
+        if not committed:
+            return limit, reason
+        if reason == "Insufficient budget":
+            reason = "Insufficient budget for the lots you are winning"
+        return max(0.0, limit - committed), reason
+
+    def max_bids(self, lot: Optional[LotState]) -> Dict[str, float]:
+        """`max_bid` of every team with a limit on `lot`, as pushed to clients."""
+        if lot is None:
+            return {}
+        return {team_id: self.max_bid(self.teams[team_id], lot)[0] for team_id in lot.limits if team_id in self.teams}
+
+    def snapshot(self) -> dict:
+        """Full client-facing view of the room; never includes the player pool."""
+        return {
+            "code": self.code,
+            "teams": {team.id: team.to_doc() for team in self.teams.values()},
+            **self.lot_view(),
+        }
+
+    def update_operations(self, fields) -> list:
+        operations = []
+        bid_fields = fields.intersection(BID_FIELDS)
+        if bid_fields:
+            # $not/$gte also matches rooms created before bid_seq existed
+            operations.append(UpdateOne(
+                {"code": self.code, "bid_seq": {"$not": {"$gte": self.bid_seq}}},
+                {"$set": self.field_values(BID_FIELDS)},
+            ))
+        other_fields = fields.difference(BID_FIELDS)
+        if other_fields:
+            operations.append(UpdateOne({"code": self.code}, {"$set": self.field_values(other_fields)}))
+        return operations
+
+    def field_values(self, fields) -> dict:
+        values = {}
+        for field in fields:
+            if field == "teams":
+                values["teams"] = [team.to_doc() for team in self.teams.values()]
+            elif field == "lots":
+                values["lots"] = [lot.to_doc() for lot in self.lots.values()]
+            else:
+                values[field] = getattr(self, field)
+        return values
+
+
+class AuctionEngine:
+    """Keeps live rooms in memory and persists changes to Mongo with write-behind batching.
+
+    Bids are validated and applied under a per-room asyncio lock without touching the
+    database; the dirty fields of every touched room are flushed by a single background
+    task every `flush_interval` seconds using one unordered bulk write.
+
+    With `bid_mode="atomic"` Mongo stays the source of truth for bids instead: each bid
+    is a single compare-and-set round-trip and the in-memory room only mirrors the
+    result, which is safe when several processes accept bids for the same room.
+
+    With `rules` (a SquadRules), each lot opens with every team's maximum bid worked
+    out from its squad and budget, and bids above it are refused.
+
+    A room with `parallel_lots` > 1 keeps that many lots open at once, each with its
+    own timer (keyed `(code, player_id)` like every lot timer); a closed lot is
+    replaced by the next player of the order. A team's bid also has to fit next to
+    the lots it is already winning. Parallel lots need the memory bid mode. Rooms with
+    `unsold_round` auction their unsold players once more, with `unsold_lot_seconds`
+    timers, in an order stored by `unsold_order`.
+
+    Open lots are stored by player id only; `find_player` looks their players up
+    again when a room is reloaded (from `players` by default).
+    """
+
+    def __init__(
+        self, db, flush_interval: float = 0.05, bid_mode: str = "memory", timers=None, rules=None,
+        unsold_order: Optional[UnsoldOrder] = None, find_player: Optional[PlayerFinder] = None,
+    ):
+        if bid_mode not in ("memory", "atomic"):
+            raise ValueError(f"Unknown bid mode: {bid_mode}")
+        self.db = db
+        self.timers = timers
+        self.rules = rules
+        self.unsold_order = unsold_order
+        self.find_player = find_player or self._stored_player
+        self.flush_interval = flush_interval
+        self.bid_mode = bid_mode
+        self.rooms: Dict[str, RoomState] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._dirty_rooms: set = set()
+        self._wakeup = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+    async def get_room(self, code: str) -> Optional[RoomState]:
+        room = self.rooms.get(code)
+        if room is not None:
+            return room
+        # Concurrent first lookups of the same room share a single Mongo read
+        pending = self._loading.get(code)
+        if pending is not None:
+            return await pending
+        future = asyncio.get_running_loop().create_future()
+        self._loading[code] = future
+        try:
+            doc = await self.db.rooms.find_one({"code": code}, ROOM_STATE_PROJECTION)
+            room = RoomState.from_doc(doc) if doc else None
+            if room is not None:
+                if self.bid_mode == "atomic":
+                    # Compare-and-set covers the single lot kept in the current_* fields
+                    room.parallel_lots = 1
+                # Limits, signings and bots all need the player on sale, not just its id
+                for lot in room.lots.values():
+                    lot.player = await self.find_player(lot.player_id)
+                if self.rules is not None:
+                    self.rules.tally(room)
+                    await self._apply_rules(room)
+                self.rooms[code] = room
+            future.set_result(room)
+            return room
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            del self._loading[code]
+
+    async def _stored_player(self, player_id: str) -> Optional[dict]:
+        return await self.db.players.find_one({"id": player_id}, {"_id": 0})
+
+    def mark_dirty(self, room: RoomState, *fields: str):
+        room.dirty.update(fields)
+        self._dirty_rooms.add(room.code)
+        self._wakeup.set()
+
+    async def add_team(self, code: str, team_doc: dict) -> tuple:
+        room = await self.get_room(code)
+        if room is None:
+            raise BidRejected("Room not found")
+        async with room.lock:
+            if len(room.teams) >= MAX_TEAMS_PER_ROOM:
+                raise BidRejected("Room is full")
+            team = TeamState.from_doc(team_doc)
+            room.teams[team.id] = team
+            room.owners[team.owner_id] = team.id
+            self.mark_dirty(room, "teams")
+            await self._apply_rules(room)
+            total_teams = len(room.teams)
+        if self.bid_mode == "atomic":
+            # Atomic bids validate against the stored teams, so joins are written through
+            await self.flush()
+        return team, total_teams
+
+    def issue_resume_token(self, room: RoomState, team_id: str) -> str:
+        token = secrets.token_urlsafe(16)
+        room.resume_tokens[token] = team_id
+        return token
+
+    async def rebind_team(self, code: str, token: str, sid: str) -> Optional[tuple]:
+        """Hand the team behind a resume token to a reconnected client.
+
+        Returns (team, new token), or None when the token is unknown or spent.
+        """
+        room = await self.get_room(code)
+        if room is None:
+            return None
+        async with room.lock:
+            team = room.teams.get(room.resume_tokens.pop(token, ""))
+            if team is None:
+                return None
+            previous = [old for old, team_id in room.owners.items() if team_id == team.id]
+            for old in previous:
+                del room.owners[old]
+            room.owners[sid] = team.id
+            team.owner_id = sid
+            if room.current_bidder in previous:
+                # Keep the standing bid attributable to the team; bid fields are seq-guarded
+                # in the write-behind, so fix the stored bidder directly
+                await self.db.rooms.update_one(
+                    {"code": code, "current_bidder": room.current_bidder}, {"$set": {"current_bidder": sid}}
+                )
+            for lot in room.lots.values():
+                if lot.bidder in previous:
+                    lot.bidder = sid
+            self.mark_dirty(room, "teams", *self._lot_fields(room))
+            new_token = self.issue_resume_token(room, team.id)
+        if self.bid_mode == "atomic":
+            await self.flush()
+        return team, new_token
+
+    async def release_sid(self, code: str, sid: str) -> bool:
+        """Forget a client whose resume window passed.
+
+        Its resume tokens stop working. A room left with no clients and no auction
+        running is evicted; returns True when that happened.
+        """
+        room = self.rooms.get(code)
+        if room is None:
+            return False
+        team = room.team_for(sid)
+        if team is not None and team.owner_id == sid:
+            room.resume_tokens = {t: team_id for t, team_id in room.resume_tokens.items() if team_id != team.id}
+        if not any(lot.bidder == sid for lot in room.lots.values()):
+            room.owners.pop(sid, None)
+        if not room.owners and room.auction_state != "active":
+            await self.evict(code)
+            return True
+        return False
+
+    async def place_bid(self, code: str, sid: str, amount: float, player_id: Optional[str] = None) -> Optional[tuple]:
+        """Bid on the lot of `player_id` (the oldest open lot when None).
+
+        Returns (team, timer_end, lot), or None when `sid` plays for no team here.
+        """
+        room = await self.get_room(code)
+        if room is None:
+            return None
+        if self.bid_mode == "atomic":
+            return await self._place_bid_atomic(room, sid, amount, player_id)
+        async with room.lock:
+            if room.auction_state != "active":
+                raise BidRejected("Auction is not active")
+            lot = room.lot(player_id)
+            if lot is None:
+                raise BidRejected("Player is not on sale")
+            if amount <= lot.bid:
+                raise BidRejected("Bid must be higher than current bid")
+            team = room.team_for(sid)
+            if team is None:
+                return None
+            limit, reason = self._max_bid(room, team, lot)
+            if amount > limit:
+                raise BidRejected(reason)
+            lot.bid = amount
+            lot.bidder = sid
+            lot.timer_end = datetime.utcnow() + timedelta(seconds=room.lot_seconds)
+            room.bid_seq += 1
+            if lot is room.primary:
+                self.mark_dirty(room, *BID_FIELDS, *self._lot_fields(room))
+            else:
+                self.mark_dirty(room, "lots")
+            self._schedule(room, lot)
+            return team, lot.timer_end, lot
+
+    async def _place_bid_atomic(self, room: RoomState, sid: str, amount: float, player_id: Optional[str]) -> Optional[tuple]:
+        team = room.team_for(sid)
+        if team is not None:
+            # Squad rules are checked against this process's view; budget again in the write
+            limit, reason = room.max_bid(team, room.lot(player_id))
+            if amount > limit:
+                raise BidRejected(reason)
+        timer_end = datetime.utcnow() + timedelta(seconds=room.lot_seconds)
+        updated = await compare_and_set_bid(self.db.rooms, room.code, sid, amount, timer_end, player_id)
+        if updated is None:
+            return None
+        # Results can come back out of order; only mirror the newest one
+        lot = room.lot(player_id) or room.primary
+        if updated["bid_seq"] > room.bid_seq and lot is not None:
+            room.bid_seq = updated["bid_seq"]
+            lot.bid = amount
+            lot.bidder = sid
+            lot.timer_end = timer_end
+            self._schedule(room, lot)
+        team = room.teams.get(updated["team"]["id"]) or TeamState.from_doc(updated["team"])
+        return team, timer_end, lot
+
+    def _max_bid(self, room: RoomState, team: TeamState, lot: LotState) -> Tuple[float, str]:
+        held = room.held_by(team, lot)
+        # Lots the team is winning take squad slots too; their price is left out by max_bid
+        if held and self.rules is not None and len(team.players) + len(held) >= self.rules.max_size:
+            return 0.0, "Squad is full with the lots you are winning"
+        return room.max_bid(team, lot)
+
+    async def _apply_rules(self, room: RoomState):
+        if self.rules is not None:
+            for lot in room.lots.values():
+                lot.limits = await self.rules.bid_limits(room, lot)
+
+    @staticmethod
+    def _lot_fields(room: RoomState) -> tuple:
+        return ("lots",) if room.parallel_lots > 1 else ()
+
+    def _schedule(self, room: RoomState, lot: LotState):
+        if self.timers is not None and lot.timer_end is not None:
+            self.timers.schedule((room.code, lot.player_id), lot.timer_end)
+
+    def _open_lot(self, room: RoomState, index: int, player: dict) -> LotState:
+        lot = LotState(
+            index, player["id"], player, player["base_price"], "",
+            datetime.utcnow() + timedelta(seconds=room.lot_seconds),
+        )
+        room.lots[lot.player_id] = lot
+        room.next_index = index + 1
+        room.lots_opened += 1
+        room.bid_seq += 1
+        self._schedule(room, lot)
+        return lot
+
+    async def _fill(self, room: RoomState, load_player: PlayerLoader) -> List[LotState]:
+        """Open lots up to the room's parallel limit; complete the auction when none is left.
+
+        Runs the unsold round first, when the room has one, once the last lot of the
+        main round has closed.
+        """
+        opened = []
+        while len(room.lots) < max(1, room.parallel_lots):
+            player = await load_player(room.code, room.next_index)
+            if player is not None:
+                opened.append(self._open_lot(room, room.next_index, player))
+                continue
+            if room.lots:
+                # Later lots of this round are still open; the round ends with them
+                break
+            if room.unsold_round and not room.round and self.unsold_order is not None:
+                order_id = await self.unsold_order(room)
+                if order_id:
+                    room.order_id = order_id
+                    room.round = 1
+                    room.next_index = 0
+                    continue
+            room.auction_state = "completed"
+            room.position = room.next_index
+            room.bid_seq += 1
+            break
+        return opened
+
+    async def _persist_lot(self, room: RoomState, sold_player_id: Optional[str] = None):
+        # Lot changes are written through so a restart resumes from the right player
+        fields = {
+            "auction_state", "current_player_index", "current_player_id", "teams", "next_index", "lots_opened", "round",
+            "order_id",
+            *BID_FIELDS, *self._lot_fields(room),
+        }
+        room.dirty -= fields
+        update = {"$set": room.field_values(fields)}
+        if sold_player_id:
+            update["$push"] = {"sold_players": sold_player_id}
+        await self.db.rooms.update_one({"code": room.code}, update)
+
+    async def start_auction(self, code: str, load_player: PlayerLoader, order_id: Optional[str] = None) -> Optional[RoomState]:
+        """Open the first lots, of `order_id` when given (an order computed for this start)."""
+        room = await self.get_room(code)
+        if room is None:
+            return None
+        async with room.lock:
+            if room.auction_state != "waiting":
+                raise BidRejected("Auction already started")
+            if order_id:
+                room.order_id = order_id
+            room.auction_state = "active"
+            room.round = 0
+            room.next_index = room.lots_opened = 0
+            await self._fill(room, load_player)
+            await self._apply_rules(room)
+            await self._persist_lot(room)
+        return room
+
+    async def close_lot(self, code: str, player_id: str, deadline: datetime, load_player: PlayerLoader) -> Optional[dict]:
+        """Sell or pass the lot of `player_id` and open the next one in one step.
+
+        `load_player` is awaited under the room lock for the next position. Returns
+        None when the timer is stale (a newer bid extended it, or the lot or room is
+        no longer open); otherwise a summary of the closed lot with the lots opened
+        in its place.
+        """
+        room = await self.get_room(code)
+        if room is None:
+            return None
+        async with room.lock:
+            if room.auction_state != "active":
+                return None
+            if self.bid_mode == "atomic":
+                # Other processes may have accepted bids since this mirror was updated
+                current = await self.db.rooms.find_one({"code": code}, {"_id": 0, **{f: 1 for f in BID_FIELDS}})
+                if current and current.get("bid_seq", 0) > room.bid_seq:
+                    for field in BID_FIELDS:
+                        setattr(room, field, current.get(field))
+            lot = room.lots.get(player_id)
+            if lot is None:
+                return None
+            if lot.timer_end is None or lot.timer_end > deadline:
+                self._schedule(room, lot)
+                return None
+
+            player = lot.player or {"id": player_id}
+            team = room.team_for(lot.bidder) if lot.bidder else None
+            if team is not None:
+                team.sign(player, lot.bid)
+            was_primary = lot is room.primary
+            round_before = room.round
+            del room.lots[player_id]
+            opened = await self._fill(room, load_player)
+            await self._apply_rules(room)
+            await self._persist_lot(room, player_id if team is not None else None)
+            return {
+                "player_id": player_id, "player": player, "team": team, "amount": lot.bid,
+                "opened": opened, "was_primary": was_primary, "new_round": room.round != round_before,
+            }
+
+    async def restore_timers(self, owns: Callable[[str], bool] = lambda code: True):
+        """Re-arm lot timers for every active room this process owns, e.g. after a restart."""
+        if self.timers is None:
+            return
+        now = datetime.utcnow()
+        projection = {"_id": 0, "code": 1, "timer_end": 1, "current_player_id": 1, "lots": 1}
+        async for doc in self.db.rooms.find({"auction_state": "active"}, projection):
+            code = doc["code"]
+            # Loaded rooms already have timers from their live state
+            if code not in self.rooms and owns(code):
+                lots = doc.get("lots") or [{"player_id": doc.get("current_player_id", ""), "timer_end": doc.get("timer_end")}]
+                for lot in lots:
+                    self.timers.schedule((code, lot["player_id"]), lot.get("timer_end") or now)
+
+    def pending_writes(self) -> int:
+        """Rooms with changes waiting for the next write-behind flush."""
+        return len(self._dirty_rooms)
+
+    async def evict(self, code: str):
+        """Write out and forget a room, e.g. when another process takes it over."""
+        room = self.rooms.get(code)
+        if room is None:
+            return
+        async with room.lock:
+            if room.dirty:
+                fields, room.dirty = room.dirty, set()
+                await self.db.rooms.bulk_write(room.update_operations(fields), ordered=False)
+            self.rooms.pop(code, None)
+            if self.timers is not None:
+                for lot in room.lots.values():
+                    self.timers.cancel((code, lot.player_id))
+
+    async def flush(self):
+        if not self._dirty_rooms:
+            return
+        codes, self._dirty_rooms = self._dirty_rooms, set()
+        operations = []
+        for code in codes:
+            room = self.rooms.get(code)
+            if room is None or not room.dirty:
+                continue
+            fields, room.dirty = room.dirty, set()
+            operations.append((room, fields, room.update_operations(fields)))
+        if not operations:
+            return
+        try:
+            await self.db.rooms.bulk_write([op for _, _, ops in operations for op in ops], ordered=False)
+        except Exception:
+            # Re-queue everything; fields written in the meantime are simply rewritten
+            for room, fields, _ in operations:
+                self.mark_dirty(room, *fields)
+            raise
+
+    async def _flush_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Let the batch window fill before writing so bursts collapse into one bulk write
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Write-behind flush failed")
@@ -0,0 +1,68 @@
+"""Player ordering strategies for an auction, applied once when it starts.
+
+A strategy turns the catalog into a list of player ids; the list is stored once in
+`auction_orders` (see AuctionOrders) and rooms only keep its id. Every strategy is
+deterministic for a given catalog (and seed), so rooms using the same settings share
+one order document whatever order Mongo returns players in.
+
+    set       marquee players (top rating) first, then role by role, dearest first
+    rating    best rated first, then by base price
+    shuffle   seeded random order; the seed is kept on the room, so it can be replayed
+    catalog   the catalog as imported
+"""
+import random
+from typing import Callable, Dict, List, Optional, Sequence
+
+SET = "set"
+RATING = "rating"
+SHUFFLE = "shuffle"
+CATALOG = "catalog"
+STRATEGIES = (SET, RATING, SHUFFLE, CATALOG)
+
+MARQUEE_RATING = 5
+ROLE_SETS = ("batsman", "wicket-keeper", "all-rounder", "bowler")
+
+
+def _by_price(player: dict) -> tuple:
+    return -player.get("base_price", 0), player.get("name", ""), player["id"]
+
+
+def _set_order(players: Sequence[dict], seed: Optional[int]) -> List[dict]:
+    marquee = sorted((p for p in players if p.get("rating", 0) >= MARQUEE_RATING), key=_by_price)
+    rest = [p for p in players if p.get("rating", 0) < MARQUEE_RATING]
+    rank = {role: number for number, role in enumerate(ROLE_SETS)}
+    return marquee + sorted(rest, key=lambda p: (rank.get(p.get("role"), len(rank)), *_by_price(p)))
+
+
+def _rating_order(players: Sequence[dict], seed: Optional[int]) -> List[dict]:
+    return sorted(players, key=lambda p: (-p.get("rating", 0), *_by_price(p)))
+
+
+def _shuffle_order(players: Sequence[dict], seed: Optional[int]) -> List[dict]:
+    ordered = sorted(players, key=lambda p: p["id"])
+    random.Random(seed).shuffle(ordered)
+    return ordered
+
+
+def _catalog_order(players: Sequence[dict], seed: Optional[int]) -> List[dict]:
+    return list(players)
+
+
+ORDERINGS: Dict[str, Callable[[Sequence[dict], Optional[int]], List[dict]]] = {
+    SET: _set_order,
+    RATING: _rating_order,
+    SHUFFLE: _shuffle_order,
+    CATALOG: _catalog_order,
+}
+
+
+def order_player_ids(players: Sequence[dict], strategy: str, seed: Optional[int] = None) -> List[str]:
+    ordering = ORDERINGS.get(strategy)
+    if ordering is None:
+        raise ValueError(f"Unknown ordering: {strategy}")
+    return [player["id"] for player in ordering(players, seed)]
+
+
+def unsold_player_ids(order: Sequence[str], sold: set) -> List[str]:
+    """Players of `order` nobody bought, in order, for the accelerated unsold round."""
+    return [player_id for player_id in order if player_id not in sold]
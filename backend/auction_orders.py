@@ -0,0 +1,82 @@
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Hashable, Optional, Sequence, Tuple
+
+
+def order_id_for(player_ids: Sequence[str]) -> str:
+    digest = hashlib.blake2b(digest_size=12)
+    for player_id in player_ids:
+        digest.update(player_id.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class AuctionOrders:
+    """Shared, immutable player orders that rooms reference by id.
+
+    A room stores only `order_id` and walks it with `current_player_index`, so room
+    documents stay the same size however large the catalog is. Orders are keyed by a
+    hash of their contents: every room auctioning the same list shares one document,
+    and a changed catalog produces a new order instead of mutating one in use.
+    Only the `max_cached` most recently used orders are kept in memory; the rest are
+    read back from Mongo when a room needs them again.
+    """
+
+    def __init__(self, db, max_cached: int = 256):
+        self.db = db
+        self.max_cached = max_cached
+        self._orders: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()  # least recently used first
+        self._by_key: "OrderedDict[Hashable, str]" = OrderedDict()
+
+    def _remember(self, cache: OrderedDict, key: Hashable, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_cached:
+            cache.popitem(last=False)
+
+    async def ensure(self, player_ids: Sequence[str], key: Optional[Hashable] = None) -> Tuple[str, int]:
+        """Store the order (once) and return its (id, length).
+
+        `key` identifies the source list (e.g. the catalog ETag) so repeated calls for
+        the same list skip hashing it.
+        """
+        order_id = self._by_key.get(key) if key is not None else None
+        if order_id in self._orders:
+            self._by_key.move_to_end(key)
+            self._orders.move_to_end(order_id)
+            return order_id, len(self._orders[order_id])
+        order_id = order_id_for(player_ids)
+        if order_id not in self._orders:
+            await self.db.auction_orders.update_one(
+                {"_id": order_id},
+                {"$setOnInsert": {"player_ids": list(player_ids), "count": len(player_ids), "created_at": datetime.utcnow()}},
+                upsert=True,
+            )
+        self._remember(self._orders, order_id, tuple(player_ids))
+        if key is not None:
+            self._remember(self._by_key, key, order_id)
+        return order_id, len(player_ids)
+
+    async def get(self, order_id: str) -> Optional[Tuple[str, ...]]:
+        order = self._orders.get(order_id)
+        if order is None:
+            doc = await self.db.auction_orders.find_one({"_id": order_id}, {"player_ids": 1})
+            if doc is None:
+                return None
+            order = tuple(doc["player_ids"])
+        self._remember(self._orders, order_id, order)
+        return order
+
+    def discard(self, order_id: str):
+        """Drop the cached copy of an order no live room walks any more."""
+        self._orders.pop(order_id, None)
+        for key in [key for key, cached in self._by_key.items() if cached == order_id]:
+            del self._by_key[key]
+
+    async def player_at(self, order_id: str, index: int) -> Optional[str]:
+        order = await self.get(order_id)
+        if order is None or not 0 <= index < len(order):
+            return None
+        return order[index]
+
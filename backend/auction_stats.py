@@ -0,0 +1,355 @@
+"""Auction analytics kept as running totals, with ledger aggregations for older rooms.
+
+Each closed lot adds to two documents in `auction_stats`: one for its room and one
+"global" document. The additions are collected in memory and written together with
+$inc every `flush_interval` seconds, so a busy server does not write the global
+document once per lot. Rooms that closed lots before these totals existed are
+summarised on demand. An aggregation pipeline over their lot_closed events in the
+ledger does it; the global totals are backfilled once the same way. Summaries are
+cached for `cache_seconds`, longer once an auction is archived and can no longer
+change, so polling dashboards read memory instead of recomputing.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from event_log import PARTITION_PREFIX, partition_name
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_ID = "global"
+TOP_BUYS = 10
+
+
+def room_stats_id(code: str) -> str:
+    return f"room:{code}"
+
+
+def _key(value) -> str:
+    # Values become field names in $inc paths
+    return str(value if value not in (None, "") else "unknown").replace(".", "_").lstrip("$") or "unknown"
+
+
+def empty_totals() -> dict:
+    return {"lots": 0, "sold": 0, "unsold": 0, "spend": 0.0, "auctions": 0,
+            "roles": {}, "countries": {}, "ratings": {}, "top_buys": []}
+
+
+def lot_increments(player: dict, amount: float, sold: bool) -> Dict[str, float]:
+    if not sold:
+        return {"lots": 1, "unsold": 1}
+    base = player.get("base_price") or 0.0
+    increments = {"lots": 1, "sold": 1, "spend": amount,
+                  f"roles.{_key(player.get('role'))}.count": 1, f"roles.{_key(player.get('role'))}.spend": amount}
+    for group, value in (("countries", player.get("country")), ("ratings", player.get("rating"))):
+        prefix = f"{group}.{_key(value)}"
+        increments[f"{prefix}.count"] = 1
+        increments[f"{prefix}.price"] = amount
+        increments[f"{prefix}.base"] = base
+    return increments
+
+
+def add_increments(totals: dict, increments: Dict[str, float]):
+    for path, value in increments.items():
+        *parents, leaf = path.split(".")
+        target = totals
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = target.get(leaf, 0) + value
+
+
+def flatten(totals: dict, prefix: str = "") -> Dict[str, float]:
+    """$inc paths of every counter in `totals` (top buys excluded)."""
+    paths = {}
+    for key, value in totals.items():
+        if key == "top_buys":
+            continue
+        if isinstance(value, dict):
+            paths.update(flatten(value, f"{prefix}{key}."))
+        elif value:
+            paths[f"{prefix}{key}"] = value
+    return paths
+
+
+def summarize(totals: dict) -> dict:
+    """Client-facing view of a totals document: averages and premiums over base price."""
+    def premiums(groups: dict) -> dict:
+        return {
+            name: {
+                "count": g.get("count", 0),
+                "avg_price": g["price"] / g["count"] if g.get("count") else 0.0,
+                "avg_base_price": g["base"] / g["count"] if g.get("count") else 0.0,
+                "premium": g["price"] / g["base"] - 1 if g.get("base") else None,
+            }
+            for name, g in sorted(groups.items())
+        }
+
+    return {
+        "lots": totals.get("lots", 0),
+        "sold": totals.get("sold", 0),
+        "unsold": totals.get("unsold", 0),
+        "total_spend": totals.get("spend", 0.0),
+        "roles": {
+            role: {"count": g.get("count", 0), "spend": g.get("spend", 0.0),
+                   "avg_price": g.get("spend", 0.0) / g["count"] if g.get("count") else 0.0}
+            for role, g in sorted(totals.get("roles", {}).items())
+        },
+        "premium_by_country": premiums(totals.get("countries", {})),
+        "premium_by_rating": premiums(totals.get("ratings", {})),
+        "top_buys": sorted(totals.get("top_buys", []), key=lambda buy: -buy["amount"])[:TOP_BUYS],
+    }
+
+
+LEDGER_FACETS = {
+    "totals": [{"$group": {
+        "_id": None, "lots": {"$sum": 1}, "sold": {"$sum": {"$cond": ["$sold", 1, 0]}},
+        "spend": {"$sum": {"$cond": ["$sold", "$amount", 0]}},
+    }}],
+    "roles": [{"$match": {"sold": True}}, {"$group": {"_id": "$role", "count": {"$sum": 1}, "spend": {"$sum": "$amount"}}}],
+    "countries": [{"$match": {"sold": True}}, {"$group": {
+        "_id": "$country", "count": {"$sum": 1}, "price": {"$sum": "$amount"}, "base": {"$sum": "$base_price"},
+    }}],
+    "ratings": [{"$match": {"sold": True}}, {"$group": {
+        "_id": "$rating", "count": {"$sum": 1}, "price": {"$sum": "$amount"}, "base": {"$sum": "$base_price"},
+    }}],
+    "top_buys": [{"$match": {"sold": True}}, {"$sort": {"amount": -1}}, {"$limit": TOP_BUYS}, {"$project": {
+        "_id": 0, "room": 1, "player_id": 1, "name": 1, "role": 1, "country": 1,
+        "team_id": 1, "amount": 1, "base_price": 1,
+    }}],
+}
+
+
+def ledger_pipeline(match: dict) -> list:
+    return [
+        {"$match": {**match, "type": "lot_closed"}},
+        {"$lookup": {"from": "players", "localField": "data.player_id", "foreignField": "id", "as": "player"}},
+        {"$unwind": {"path": "$player", "preserveNullAndEmptyArrays": True}},
+        {"$project": {
+            "room": 1, "player_id": "$data.player_id", "team_id": "$data.team_id", "amount": "$data.amount",
+            "sold": {"$ne": ["$data.team_id", ""]}, "name": "$player.name", "role": "$player.role",
+            "country": "$player.country", "rating": "$player.rating", "base_price": "$player.base_price",
+        }},
+        {"$facet": LEDGER_FACETS},
+    ]
+
+
+def _facet_totals(facets: dict) -> dict:
+    totals = empty_totals()
+    for row in facets.get("totals", []):
+        totals.update(lots=row["lots"], sold=row["sold"], unsold=row["lots"] - row["sold"], spend=row["spend"])
+    for group in ("roles", "countries", "ratings"):
+        for row in facets.get(group, []):
+            totals[group][_key(row["_id"])] = {k: v for k, v in row.items() if k != "_id"}
+    totals["top_buys"] = facets.get("top_buys", [])
+    return totals
+
+
+def merge_totals(into: dict, other: dict):
+    add_increments(into, flatten(other))
+    into["top_buys"] = sorted([*into.get("top_buys", []), *other.get("top_buys", [])], key=lambda b: -b["amount"])[:TOP_BUYS]
+
+
+class TTLCache:
+    """Results by key for a while; concurrent misses for one key share one computation."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._values: Dict[str, tuple] = {}  # key -> (expires at, value)
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    async def get(self, key: str, compute: Callable[[], Awaitable[tuple]]):
+        """`compute` returns (value, seconds to keep it)."""
+        cached = self._values.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await pending
+        future = self._pending[key] = asyncio.get_running_loop().create_future()
+        try:
+            value, ttl = await compute()
+            if len(self._values) >= self.max_entries:
+                now = time.monotonic()
+                self._values = {k: v for k, v in self._values.items() if v[0] > now}
+            self._values[key] = (time.monotonic() + ttl, value)
+            future.set_result(value)
+            return value
+        except Exception as exc:
+            future.set_exception(exc)
+            # Nobody else may be waiting; don't leave the exception unretrieved
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
+
+    def discard(self, key: str):
+        self._values.pop(key, None)
+
+
+class AuctionStats:
+    """Running totals in `auction_stats`, recorded per closed lot and written in batches."""
+
+    def __init__(self, db, flush_interval: float = 1.0, cache_seconds: float = 5.0):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.cache_seconds = cache_seconds
+        self.cache = TTLCache()
+        self._pending: Dict[str, dict] = {}  # stats doc id -> {"inc": {...}, "top_buys": [...], "since": datetime}
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._since: Optional[datetime] = None  # when this deployment's running totals began
+
+    def __len__(self):
+        return len(self._pending)
+
+    @property
+    def collection(self):
+        return self.db.auction_stats
+
+    def record_lot(self, room_code: str, player: dict, team, amount: float):
+        sold = team is not None
+        increments = lot_increments(player, amount, sold)
+        buy = None
+        if sold:
+            buy = {
+                "room": room_code, "player_id": player.get("id"), "name": player.get("name"),
+                "role": player.get("role"), "country": player.get("country"),
+                "team_id": team.id, "team_name": team.name, "amount": amount, "base_price": player.get("base_price"),
+            }
+        for doc_id in (room_stats_id(room_code), GLOBAL_ID):
+            self._add(doc_id, increments, buy)
+
+    def record_completion(self):
+        self._add(GLOBAL_ID, {"auctions": 1}, None)
+
+    def _add(self, doc_id: str, increments: Dict[str, float], buy: Optional[dict]):
+        pending = self._pending.setdefault(doc_id, {"inc": {}, "top_buys": [], "since": datetime.utcnow()})
+        for path, value in increments.items():
+            pending["inc"][path] = pending["inc"].get(path, 0) + value
+        if buy is not None:
+            pending["top_buys"].append(buy)
+        self._wakeup.set()
+
+    def start(self):
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_loop())
+
+    async def stop(self):
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        operations = []
+        for doc_id, change in pending.items():
+            update = {"$inc": change["inc"], "$setOnInsert": {"since": change["since"]}}
+            if change["top_buys"]:
+                update["$push"] = {"top_buys": {"$each": change["top_buys"], "$sort": {"amount": -1}, "$slice": TOP_BUYS}}
+            operations.append(UpdateOne({"_id": doc_id}, update, upsert=True))
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except Exception:
+            # Put the changes back in front of anything recorded meanwhile
+            for doc_id, change in pending.items():
+                self._pending.setdefault(doc_id, {"inc": {}, "top_buys": [], "since": change["since"]})
+                self._add(doc_id, change["inc"], None)
+                self._pending[doc_id]["top_buys"][:0] = change["top_buys"]
+            raise
+
+    async def _write_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Stats write failed")
+
+    async def ledger_totals(self, match: dict, start: Optional[datetime] = None, end: Optional[datetime] = None) -> dict:
+        """Totals of the lot_closed events matching `match`, summed over the monthly partitions."""
+        names = sorted(n for n in await self.db.list_collection_names() if n.startswith(f"{PARTITION_PREFIX}_"))
+        if start is not None:
+            names = [n for n in names if n >= partition_name(start)]
+        if end is not None:
+            names = [n for n in names if n <= partition_name(end)]
+        totals = empty_totals()
+        for name in names:
+            async for facets in self.db[name].aggregate(ledger_pipeline(match)):
+                merge_totals(totals, _facet_totals(facets))
+        return totals
+
+    async def room_totals(self, code: str, created_at: Optional[datetime], completed_at: Optional[datetime]) -> tuple:
+        """(totals, source) for a room, from its running totals or else its ledger."""
+        doc = await self.collection.find_one({"_id": room_stats_id(code)}, {"_id": 0, "since": 0})
+        since = await self.since()
+        if doc is not None and (created_at is None or since is None or created_at >= since):
+            return doc, "aggregates"
+        # Lots before the running totals began come from the ledger
+        end = since if doc is not None else completed_at
+        window = {}
+        if created_at is not None:
+            window["$gte"] = created_at
+        if end is not None:
+            window["$lt" if doc is not None else "$lte"] = end
+        match = {"room": code, **({"at": window} if window else {})}
+        totals = await self.ledger_totals(match, created_at, end)
+        if doc is None:
+            return totals, "pipeline"
+        merge_totals(totals, doc)
+        return totals, "aggregates+pipeline"
+
+    async def since(self) -> Optional[datetime]:
+        if self._since is None:
+            doc = await self.collection.find_one({"_id": GLOBAL_ID}, {"since": 1})
+            self._since = doc and doc.get("since")
+        return self._since
+
+    async def final_totals(self, code: str) -> Optional[dict]:
+        """A finished room's totals with everything recorded so far written, to store with its archive."""
+        await self.flush()
+        return await self.collection.find_one({"_id": room_stats_id(code)}, {"_id": 0, "since": 0})
+
+    async def drop_room(self, code: str):
+        # Archived rooms keep their totals in the archive document
+        await self.collection.delete_one({"_id": room_stats_id(code)})
+        self.cache.discard(room_stats_id(code))
+
+    async def global_totals(self) -> dict:
+        doc = await self.collection.find_one({"_id": GLOBAL_ID}, {"_id": 0, "since": 0, "backfilled": 0})
+        return doc or empty_totals()
+
+    async def backfill_global(self):
+        """Add lots closed before the running totals existed, once per deployment."""
+        doc = await self.collection.find_one({"_id": GLOBAL_ID}, {"since": 1, "backfilled": 1})
+        if doc is not None and doc.get("backfilled"):
+            return
+        since = doc["since"] if doc is not None else datetime.utcnow()
+        if doc is None:
+            try:
+                await self.collection.insert_one({"_id": GLOBAL_ID, "since": since})
+            except DuplicateKeyError:
+                return await self.backfill_global()
+        history = await self.ledger_totals({"at": {"$lt": since}}, end=since)
+        for name in sorted(n for n in await self.db.list_collection_names() if n.startswith(f"{PARTITION_PREFIX}_")):
+            history["auctions"] += await self.db[name].count_documents({"type": "auction_completed", "at": {"$lt": since}})
+        update: dict = {"$set": {"backfilled": True}}
+        if flatten(history):
+            update["$inc"] = flatten(history)
+        if history["top_buys"]:
+            update["$push"] = {"top_buys": {"$each": history["top_buys"], "$sort": {"amount": -1}, "$slice": TOP_BUYS}}
+        # The filter lets exactly one worker apply the history
+        await self.collection.update_one({"_id": GLOBAL_ID, "backfilled": {"$ne": True}}, update)
@@ -0,0 +1,89 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TimerScheduler:
+    """Fires `callback(key, deadline)` when a key's deadline passes.
+
+    All deadlines live in one heap driven by a single asyncio task, so thousands of
+    live rooms cost one task rather than one sleeping task each. Rescheduling a key
+    just pushes a new entry; superseded entries are skipped when they reach the top.
+    """
+
+    def __init__(self, callback: Callable[[Hashable, datetime], Awaitable[None]]):
+        self.callback = callback
+        self._heap: list = []
+        self._deadlines: Dict[Hashable, datetime] = {}
+        self._counter = itertools.count()
+        self._changed = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self._firing: set = set()
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def schedule(self, key: Hashable, deadline: datetime):
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), key))
+        if self._heap[0][2] == key:
+            self._changed.set()
+
+    def cancel(self, key: Hashable):
+        self._deadlines.pop(key, None)
+
+    def keys(self):
+        return list(self._deadlines)
+
+    def deadline(self, key: Hashable) -> Optional[datetime]:
+        return self._deadlines.get(key)
+
+    def start(self):
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    async def _run(self):
+        while True:
+            self._changed.clear()
+            delay = self._fire_due()
+            try:
+                await asyncio.wait_for(self._changed.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire_due(self) -> Optional[float]:
+        """Start callbacks for every due key and return seconds until the next deadline."""
+        now = datetime.utcnow()
+        while self._heap:
+            deadline, _, key = self._heap[0]
+            if self._deadlines.get(key) != deadline:
+                heapq.heappop(self._heap)
+                continue
+            if deadline > now:
+                return (deadline - now).total_seconds()
+            heapq.heappop(self._heap)
+            del self._deadlines[key]
+            task = asyncio.create_task(self._fire(key, deadline))
+            self._firing.add(task)
+            task.add_done_callback(self._firing.discard)
+        return None
+
+    async def _fire(self, key: Hashable, deadline: datetime):
+        try:
+            await self.callback(key, deadline)
+        except Exception:
+            logger.exception("Timer callback failed for %s", key)
@@ -0,0 +1,263 @@
+"""End-to-end load benchmark for the auction server, run in a single process.
+
+Serves `server.socket_app` with uvicorn on a local port, against MONGO_URL or (with
+--memory) the mongomock-motor stand-in, then drives it with asyncio Socket.IO clients:
+N rooms, each with M bidding teams and K spectators. Reports join throughput, bid
+throughput, bid acknowledgement latency, bid->broadcast latency percentiles for the
+bidders and (sampled, batched) for the spectators, and the application memory held
+per room, as JSON so runs can be compared between releases.
+
+    python benchmarks/auction_load.py --memory --rooms 50 --teams 8 --spectators 20
+    python benchmarks/auction_load.py --memory --output run.json --baseline last.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def load_server(use_memory: bool):
+    if use_memory:
+        try:
+            import mongomock_motor
+        except ImportError:
+            sys.exit("--memory needs mongomock-motor: pip install mongomock-motor")
+        import motor.motor_asyncio
+
+        motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+        os.environ.setdefault("MONGO_URL", "mongodb://benchmark")
+        os.environ.setdefault("DB_NAME", "auction_load")
+    # Load generators bid far faster than people; measure the server, not its rate limits
+    for name in ("BID_RATE_PER_SID", "BID_RATE_PER_ROOM", "EVENT_RATE_PER_SID"):
+        os.environ.setdefault(name, "0")
+    import server
+
+    return server
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def percentile(ordered, q: float):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def latency_summary(ordered) -> dict:
+    return {
+        name: None if value is None else value * 1e3
+        for name, value in (
+            ("p50", percentile(ordered, 0.50)),
+            ("p95", percentile(ordered, 0.95)),
+            ("p99", percentile(ordered, 0.99)),
+            ("max", ordered[-1] if ordered else None),
+        )
+    }
+
+
+def app_memory(snapshot) -> int:
+    # Only count allocations made by the backend modules, not by the benchmark's clients
+    benchmarks = str(BACKEND_DIR / "benchmarks")
+    return sum(
+        stat.size for stat in snapshot.statistics("filename")
+        if stat.traceback[0].filename.startswith(str(BACKEND_DIR))
+        and not stat.traceback[0].filename.startswith(benchmarks)
+    )
+
+
+class Room:
+    def __init__(self, code: str):
+        self.code = code
+        self.bidders = []
+        self.spectators = []
+        self.sent = {}  # bid amount -> perf_counter at emit
+        self.latencies = []
+        self.spectator_latencies = []
+        self.acks = []
+
+
+async def connect_client(url: str, room: Room, clients: list, latencies: list):
+    import socketio
+
+    sio = socketio.AsyncClient(reconnection=False)
+    snapshot = asyncio.get_running_loop().create_future()
+    sio.on("room_snapshot", lambda data: snapshot.done() or snapshot.set_result(data))
+
+    def on_new_bid(data):
+        sent = room.sent.get(data["bid_amount"])
+        if sent is not None:
+            latencies.append(time.perf_counter() - sent)
+    sio.on("new_bid", on_new_bid)
+    await sio.connect(url, transports=["websocket"])
+    clients.append(sio)
+    return sio, snapshot
+
+
+async def join_room(url: str, room: Room, args, clients: list):
+    for team in range(args.teams):
+        sio, snapshot = await connect_client(url, room, clients, room.latencies)
+        await sio.emit("join_room", {"room_code": room.code, "team_name": f"{room.code}-{team}"})
+        await asyncio.wait_for(snapshot, 10)
+        room.bidders.append(sio)
+    for _ in range(args.spectators):
+        sio, snapshot = await connect_client(url, room, clients, room.spectator_latencies)
+        await sio.emit("watch_room", {"room_code": room.code})
+        await asyncio.wait_for(snapshot, 10)
+        room.spectators.append(sio)
+
+
+async def bid_in_room(room: Room, args, outcome: dict):
+    amount = 5000.0  # above every opening price, below the 8000 budget
+    for bid in range(args.bids):
+        amount += 1
+        sent = room.sent[amount] = time.perf_counter()
+        ack = await room.bidders[bid % len(room.bidders)].call(
+            "place_bid", {"room_code": room.code, "bid_amount": amount}, timeout=10
+        )
+        room.acks.append(time.perf_counter() - sent)
+        outcome["accepted" if ack and ack.get("accepted") else "rejected"] += 1
+        if args.interval:
+            await asyncio.sleep(args.interval)
+
+
+async def run(args) -> dict:
+    import aiohttp
+    import uvicorn
+
+    server = load_server(args.memory)
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    http_server = uvicorn.Server(uvicorn.Config(server.socket_app, port=port, log_level="warning", lifespan="on"))
+    serving = asyncio.create_task(http_server.serve())
+    while not http_server.started:
+        await asyncio.sleep(0.05)
+
+    clients = []
+    try:
+        async with aiohttp.ClientSession() as http:
+            tracemalloc.start()
+            baseline = tracemalloc.take_snapshot()
+
+            started = time.perf_counter()
+            rooms = []
+            for _ in range(args.rooms):
+                async with http.post(f"{url}/api/room/create") as response:
+                    rooms.append(Room((await response.json())["room_code"]))
+            create_elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            await asyncio.gather(*(join_room(url, room, args, clients) for room in rooms))
+            join_elapsed = time.perf_counter() - started
+
+            for room in rooms:
+                async with http.post(f"{url}/api/room/{room.code}/start") as response:
+                    started_room = await response.json()
+                if "error" in started_room:
+                    raise RuntimeError(f"{room.code}: {started_room['error']}")
+            held = app_memory(tracemalloc.take_snapshot()) - app_memory(baseline)
+            tracemalloc.stop()
+
+            outcome = {"accepted": 0, "rejected": 0}
+            started = time.perf_counter()
+            await asyncio.gather(*(bid_in_room(room, args, outcome) for room in rooms))
+            bid_elapsed = time.perf_counter() - started
+            await asyncio.sleep(args.drain)
+    finally:
+        for sio in clients:
+            if sio.connected:
+                await sio.disconnect()
+        http_server.should_exit = True
+        await serving
+
+    latencies = sorted(latency for room in rooms for latency in room.latencies)
+    spectator_latencies = sorted(latency for room in rooms for latency in room.spectator_latencies)
+    acks = sorted(latency for room in rooms for latency in room.acks)
+    receivers = args.teams + args.spectators
+    # Spectators see bursts of bids sampled down, so only bidders count every broadcast
+    expected = outcome["accepted"] * args.teams
+    return {
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+        "results": {
+            "rooms_per_sec": args.rooms / create_elapsed,
+            "joins_per_sec": args.rooms * receivers / join_elapsed,
+            "bids_per_sec": (outcome["accepted"] + outcome["rejected"]) / bid_elapsed,
+            "bids_accepted": outcome["accepted"],
+            "bids_rejected": outcome["rejected"],
+            "broadcasts_expected": expected,
+            "broadcasts_received": len(latencies),
+            "spectator_broadcasts_received": len(spectator_latencies),
+            "ack_latency_ms": latency_summary(acks),
+            "broadcast_latency_ms": latency_summary(latencies),
+            "spectator_latency_ms": latency_summary(spectator_latencies),
+            "app_bytes_per_room": held / args.rooms,
+        },
+    }
+
+
+# result key -> True when higher is better
+COMPARED = {
+    "joins_per_sec": True,
+    "bids_per_sec": True,
+    "ack_latency_ms.p99": False,
+    "broadcast_latency_ms.p99": False,
+    "app_bytes_per_room": False,
+}
+
+
+def regressions(current: dict, baseline: dict, tolerance: float):
+    found = []
+    for key, higher_is_better in COMPARED.items():
+        now, before = current["results"], baseline["results"]
+        for part in key.split("."):
+            now, before = now.get(part), before.get(part)
+        if not now or not before:
+            continue
+        change = (now - before) / before
+        if (-change if higher_is_better else change) > tolerance:
+            found.append(f"{key}: {before:.3f} -> {now:.3f} ({change:+.0%})")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--teams", type=int, default=8, help="bidding teams per room (max 8)")
+    parser.add_argument("--spectators", type=int, default=10, help="watch-only clients per room")
+    parser.add_argument("--bids", type=int, default=100, help="bids per room")
+    parser.add_argument("--interval", type=float, default=0.0, help="seconds between bids in a room")
+    parser.add_argument("--drain", type=float, default=1.0, help="seconds to wait for trailing broadcasts")
+    parser.add_argument("--memory", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    parser.add_argument("--baseline", help="earlier results to compare against; exits 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    if args.baseline:
+        found = regressions(result, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for line in found:
+            print(f"regression: {line}", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
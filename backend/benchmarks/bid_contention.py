@@ -0,0 +1,117 @@
+"""Contention benchmark for the bid path.
+
+Fires thousands of concurrent bids with distinct amounts at a single room and checks that
+the highest bid always wins and that accepted bids are totally ordered by bid_seq.
+
+    python benchmarks/bid_contention.py --bids 5000            # against MONGO_URL
+    python benchmarks/bid_contention.py --bids 5000 --memory   # mongomock-motor stand-in
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from auction_engine import AuctionEngine, BidRejected  # noqa: E402
+
+
+def make_db(use_memory: bool):
+    if use_memory:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--memory needs mongomock-motor: pip install mongomock-motor")
+        return AsyncMongoMockClient()["bid_contention"]
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+    load_dotenv(Path(__file__).resolve().parent.parent / ".env")
+    return AsyncIOMotorClient(os.environ["MONGO_URL"])[os.environ.get("DB_NAME", "test_database") + "_bench"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args) -> int:
+    db = make_db(args.memory)
+    code = f"bench-{uuid.uuid4().hex[:8]}"
+    sids = [f"sid-{i}" for i in range(args.teams)]
+    await db.rooms.insert_one({
+        "id": str(uuid.uuid4()),
+        "code": code,
+        "teams": [
+            {"id": str(uuid.uuid4()), "name": f"Team {i}", "owner_id": sid, "budget": float(args.bids * 10), "players": []}
+            for i, sid in enumerate(sids)
+        ],
+        "auction_state": "active",
+        "current_player_id": "bench-player",
+        "current_bid": 0,
+        "current_bidder": "",
+        "bid_seq": 0,
+    })
+
+    rng = random.Random(args.seed)
+    amounts = [float(a) for a in rng.sample(range(1, args.bids * 10), args.bids)]
+    # A separate engine per simulated process so every bid really goes through Mongo;
+    # memory mode assumes a single owner per room, so it always gets one engine
+    processes = args.processes if args.mode == "atomic" else 1
+    engines = [AuctionEngine(db, bid_mode=args.mode) for _ in range(processes)]
+    latencies = []
+    accepted = []
+
+    async def bid(i, amount):
+        engine = engines[i % len(engines)]
+        started = time.perf_counter()
+        try:
+            result = await engine.place_bid(code, sids[i % len(sids)], amount)
+        except BidRejected:
+            result = None
+        latencies.append(time.perf_counter() - started)
+        if result is not None:
+            accepted.append(amount)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bid(i, amount) for i, amount in enumerate(amounts)))
+    for engine in engines:
+        await engine.flush()
+    elapsed = time.perf_counter() - started
+
+    room = await db.rooms.find_one({"code": code}, {"_id": 0, "current_bid": 1, "bid_seq": 1})
+    await db.rooms.delete_one({"code": code})
+
+    print(f"mode={args.mode} processes={processes} bids={args.bids} teams={args.teams}")
+    print(f"accepted={len(accepted)} rejected={args.bids - len(accepted)} elapsed={elapsed:.3f}s "
+          f"throughput={args.bids / elapsed:,.0f} bids/s")
+    print(f"latency p50={percentile(latencies, 50) * 1e3:.3f}ms p99={percentile(latencies, 99) * 1e3:.3f}ms")
+
+    failures = []
+    if room["current_bid"] != max(amounts):
+        failures.append(f"stored bid {room['current_bid']} != highest bid {max(amounts)}")
+    if args.mode == "atomic" and room["bid_seq"] != len(accepted):
+        failures.append(f"bid_seq {room['bid_seq']} != accepted bids {len(accepted)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: highest bid won")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bids", type=int, default=5000)
+    parser.add_argument("--teams", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=4, help="independent engines sharing the room (atomic mode)")
+    parser.add_argument("--mode", choices=["atomic", "memory"], default="atomic")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--memory", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
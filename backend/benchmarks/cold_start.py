@@ -0,0 +1,79 @@
+"""Cold start of the auction server: from process launch until /api/health/ready says ready.
+
+Each run starts a fresh process serving `server.socket_app` (against MONGO_URL, or with
+--memory the mongomock-motor stand-in) and polls the readiness endpoint. Reports the
+wall time to ready and the server's own split between imports and the startup warm-up
+(indexes and catalog), as JSON.
+
+    python benchmarks/cold_start.py --memory --runs 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from auction_load import free_port, load_server
+
+
+def serve(args):
+    import uvicorn
+
+    server = load_server(args.memory)
+    uvicorn.run(server.socket_app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+async def wait_ready(url: str, timeout: float) -> dict:
+    import aiohttp
+
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as http:
+        while time.monotonic() < deadline:
+            try:
+                async with http.get(f"{url}/api/health/ready") as response:
+                    if response.status == 200:
+                        return await response.json()
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.01)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+
+def run_once(args) -> dict:
+    port = free_port()
+    command = [sys.executable, __file__, "--child", "--port", str(port)] + (["--memory"] if args.memory else [])
+    launched = time.perf_counter()
+    process = subprocess.Popen(command)
+    try:
+        report = asyncio.run(wait_ready(f"http://127.0.0.1:{port}", args.timeout))
+        return {"wall_seconds": time.perf_counter() - launched, **report["startup"], "rtt_ms": report["mongo"]["rtt_ms"]}
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--memory", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        serve(args)
+        return 0
+
+    runs = [run_once(args) for _ in range(args.runs)]
+    summary = {
+        field: {"median": statistics.median(run[field] for run in runs), "max": max(run[field] for run in runs)}
+        for field in ("wall_seconds", "import_seconds", "warmup_seconds", "ready_seconds")
+    }
+    print(json.dumps({"runs": runs, "summary": summary}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Socket.IO throughput with per-packet logging on and off.
+
+Each mode runs in a fresh process: a bare AsyncServer whose `bid` handler broadcasts to
+a room and acks (the shape of place_bid), driven by local websocket clients. Log output
+goes to a temporary file so terminal speed does not skew the numbers.
+
+    sync   logger/engineio_logger on, logging.basicConfig (the old default)
+    queue  logger/engineio_logger on, records handed to the QueueListener thread
+    off    socket logging off (SIO_LOGGING unset), the new default
+
+    python benchmarks/logging_overhead.py --clients 20 --events 500
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+MODES = ("sync", "queue", "off")
+
+
+async def serve_and_drive(mode: str, args) -> float:
+    import socketio
+    import uvicorn
+
+    from logging_setup import configure_logging
+
+    if mode == "sync":
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        socket_logging = True
+    else:
+        os.environ["SIO_LOGGING"] = "on" if mode == "queue" else "off"
+        socket_logging = configure_logging().socketio
+
+    sio = socketio.AsyncServer(async_mode="asgi", logger=socket_logging, engineio_logger=socket_logging)
+
+    @sio.event
+    async def connect(sid, environ):
+        await sio.enter_room(sid, "bench")
+
+    @sio.event
+    async def bid(sid, data):
+        await sio.emit("new_bid", data, room="bench")
+        return {"accepted": True}
+
+    server = uvicorn.Server(uvicorn.Config(socketio.ASGIApp(sio), port=args.port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    clients = [socketio.AsyncClient() for _ in range(args.clients)]
+    for client in clients:
+        await client.connect(f"http://127.0.0.1:{args.port}", transports=["websocket"])
+
+    async def drive(client):
+        for n in range(args.events):
+            await client.call("bid", {"bid_amount": n})
+
+    started = time.perf_counter()
+    await asyncio.gather(*(drive(client) for client in clients))
+    elapsed = time.perf_counter() - started
+
+    for client in clients:
+        await client.disconnect()
+    server.should_exit = True
+    await serving
+    return args.clients * args.events / elapsed
+
+
+def run_mode(mode: str, args) -> dict:
+    with tempfile.TemporaryFile() as log:
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", mode,
+             "--clients", str(args.clients), "--events", str(args.events), "--port", str(args.port)],
+            stdout=subprocess.PIPE, stderr=log, check=True,
+        ).stdout
+        log_bytes = log.tell()
+    result = json.loads(output)
+    result["log_bytes"] = log_bytes
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--events", type=int, default=500, help="acked events per client")
+    parser.add_argument("--port", type=int, default=18101)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        rate = asyncio.run(serve_and_drive(args.child, args))
+        print(json.dumps({"mode": args.child, "events_per_sec": rate}))
+        return 0
+
+    print(f"clients={args.clients} events/client={args.events}")
+    results = {mode: run_mode(mode, args) for mode in args.modes}
+    for mode, result in results.items():
+        print(f"{mode:>6}: {result['events_per_sec']:9.0f} events/s  log={result['log_bytes'] / 1024:.0f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
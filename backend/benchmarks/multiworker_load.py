@@ -0,0 +1,138 @@
+"""Multi-worker load test for the Socket.IO layer on a single Linux box.
+
+Starts several uvicorn processes sharing a Unix-socket pub/sub directory, spreads
+bidding clients for each room across all workers, and checks that every client sees
+every accepted bid of its room, in bid order, no matter which worker it is attached to.
+Needs a reachable MONGO_URL shared by the workers.
+
+    python benchmarks/multiworker_load.py --workers 4 --rooms 20 --teams 8 --bids 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+import socketio
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def start_workers(count: int, base_port: int, broker_dir: str):
+    # Rate limits off unless set explicitly: the load generator bids far faster than people
+    limits_off = {name: "0" for name in ("BID_RATE_PER_SID", "BID_RATE_PER_ROOM", "EVENT_RATE_PER_SID")}
+    env = {**limits_off, **os.environ, "SIO_MANAGER": f"unix://{broker_dir}"}
+    return [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:socket_app", "--port", str(base_port + i), "--log-level", "warning"],
+            cwd=BACKEND_DIR,
+            env=env,
+        )
+        for i in range(count)
+    ]
+
+
+async def wait_ready(urls, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as http:
+        for url in urls:
+            while True:
+                try:
+                    async with http.get(f"{url}/api/health/ready") as response:
+                        if response.status == 200:
+                            break
+                except aiohttp.ClientError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{url} did not start")
+                await asyncio.sleep(0.2)
+
+
+async def run_room(urls, room_index, args, results):
+    async with aiohttp.ClientSession() as http:
+        async with http.post(f"{urls[room_index % len(urls)]}/api/room/create") as response:
+            code = (await response.json())["room_code"]
+
+        clients, received = [], []
+        for team in range(args.teams):
+            sio = socketio.AsyncClient()
+            seen = []
+            sio.on("new_bid", lambda data, seen=seen: seen.append((data["bid_amount"], time.perf_counter())))
+            await sio.connect(urls[(room_index + team) % len(urls)], transports=["websocket"])
+            await sio.emit("join_room", {"room_code": code, "team_name": f"T{room_index}-{team}"})
+            clients.append(sio)
+            received.append(seen)
+        await asyncio.sleep(0.5)
+        async with http.post(f"{urls[(room_index + 1) % len(urls)]}/api/room/{code}/start") as response:
+            started = await response.json()
+        if "error" in started:
+            raise RuntimeError(started["error"])
+        await asyncio.sleep(0.5)
+
+        sent = {}
+        amount = 2500.0  # above every opening price, far below the 8000 budget
+        for bid in range(args.bids):
+            amount += 1
+            sent[amount] = time.perf_counter()
+            await clients[bid % len(clients)].emit("place_bid", {"room_code": code, "bid_amount": amount})
+            await asyncio.sleep(args.interval)
+        await asyncio.sleep(1.0)
+
+        # Every client must see the same strictly increasing sequence of accepted bids
+        reference = [a for a, _ in received[0]]
+        in_order = all(x < y for x, y in zip(reference, reference[1:]))
+        for seen in received:
+            amounts = [a for a, _ in seen]
+            results["complete"] += in_order and bool(amounts) and amounts == reference
+            results["latencies"].extend(at - sent[a] for a, at in seen if a in sent)
+        results["clients"] += len(clients)
+        for sio in clients:
+            await sio.disconnect()
+
+
+async def run(args) -> int:
+    urls = [f"http://127.0.0.1:{args.base_port + i}" for i in range(args.workers)]
+    with tempfile.TemporaryDirectory() as broker_dir:
+        workers = start_workers(args.workers, args.base_port, broker_dir)
+        try:
+            # Workers only report ready once their cluster membership has settled
+            await wait_ready(urls)
+            results = {"complete": 0, "clients": 0, "latencies": []}
+            started = time.perf_counter()
+            await asyncio.gather(*(run_room(urls, i, args, results) for i in range(args.rooms)))
+            elapsed = time.perf_counter() - started
+        finally:
+            for worker in workers:
+                worker.terminate()
+            for worker in workers:
+                worker.wait()
+
+    latencies = sorted(results["latencies"])
+    total_bids = args.rooms * args.bids
+    print(f"workers={args.workers} rooms={args.rooms} teams={args.teams} bids/room={args.bids}")
+    print(f"bids={total_bids} elapsed={elapsed:.2f}s deliveries={len(latencies)}")
+    if latencies:
+        print(f"bid->broadcast p50={statistics.median(latencies) * 1e3:.1f}ms "
+              f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1e3:.1f}ms")
+    print(f"clients with every accepted bid in order: {results['complete']}/{results['clients']}")
+    return 0 if results["complete"] == results["clients"] else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--teams", type=int, default=8)
+    parser.add_argument("--bids", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.01, help="seconds between bids in a room")
+    parser.add_argument("--base-port", type=int, default=18001)
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
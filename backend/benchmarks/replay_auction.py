@@ -0,0 +1,168 @@
+"""Replay a recorded auction against an in-process server, faster than real time.
+
+Takes a room's ledger as saved from GET /api/room/{code}/events and drives a fresh
+server through the same joins, bids and lot closes, compressing the gaps between
+events by --speed (0 replays back to back). Lots are closed when the recording says
+they closed rather than by the 30s timer. The replayed room must end up exactly as
+the ledger describes it. Reports bid acknowledgement latency as JSON.
+
+    curl -s $URL/api/room/123456/events > auction.jsonl
+    python benchmarks/replay_auction.py auction.jsonl --memory --speed 50
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from auction_load import free_port, load_server, percentile
+
+
+def load_events(path: Path):
+    events = [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+    starts = [i for i, event in enumerate(events) if event["type"] == "room_created"]
+    # Codes are reused after archival; replay the last auction in the file
+    return events[starts[-1]:] if starts else events
+
+
+async def prepare_room(server, http, url: str, events) -> str:
+    await server.app.state.player_import
+    lots = [event["data"] for event in events if event["type"] == "lot_opened"]
+    # The unsold round re-opens players from the first round's order
+    rounds = [i for i, event in enumerate(events) if event["type"] == "round_started"]
+    first_round = [event["data"] for event in events[:rounds[0] if rounds else len(events)] if event["type"] == "lot_opened"]
+    created = events[0]["data"] if events[0]["type"] == "room_created" else {}
+    settings = {field: created[field] for field in ("parallel_lots", "unsold_round", "unsold_lot_seconds") if field in created}
+    missing = [lot for lot in lots if server.catalog.get(lot["player_id"]) is None]
+    if missing:
+        # Recorded against another catalog: stand-ins with the recorded opening prices
+        await server.db.players.insert_many([
+            {"id": lot["player_id"], "name": f"Replay {lot['player_id']}", "role": "batsman",
+             "country": "Replay", "rating": 3, "base_price": lot["base_price"], "stats": {}}
+            for lot in missing
+        ])
+        await server.catalog.load()
+    async with http.post(f"{url}/api/room/create") as response:
+        code = (await response.json())["room_code"]
+    order_id, count = await server.orders.ensure([lot["player_id"] for lot in first_round])
+    # Without an ordering the room keeps the recorded order when it starts
+    await server.db.rooms.update_one(
+        {"code": code}, {"$set": {"order_id": order_id, "player_count": count, **settings}, "$unset": {"ordering": ""}}
+    )
+    return code
+
+
+async def join(url: str, code: str, name: str, clients: list):
+    import socketio
+
+    sio = socketio.AsyncClient(reconnection=False)
+    session = asyncio.get_running_loop().create_future()
+    sio.on("session", lambda data: session.done() or session.set_result(data))
+    await sio.connect(url, transports=["websocket"])
+    clients.append(sio)
+    await sio.emit("join_room", {"room_code": code, "team_name": name})
+    await asyncio.wait_for(session, 10)
+    return sio
+
+
+def compare(expected: dict, actual: dict):
+    mismatches = []
+    want = {team["name"]: (team["budget"], team.get("players", [])) for team in expected["teams"].values()}
+    got = {team["name"]: (team["budget"], team.get("players", [])) for team in actual.get("teams", [])}
+    if want != got:
+        mismatches.append({"teams": {"expected": want, "actual": got}})
+    if expected["sold_players"] != actual.get("sold_players", []):
+        mismatches.append({"sold_players": {"expected": expected["sold_players"], "actual": actual.get("sold_players")}})
+    if expected["auction_state"] != actual.get("auction_state"):
+        mismatches.append({"auction_state": {"expected": expected["auction_state"], "actual": actual.get("auction_state")}})
+    return mismatches
+
+
+async def run(args) -> dict:
+    import aiohttp
+    import uvicorn
+
+    from event_log import replay
+
+    events = load_events(args.events)
+    server = load_server(args.memory)
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    http_server = uvicorn.Server(uvicorn.Config(server.socket_app, port=port, log_level="warning", lifespan="on"))
+    serving = asyncio.create_task(http_server.serve())
+    while not http_server.started:
+        await asyncio.sleep(0.05)
+
+    clients, teams, latencies, diverged = [], {}, [], 0
+    try:
+        async with aiohttp.ClientSession() as http:
+            code = await prepare_room(server, http, url, events)
+            previous = datetime.fromisoformat(events[0]["at"])
+            started = time.perf_counter()
+            for event in events:
+                at = datetime.fromisoformat(event["at"])
+                if args.speed:
+                    await asyncio.sleep((at - previous).total_seconds() / args.speed)
+                previous = at
+                data = event["data"]
+                if event["type"] == "team_joined":
+                    teams[data["team"]["id"]] = await join(url, code, data["team"]["name"], clients)
+                elif event["type"] == "auction_started":
+                    async with http.post(f"{url}/api/room/{code}/start") as response:
+                        await response.json()
+                elif event["type"] == "bid":
+                    sent = time.perf_counter()
+                    ack = await teams[data["team_id"]].call(
+                        "place_bid", {"room_code": code, "bid_amount": data["amount"], "player_id": data.get("player_id")},
+                        timeout=10,
+                    )
+                    latencies.append(time.perf_counter() - sent)
+                    diverged += not (ack and ack.get("accepted"))
+                elif event["type"] == "lot_closed":
+                    await server.close_lot(code, data["player_id"], datetime.utcnow() + timedelta(days=1))
+            elapsed = time.perf_counter() - started
+            async with http.get(f"{url}/api/room/{code}") as response:
+                actual = await response.json()
+    finally:
+        for sio in clients:
+            if sio.connected:
+                await sio.disconnect()
+        http_server.should_exit = True
+        await serving
+
+    expected = replay(events)
+    recorded = (datetime.fromisoformat(events[-1]["at"]) - datetime.fromisoformat(events[0]["at"])).total_seconds()
+    latencies.sort()
+    mismatches = compare(expected, actual)
+    return {
+        "events": len(events),
+        "speed": args.speed,
+        "recorded_seconds": recorded,
+        "replay_seconds": elapsed,
+        "bids": len(latencies),
+        "bids_rejected": diverged,
+        "bid_ack_ms": {
+            name: None if value is None else value * 1e3
+            for name, value in (("p50", percentile(latencies, 0.50)), ("p95", percentile(latencies, 0.95)),
+                                ("p99", percentile(latencies, 0.99)))
+        },
+        "matches_recording": not mismatches and not diverged,
+        "mismatches": mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("events", type=Path, help="JSON lines from /api/room/{code}/events")
+    parser.add_argument("--speed", type=float, default=10.0, help="time compression; 0 for no waiting")
+    parser.add_argument("--memory", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    args = parser.parse_args()
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+    return 0 if result["matches_recording"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Encode cost and size of room events as JSON and as the compact msgpack format.
+
+Builds the events a room actually broadcasts (a bid, its room delta, the next lot with
+a full player document, a team joining and the snapshot a joining client gets, for a
+room of --teams teams) and encodes each one as the Socket.IO packet that would go
+on the wire, --rounds times per format. Reports microseconds per encode and bytes
+per event, as JSON.
+
+    python benchmarks/wire_format.py --teams 8 --squad 15
+"""
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def sample_events(teams: int, squad: int) -> dict:
+    timer_end = (datetime.utcnow() + timedelta(seconds=30)).isoformat()
+    player = {
+        "id": str(uuid.uuid4()), "name": "Jasprit Bumrah", "role": "bowler", "country": "India",
+        "rating": 5, "base_price": 1400.0,
+        "stats": {"matches": 120, "wickets": 145, "economy": 7.4, "average": 23.3, "strike_rate": 18.9},
+    }
+    team_docs = {}
+    for number in range(teams):
+        team_id = str(uuid.uuid4())
+        team_docs[team_id] = {
+            "id": team_id, "name": f"Team {number + 1}", "owner_id": "x" * 20, "budget": 4150.0,
+            "players": [str(uuid.uuid4()) for _ in range(squad)],
+            "roles": {"batsman": 5, "bowler": 5, "all-rounder": 3, "wicket-keeper": 2}, "spent": 3850.0,
+        }
+    bidder = next(iter(team_docs))
+    lot = {
+        "auction_state": "active", "current_player_index": 42, "current_player_id": player["id"],
+        "current_player": player, "current_bid": 1550.0, "current_bidder_team_id": bidder,
+        "timer_end": timer_end, "bid_seq": 311, "max_affordable_bid": {team_id: 3870.0 for team_id in team_docs},
+    }
+    return {
+        "new_bid": {"bid_amount": 1550.0, "bidder_team": "Team 1", "timer_end": timer_end},
+        "room_delta": {"seq": 902, "changes": {
+            "current_bid": 1550.0, "current_bidder_team_id": bidder, "timer_end": timer_end, "bid_seq": 311,
+        }},
+        "next_player": {
+            "current_player": player, "current_bid": 1400.0, "current_player_index": 42,
+            "timer_end": timer_end, "max_affordable_bid": lot["max_affordable_bid"],
+        },
+        "team_joined": {"team": team_docs[bidder], "total_teams": teams},
+        "room_snapshot": {"epoch": uuid.uuid4().hex, "seq": 902, "state": {"code": "123456", "teams": team_docs, **lot}},
+    }
+
+
+def packet_bytes(encoded) -> int:
+    # Binary packets are a text header plus one attachment frame
+    parts = encoded if isinstance(encoded, list) else [encoded]
+    return sum(len(part.encode() if isinstance(part, str) else part) for part in parts)
+
+
+def measure(event: str, data: dict, rounds: int) -> dict:
+    from socketio import packet
+
+    import wire
+
+    formats = {
+        "json": lambda: packet.Packet(packet.EVENT, data=[event, data]).encode(),
+        "msgpack": lambda: packet.Packet(packet.EVENT, data=[event, wire.encode(data)]).encode(),
+    }
+    result = {}
+    for name, encode in formats.items():
+        encode()
+        started = time.perf_counter()
+        for _ in range(rounds):
+            encoded = encode()
+        result[f"{name}_us"] = (time.perf_counter() - started) / rounds * 1e6
+        result[f"{name}_bytes"] = packet_bytes(encoded)
+    result["bytes_saved"] = 1 - result["msgpack_bytes"] / result["json_bytes"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=8)
+    parser.add_argument("--squad", type=int, default=15, help="players bought per team in the snapshot")
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    import wire
+
+    if wire.msgpack is None:
+        sys.exit("the compact format needs msgpack: pip install msgpack")
+    events = sample_events(args.teams, args.squad)
+    result = {event: measure(event, data, args.rounds) for event, data in events.items()}
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
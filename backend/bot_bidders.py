@@ -0,0 +1,124 @@
+import hashlib
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from auction_timers import TimerScheduler
+
+BOT_PREFIX = "bot:"
+ROLES = ("batsman", "bowler", "all-rounder", "wicket-keeper")
+# Squad a bot aims for; a role it is short of is worth more to it
+SQUAD_TARGET = np.array([5, 5, 3, 2])
+SQUAD_SIZE = int(SQUAD_TARGET.sum())
+# Budget a bot keeps back for every slot it still has to fill after this one
+RESERVE_PER_SLOT = 20.0
+
+
+def new_bot_sid() -> str:
+    return f"{BOT_PREFIX}{uuid.uuid4()}"
+
+
+def is_bot(sid: str) -> bool:
+    return sid.startswith(BOT_PREFIX)
+
+
+def bid_increment(current_bid: float) -> float:
+    return 10.0 if current_bid < 200 else 20.0 if current_bid < 1000 else 50.0
+
+
+def _aggression(team_id: str) -> float:
+    # Stable per bot, so a bot keeps its character across restarts: 0.8 - 1.4
+    return 0.8 + 0.6 * hashlib.blake2b(team_id.encode(), digest_size=2).digest()[0] / 255
+
+
+class BotBidders:
+    """Bids for bot-owned teams from one shared timer task.
+
+    When a lot opens, the most every bot in the room would pay is computed in one
+    NumPy pass from the player's role, rating and base price and each bot's budget
+    and squad, capped by what the squad rules allow the team to bid. After that each turn is just a comparison of those limits with the
+    next bid. A room's next turn is a single scheduler entry, re-armed after every
+    bid, so idle rooms cost nothing and thousands of rooms share one task.
+    """
+
+    def __init__(
+        self,
+        engine,
+        place_bid: Callable[[str, str, float], Awaitable],
+        think_time: Tuple[float, float] = (1.0, 4.0),
+        seed: Optional[int] = None,
+    ):
+        self.engine = engine
+        self.place_bid = place_bid
+        self.think_time = think_time
+        self.rng = np.random.default_rng(seed)
+        self.timers = TimerScheduler(self._turn)
+        self._limits: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}  # room -> (bot sids, max bids)
+
+    def __len__(self):
+        return len(self._limits)
+
+    def start(self):
+        self.timers.start()
+
+    async def stop(self):
+        await self.timers.stop()
+
+    def value_lot(self, room):
+        """Price the player now on sale for every bot in `room` and start bidding."""
+        bots = [team for team in room.teams.values() if is_bot(team.owner_id)]
+        player = room.current_player
+        if not bots or player is None or player.get("role") not in ROLES:
+            self.forget(room.code)
+            return
+        budgets = np.array([team.budget for team in bots], dtype=float)
+        aggression = np.array([_aggression(team.id) for team in bots])
+        squads = np.array([[team.roles.get(role, 0) for role in ROLES] for team in bots], dtype=float)
+        allowed = np.array([room.max_bid(team)[0] for team in bots], dtype=float)
+
+        role = ROLES.index(player["role"])
+        need = np.where(squads[:, role] < SQUAD_TARGET[role], 1.4, 0.5)
+        open_slots = SQUAD_SIZE - squads.sum(axis=1)
+        value = player["base_price"] * (0.6 + 0.25 * player["rating"]) * aggression * need
+        affordable = budgets - RESERVE_PER_SLOT * np.maximum(open_slots - 1, 0)
+        limits = np.where(open_slots > 0, np.minimum(np.minimum(value, affordable), allowed), 0.0)
+
+        self._limits[room.code] = (np.array([team.owner_id for team in bots], dtype=object), limits)
+        self._arm(room.code)
+
+    def on_bid(self, room_code: str):
+        if room_code in self._limits:
+            self._arm(room_code)
+
+    def forget(self, room_code: str):
+        self._limits.pop(room_code, None)
+        self.timers.cancel(room_code)
+
+    def decide(self, room) -> Optional[Tuple[str, float]]:
+        """The bot that bids next and its amount, or None when no bot will go higher."""
+        valued = self._limits.get(room.code)
+        if valued is None or room.auction_state != "active":
+            return None
+        sids, limits = valued
+        amount = room.current_bid + bid_increment(room.current_bid)
+        willing = (limits >= amount) & (sids != room.current_bidder)
+        if not willing.any():
+            return None
+        # Bots with more headroom above the next bid are likelier to move first
+        headroom = np.where(willing, limits - amount + 1, 0.0)
+        return sids[self.rng.choice(len(limits), p=headroom / headroom.sum())], amount
+
+    def _arm(self, room_code: str):
+        delay = self.rng.uniform(*self.think_time)
+        self.timers.schedule(room_code, datetime.utcnow() + timedelta(seconds=delay))
+
+    async def _turn(self, room_code: str, deadline: datetime):
+        room = self.engine.rooms.get(room_code)
+        if room is None:
+            self.forget(room_code)
+            return
+        decision = self.decide(room)
+        if decision is not None:
+            await self.place_bid(room_code, *decision)
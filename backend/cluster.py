@@ -0,0 +1,322 @@
+"""Cross-process Socket.IO fan-out and per-room ownership.
+
+Every worker process runs its own AsyncServer. A pub/sub client manager relays
+broadcasts so `sio.emit(..., room=code)` reaches sockets connected to any worker, and
+`Cluster` routes each room's state changes (joins, bids, lot control) to one owner
+worker chosen by rendezvous hashing of the room code over the live workers, which
+keeps bid ordering in a single process.
+
+The broker is selected with SIO_MANAGER:
+
+    (unset)                   single process, plain in-memory manager
+    unix:///tmp/crickbid-sio  brokerless Unix datagram sockets, one per worker (one box)
+    redis://localhost:6379/0  Redis pub/sub (needs the `redis` package)
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import pickle
+import socket
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+logger = logging.getLogger(__name__)
+
+CLUSTER_METHODS = {"heartbeat", "route", "route_reply"}
+MAX_DATAGRAM = 256 * 1024
+# A peer whose receive buffer is full gets the datagram again after 1, 2, 4, ... ms
+SEND_ATTEMPTS = 7
+RETRY_DELAY = 0.001
+
+
+class DeliveryFailed(ConnectionError):
+    """A message addressed to one worker could not be handed to it."""
+
+
+class ClusterRoutingMixin:
+    """Diverts cluster control messages from a pub/sub manager's stream to `cluster`."""
+
+    cluster = None
+
+    async def _listen(self):
+        async for message in super()._listen():
+            data = message
+            if isinstance(message, bytes):
+                try:
+                    data = pickle.loads(message)
+                except Exception:
+                    try:
+                        data = json.loads(message)
+                    except Exception:
+                        data = None
+            if isinstance(data, dict) and data.get("method") in CLUSTER_METHODS:
+                if self.cluster is not None:
+                    self.cluster.handle_message(data)
+                continue
+            yield data if data is not None else message
+
+
+class UnixSocketPubSubManager(AsyncPubSubManager):
+    """Pub/sub over one Unix datagram socket per worker in a shared directory.
+
+    Needs no broker process: publishing sends the message to every socket in the
+    directory, and messages addressed to a single worker go only to its socket.
+    """
+
+    name = "unixsocket"
+
+    def __init__(self, path: str = "/tmp/crickbid-sio", channel="socketio", write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.path = Path(path)
+        self.path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.address = str(self.path / f"{self.host_id}.sock")
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        self._peer_locks: Dict[str, asyncio.Lock] = {}  # keeps each peer's messages in order while one waits
+        self._receiver = None
+        self._inbox: asyncio.Queue = asyncio.Queue()
+
+    def _peers(self):
+        return [str(peer) for peer in self.path.glob("*.sock") if str(peer) != self.address]
+
+    async def _publish(self, data):
+        """Send `data` to its target worker, or to every other worker.
+
+        Raises DeliveryFailed when the target cannot take it, so callers fail at once
+        instead of waiting for a reply that will never come. Broadcasts skip such peers.
+        """
+        payload = pickle.dumps(data)
+        target = data.get("target")
+        if target:
+            await self._send(payload, str(self.path / f"{target}.sock"))
+            return
+        for peer in self._peers():
+            try:
+                await self._send(payload, peer)
+            except DeliveryFailed as exc:
+                self._get_logger().warning("Dropped pub/sub message: %s", exc)
+
+    async def _send(self, payload: bytes, peer: str):
+        async with self._peer_locks.setdefault(peer, asyncio.Lock()):
+            delay = RETRY_DELAY
+            for _ in range(SEND_ATTEMPTS):
+                try:
+                    self._sender.sendto(payload, peer)
+                    return
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # The worker behind this socket is gone
+                    Path(peer).unlink(missing_ok=True)
+                    self._peer_locks.pop(peer, None)
+                    raise DeliveryFailed(f"No worker at {peer}")
+                except BlockingIOError:
+                    # Its receive buffer is full; unconnected datagram sockets never poll
+                    # unwritable, so back off instead of waiting on the selector
+                    await asyncio.sleep(delay)
+                    delay *= 2
+                except OSError as exc:
+                    raise DeliveryFailed(f"Cannot send to {peer}: {exc}") from exc
+            raise DeliveryFailed(f"Peer {peer} stayed busy")
+
+    def _on_readable(self):
+        while True:
+            try:
+                self._inbox.put_nowait(self._receiver.recv(MAX_DATAGRAM))
+            except BlockingIOError:
+                return
+
+    async def _listen(self):
+        if self._receiver is None:
+            self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+            self._receiver.bind(self.address)
+            self._receiver.setblocking(False)
+            asyncio.get_running_loop().add_reader(self._receiver.fileno(), self._on_readable)
+        async for message in self._read_inbox():
+            yield message
+
+    async def _read_inbox(self):
+        while True:
+            yield await self._inbox.get()
+
+    def close(self):
+        if self._receiver is not None:
+            asyncio.get_running_loop().remove_reader(self._receiver.fileno())
+            self._receiver.close()
+            self._receiver = None
+        Path(self.address).unlink(missing_ok=True)
+
+
+class UnixSocketManager(ClusterRoutingMixin, UnixSocketPubSubManager):
+    pass
+
+
+def create_client_manager(spec: Optional[str]):
+    """Build the Socket.IO client manager described by an SIO_MANAGER value."""
+    if not spec:
+        return None
+    if spec.startswith("unix://"):
+        return UnixSocketManager(spec[len("unix://"):])
+    if spec.startswith(("redis://", "rediss://")):
+        class RedisClusterManager(ClusterRoutingMixin, socketio.AsyncRedisManager):
+            pass
+        return RedisClusterManager(spec)
+    raise ValueError(f"Unsupported SIO_MANAGER: {spec}")
+
+
+class Cluster:
+    """Runs room-scoped handlers on the worker that owns the room.
+
+    Handlers are registered by name and always take the room code first. `dispatch`
+    calls them directly when this worker owns the room (always true for a single
+    process) and otherwise sends the call to the owner and waits for its result.
+
+    A starting worker only knows itself, so it would claim every room. With a pub/sub
+    manager, `settled` is set once two heartbeat rounds have been heard; until then
+    `dispatch` waits, and startup should too before arming lot timers.
+    """
+
+    def __init__(self, sio, heartbeat_interval: float = 2.0, call_timeout: float = 5.0):
+        self.sio = sio
+        self.manager = sio.manager if isinstance(sio.manager, ClusterRoutingMixin) else None
+        self.host_id = self.manager.host_id if self.manager else "local"
+        self.heartbeat_interval = heartbeat_interval
+        self.call_timeout = call_timeout
+        self.members: Dict[str, float] = {self.host_id: float("inf")}
+        self.on_membership_change: Optional[Callable[[], Awaitable[None]]] = None
+        self._handlers: Dict[str, Callable] = {}
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._call_ids = itertools.count()
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+        self.settled = asyncio.Event()
+        if self.manager is not None:
+            self.manager.cluster = self
+        else:
+            self.settled.set()
+
+    def handler(self, name: str):
+        def register(func):
+            self._handlers[name] = func
+            return func
+        return register
+
+    def owner(self, room_code: str) -> str:
+        # Rendezvous hashing: adding or losing a worker only moves that worker's rooms
+        return max(self.members, key=lambda host: hashlib.blake2b(f"{host}:{room_code}".encode(), digest_size=8).digest())
+
+    def owns(self, room_code: str) -> bool:
+        return len(self.members) == 1 or self.owner(room_code) == self.host_id
+
+    async def dispatch(self, name: str, room_code: str, *args):
+        if not self.settled.is_set():
+            await self.settled.wait()
+        if self.owns(room_code):
+            return await self._handlers[name](room_code, *args)
+        call_id = next(self._call_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[call_id] = future
+        try:
+            await self.manager._publish({
+                "method": "route", "host_id": self.host_id, "target": self.owner(room_code),
+                "id": call_id, "name": name, "room": room_code, "args": args,
+            })
+            return await asyncio.wait_for(future, self.call_timeout)
+        finally:
+            self._pending.pop(call_id, None)
+
+    def handle_message(self, data: dict):
+        method = data["method"]
+        if data.get("host_id") == self.host_id:
+            return
+        if method == "heartbeat":
+            if data["host_id"] not in self.members:
+                self.members[data["host_id"]] = time.monotonic()
+                self._spawn(self._membership_changed())
+            else:
+                self.members[data["host_id"]] = time.monotonic()
+        elif data.get("target") != self.host_id:
+            return
+        elif method == "route":
+            self._spawn(self._serve(data))
+        elif method == "route_reply":
+            future = self._pending.get(data["id"])
+            if future is not None and not future.done():
+                if "error" in data:
+                    future.set_exception(RuntimeError(data["error"]))
+                else:
+                    future.set_result(data["result"])
+
+    async def _serve(self, data: dict):
+        reply = {"method": "route_reply", "host_id": self.host_id, "target": data["host_id"], "id": data["id"]}
+        try:
+            # Ownership may have moved while the call was in flight; run it where it belongs now
+            reply["result"] = await self.dispatch(data["name"], data["room"], *data["args"])
+        except Exception as exc:
+            logger.exception("Routed %s for room %s failed", data["name"], data["room"])
+            reply["error"] = str(exc)
+        try:
+            await self.manager._publish(reply)
+        except Exception as exc:
+            # E.g. a result too large or not picklable: the caller still hears about it now
+            logger.warning("Reply to %s for room %s not delivered: %s", data["name"], data["room"], exc)
+            if "error" not in reply:
+                reply.pop("result", None)
+                reply["error"] = f"Reply not delivered: {exc}"
+                try:
+                    await self.manager._publish(reply)
+                except Exception:
+                    logger.exception("Error reply for %s not delivered either", data["name"])
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _membership_changed(self):
+        logger.info("Cluster members: %s", sorted(self.members))
+        # Until membership settles nothing is owned here yet; startup takes over then
+        if self.on_membership_change is not None and self.settled.is_set():
+            await self.on_membership_change()
+
+    async def start(self):
+        if self.manager is None:
+            return
+        # The pub/sub listener normally starts with the first client connection; routed
+        # calls must be served before that
+        if not self.sio.manager_initialized:
+            self.sio.manager_initialized = True
+            self.sio.manager.initialize()
+        self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+    async def wait_settled(self):
+        """Wait until the other workers' heartbeats have had time to arrive."""
+        if not self.settled.is_set():
+            await asyncio.sleep(2 * self.heartbeat_interval)
+            self.settled.set()
+            logger.info("Cluster settled with members: %s", sorted(self.members))
+
+    async def stop(self):
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if isinstance(self.manager, UnixSocketPubSubManager):
+            self.manager.close()
+
+    async def _heartbeat_loop(self):
+        while True:
+            await self.manager._publish({"method": "heartbeat", "host_id": self.host_id})
+            expired = [
+                host for host, seen in self.members.items()
+                if time.monotonic() - seen > 3 * self.heartbeat_interval
+            ]
+            for host in expired:
+                del self.members[host]
+            if expired:
+                self._spawn(self._membership_changed())
+            await asyncio.sleep(self.heartbeat_interval)
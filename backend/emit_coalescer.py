@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def merge_deltas(pending: dict, delta: dict) -> dict:
+    """Fold a newer room delta into a pending one, keeping the first seq it covers."""
+    return {
+        **delta,
+        "from_seq": pending.get("from_seq", pending["seq"]),
+        "changes": {**pending["changes"], **delta["changes"]},
+    }
+
+
+class EmitCoalescer:
+    """Collapses bursts of the same room broadcast into one emit per window.
+
+    The first emit of an event to a room opens a `window`-second batch; later emits
+    of that event to the room replace (or, with a merge function, fold into) the
+    pending payload, which is broadcast once when the window closes. `collapsed`
+    counts the emits that never had to be sent on their own.
+    """
+
+    def __init__(self, sio, merge: Optional[Dict[str, Callable[[dict, dict], dict]]] = None):
+        self.sio = sio
+        self.merge = merge or {}
+        self.collapsed = 0
+        self._pending: Dict[str, Dict[str, dict]] = {}  # room -> event -> payload
+        self._flushers: Dict[str, asyncio.Task] = {}
+        self._sending: Dict[str, asyncio.Future] = {}  # room -> done when its flush is out
+
+    def pending(self) -> int:
+        return sum(len(events) for events in self._pending.values())
+
+    async def emit(self, event: str, data: dict, room: str, window: float):
+        events = self._pending.setdefault(room, {})
+        if event in events:
+            self.collapsed += 1
+            merge = self.merge.get(event)
+            data = merge(events[event], data) if merge else data
+        events[event] = data
+        if room not in self._flushers:
+            self._flushers[room] = asyncio.create_task(self._flush_later(room, window))
+
+    async def _flush_later(self, room: str, window: float):
+        await asyncio.sleep(window)
+        self._flushers.pop(room, None)
+        await self._emit_pending(room)
+
+    async def flush_room(self, room: str):
+        """Send anything pending for `room` now, e.g. before a direct broadcast to it.
+
+        Returns once every earlier coalesced emit of the room is out, so an emit made
+        right after it cannot overtake them.
+        """
+        flusher = self._flushers.pop(room, None)
+        if flusher is not None:
+            flusher.cancel()
+        await self._emit_pending(room)
+
+    async def _emit_pending(self, room: str):
+        while room in self._sending:
+            await asyncio.shield(self._sending[room])
+        events = self._pending.pop(room, None)
+        if not events:
+            return
+        done = self._sending[room] = asyncio.get_running_loop().create_future()
+        try:
+            # Dicts keep insertion order, so events go out in the order they were first queued
+            for event, data in events.items():
+                try:
+                    await self.sio.emit(event, data, room=room)
+                except Exception:
+                    logger.exception("Coalesced %s emit to %s failed", event, room)
+        finally:
+            del self._sending[room]
+            done.set_result(None)
@@ -0,0 +1,188 @@
+"""Append-only ledger of everything that happens in a room.
+
+`append` only queues the event; a background task writes queued events with one
+insert_many per batch. Events go into monthly collections (room_events_2026_10, ...),
+so old months can be dropped or moved without touching live ones. `replay` folds a
+room's events back into its state, e.g. to audit an auction or rebuild a room after a
+crash.
+"""
+import asyncio
+import itertools
+import logging
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "room_events"
+
+
+def partition_name(at: datetime) -> str:
+    return f"{PARTITION_PREFIX}_{at:%Y_%m}"
+
+
+class EventLog:
+    def __init__(self, db, flush_interval: float = 0.2, batch_size: int = 1000):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue: List[dict] = []
+        self._order = itertools.count()  # ties between events in the same millisecond
+        self._indexed: set = set()
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self._queue)
+
+    def append(self, room_code: str, type: str, **data):
+        self._queue.append({"room": room_code, "at": datetime.utcnow(), "n": next(self._order), "type": type, "data": data})
+        self._wakeup.set()
+
+    def start(self):
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_loop())
+
+    async def stop(self):
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        await self.flush()
+
+    async def flush(self):
+        while self._queue:
+            batch, self._queue = self._queue[:self.batch_size], self._queue[self.batch_size:]
+            try:
+                for name, events in _by_partition(batch):
+                    await self._ensure_index(name)
+                    await self._insert(name, events)
+            except Exception:
+                # Keep the batch for the next attempt; insert_many gave every event an _id,
+                # so the ones already written are rejected as duplicates then
+                self._queue[:0] = batch
+                raise
+
+    async def _insert(self, name: str, events: List[dict]):
+        try:
+            await self.db[name].insert_many(events, ordered=False)
+        except BulkWriteError as exc:
+            if exc.details.get("writeConcernErrors") or any(
+                error["code"] != 11000 for error in exc.details.get("writeErrors", [])
+            ):
+                raise
+
+    async def _ensure_index(self, name: str):
+        if name not in self._indexed:
+            await self.db[name].create_index([("room", ASCENDING), ("at", ASCENDING), ("n", ASCENDING)])
+            self._indexed.add(name)
+
+    async def _write_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Event log write failed")
+
+    async def events(self, room_code: str, until: Optional[datetime] = None):
+        """Yield a room's stored events in order, oldest partition first."""
+        names = sorted(n for n in await self.db.list_collection_names() if n.startswith(f"{PARTITION_PREFIX}_"))
+        query = {"room": room_code}
+        if until is not None:
+            query["at"] = {"$lte": until}
+        for name in names:
+            async for event in self.db[name].find(query, {"_id": 0}).sort([("at", ASCENDING), ("n", ASCENDING)]):
+                yield event
+
+
+def _by_partition(batch: List[dict]):
+    groups = {}
+    for event in batch:
+        groups.setdefault(partition_name(event["at"]), []).append(event)
+    return groups.items()
+
+
+def _initial_state() -> dict:
+    return {
+        "code": None,
+        "order_id": "",
+        "teams": {},
+        "auction_state": "waiting",
+        "current_player_index": 0,
+        "current_player_id": "",
+        "current_bid": 0,
+        "current_bidder_team_id": "",
+        "timer_end": None,
+        "lots": {},
+        "round": 0,
+        "sold_players": [],
+        "bids": 0,
+        "events": 0,
+    }
+
+
+def _show_lot(state: dict):
+    # The current_* fields follow the oldest open lot, as in the live room
+    player_id, lot = next(iter(state["lots"].items()))
+    state.update(
+        current_player_index=lot["index"], current_player_id=player_id, current_bid=lot["current_bid"],
+        current_bidder_team_id=lot["current_bidder_team_id"], timer_end=lot["timer_end"],
+    )
+
+
+def replay(events: Iterable[dict]) -> dict:
+    """Rebuild a room's state from its events.
+
+    Codes are reused once a room is archived, so each room_created starts over.
+    """
+    state = _initial_state()
+    for event in events:
+        data = event["data"]
+        kind = event["type"]
+        state["events"] += 1
+        if kind == "room_created":
+            state = _initial_state()
+            state.update(code=event["room"], order_id=data.get("order_id", ""), events=1)
+        elif kind == "team_joined":
+            state["teams"][data["team"]["id"]] = dict(data["team"])
+        elif kind == "team_resumed":
+            state["teams"][data["team_id"]]["owner_id"] = data["owner_id"]
+        elif kind == "auction_started":
+            state["auction_state"] = "active"
+            state["order_id"] = data.get("order_id", state["order_id"])
+        elif kind == "round_started":
+            state.update(round=data["round"], order_id=data["order_id"])
+        elif kind == "lot_opened":
+            state["lots"][data["player_id"]] = {
+                "index": data["index"], "current_bid": data["base_price"], "current_bidder_team_id": "",
+                "timer_end": data["timer_end"],
+            }
+            _show_lot(state)
+        elif kind == "bid":
+            state["bids"] += 1
+            # Bids recorded before parallel lots name no player: they are for the only lot
+            lot = state["lots"].get(data.get("player_id") or state["current_player_id"])
+            if lot is not None:
+                lot.update(current_bid=data["amount"], current_bidder_team_id=data["team_id"], timer_end=data["timer_end"])
+                _show_lot(state)
+        elif kind == "lot_closed":
+            team = state["teams"].get(data.get("team_id") or "")
+            if team is not None:
+                team["budget"] -= data["amount"]
+                team["players"] = [*team.get("players", []), data["player_id"]]
+                state["sold_players"].append(data["player_id"])
+            state["lots"].pop(data["player_id"], None)
+            if state["lots"]:
+                _show_lot(state)
+        elif kind == "auction_completed":
+            state.update(auction_state="completed", current_player_id="", current_bid=0, timer_end=None, lots={})
+    return state
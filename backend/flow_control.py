@@ -0,0 +1,137 @@
+"""Inbound rate limits and bounded outbound queues for Socket.IO clients.
+
+`RateLimiter` keeps one token bucket per key (a sid or a room code). A check is a dict
+lookup and a little arithmetic, so a flooding client is turned away before any
+room, session or database work. `install_send_queues` bounds the queue that
+Engine.IO keeps for each connection. Without a bound, a slow consumer's queue grows
+with every broadcast. When the bound is reached, the oldest queued message is
+dropped, or the connection is closed, depending on the policy.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from engineio import packet as eio_packet
+
+DROP_OLDEST = "drop-oldest"
+DISCONNECT = "disconnect"
+POLICIES = (DROP_OLDEST, DISCONNECT)
+
+
+class RateLimiter:
+    """Token buckets: `burst` tokens each, refilled at `rate` per second; rate <= 0 disables."""
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.clock = clock
+        self._buckets: Dict[Hashable, Tuple[float, float]] = {}  # key -> (tokens, updated at)
+        self._prune_at = 1024
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def allow(self, key: Hashable, cost: float = 1.0) -> bool:
+        if self.rate <= 0:
+            return True
+        now = self.clock()
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        allowed = tokens >= cost
+        self._buckets[key] = (tokens - cost if allowed else tokens, now)
+        if len(self._buckets) > self._prune_at:
+            self._prune(now)
+        return allowed
+
+    def discard(self, key: Hashable):
+        self._buckets.pop(key, None)
+
+    def _prune(self, now: float):
+        # A bucket that has refilled completely is the same as no bucket
+        full_after = self.burst / self.rate
+        self._buckets = {key: value for key, value in self._buckets.items() if now - value[1] < full_after}
+        self._prune_at = max(1024, 2 * len(self._buckets))
+
+
+def _attachments(pkt) -> int:
+    """Binary attachments that follow a Socket.IO packet (BINARY_EVENT/BINARY_ACK) on the wire."""
+    data = pkt.data
+    if isinstance(data, str) and data[:1] in ("5", "6"):
+        dash = data.find("-")
+        if dash > 1:
+            return int(data[1:dash])
+    return 0
+
+
+class BoundedSendQueue(asyncio.Queue):
+    """An Engine.IO send queue bounded at about `limit` packets.
+
+    Puts never block (the broadcaster must not wait for a slow client). Past the limit,
+    `drop-oldest` discards the oldest whole Socket.IO message: the packet plus its
+    binary attachments. Pings and other control packets are kept. `disconnect` throws
+    away everything queued and queues the sentinel that makes Engine.IO close the
+    connection.
+    """
+
+    def __init__(self, limit: int, policy: str = DROP_OLDEST, on_overflow: Optional[Callable[[str], None]] = None):
+        super().__init__()
+        self.limit = limit
+        self.policy = policy
+        self.on_overflow = on_overflow
+        self.closing = False
+
+    def put_nowait(self, item):
+        if item is None:
+            super().put_nowait(item)
+            return
+        if self.closing:
+            return
+        if self.qsize() >= self.limit:
+            if self.policy == DISCONNECT:
+                dropped = len(self._queue)
+                self._queue.clear()
+                self._settle(dropped)
+                self.closing = True
+                super().put_nowait(None)
+                self._overflowed()
+                return
+            if self._drop_oldest():
+                self._overflowed()
+        super().put_nowait(item)
+
+    def _drop_oldest(self) -> bool:
+        items = self._queue
+        for start, pkt in enumerate(items):
+            if pkt is None:
+                return False
+            if pkt.packet_type != eio_packet.MESSAGE or pkt.binary:
+                # Control packets stay, and so do attachments whose header was already sent
+                continue
+            count = 1 + _attachments(pkt)
+            if start + count > len(items):
+                # The rest of this message is still being queued
+                return False
+            for _ in range(count):
+                del items[start]
+            self._settle(count)
+            return True
+        return False
+
+    def _settle(self, count: int):
+        # Dropped items are never fetched and marked done; account for them so join() returns
+        self._unfinished_tasks -= count
+        if self._unfinished_tasks <= 0:
+            self._unfinished_tasks = 0
+            self._finished.set()
+
+    def _overflowed(self):
+        if self.on_overflow is not None:
+            self.on_overflow(self.policy)
+
+
+def install_send_queues(sio, limit: int, policy: str = DROP_OLDEST, on_overflow: Optional[Callable[[str], None]] = None):
+    """Give every new connection of `sio` a BoundedSendQueue; limit <= 0 leaves queues unbounded."""
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown send queue policy: {policy}")
+    if limit > 0:
+        sio.eio.create_queue = lambda *args, **kwargs: BoundedSendQueue(limit, policy, on_overflow)
@@ -0,0 +1,71 @@
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Optional
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is
+# emitted as a structured field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update((k, v) for k, v in vars(record).items() if k not in _RECORD_ATTRS)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class Sampler:
+    """Lets through one call in every `1 / rate`, for logging hot-path events."""
+
+    def __init__(self, rate: float):
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._calls = itertools.count()
+
+    def __call__(self) -> bool:
+        return self.every > 0 and next(self._calls) % self.every == 0
+
+
+class LogSettings:
+    def __init__(self):
+        self.level = os.environ.get("LOG_LEVEL", "INFO").upper()
+        self.format = os.environ.get("LOG_FORMAT", "text")
+        # Per-packet Socket.IO/Engine.IO logging formats every message of every client
+        self.socketio = os.environ.get("SIO_LOGGING", "off") == "on"
+        self.event_sample_rate = float(os.environ.get("LOG_EVENT_SAMPLE_RATE", "0.01"))
+        self.listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging() -> LogSettings:
+    """Route all logging through a queue so the event loop never blocks on writes.
+
+    Handlers attached to the root logger only enqueue records; a QueueListener thread
+    formats them and writes to stderr.
+    """
+    settings = LogSettings()
+    output = logging.StreamHandler()
+    if settings.format == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(settings.level)
+
+    settings.listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    settings.listener.start()
+    return settings
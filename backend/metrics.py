@@ -0,0 +1,223 @@
+"""In-process metrics exported in the Prometheus text format.
+
+Everything on the hot path is a plain list or dict update on the event loop, with no
+locks and no allocation beyond the first sample of a label set. Histograms use fixed
+bucket bounds, so recording a sample is one bisect and two additions. Mongo command
+timings arrive on driver threads and are handed over through a deque, which is safe
+to append to from any thread; they are folded into histograms when metrics are read.
+"""
+import collections
+import functools
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Optional, Tuple
+
+from pymongo import monitoring
+
+# Seconds; covers sub-millisecond in-memory handlers up to multi-second Mongo stalls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class RateMeter:
+    """Events per second over a sliding window of one-second buckets."""
+
+    def __init__(self, window: int = 10):
+        self.window = window
+        self._buckets: collections.deque = collections.deque()  # [second, count]
+
+    def mark(self, n: int = 1):
+        second = int(time.monotonic())
+        if self._buckets and self._buckets[-1][0] == second:
+            self._buckets[-1][1] += n
+        else:
+            self._buckets.append([second, n])
+            if len(self._buckets) > self.window:
+                self._buckets.popleft()
+
+    def rate(self) -> float:
+        horizon = int(time.monotonic()) - self.window
+        return sum(count for second, count in self._buckets if second > horizon) / self.window
+
+
+class Metrics:
+    def __init__(self, prefix: str = "crickbid"):
+        self.prefix = prefix
+        self._help: Dict[str, Tuple[str, str]] = {}  # name -> (type, help)
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._callbacks: Dict[str, Callable[[], float]] = {}
+        self._inbox: collections.deque = collections.deque(maxlen=100_000)
+
+    def _declare(self, name: str, kind: str, help: str):
+        self._help.setdefault(name, (kind, help))
+
+    def histogram(self, name: str, help: str):
+        self._declare(name, "histogram", help)
+        series = self._histograms.setdefault(name, {})
+
+        def observe(seconds: float, **labels):
+            key = tuple(labels.items())
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(seconds)
+        return observe
+
+    def counter(self, name: str, help: str):
+        self._declare(name, "counter", help)
+        series = self._counters.setdefault(name, {})
+
+        def inc(n: float = 1, **labels):
+            key = tuple(labels.items())
+            series[key] = series.get(key, 0) + n
+        return inc
+
+    def gauge(self, name: str, help: str, read: Callable[[], float], kind: str = "gauge"):
+        """Register a value computed when metrics are scraped (a gauge or a running total)."""
+        self._declare(name, kind, help)
+        self._callbacks[name] = read
+
+    def observe_threadsafe(self, name: str, seconds: float, **labels):
+        self._inbox.append((name, seconds, labels))
+
+    def _drain(self):
+        while self._inbox:
+            name, seconds, labels = self._inbox.popleft()
+            series = self._histograms[name]
+            key = tuple(labels.items())
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(seconds)
+
+    def render(self) -> str:
+        self._drain()
+        lines = []
+        for name, (kind, help) in self._help.items():
+            full = f"{self.prefix}_{name}"
+            lines.append(f"# HELP {full} {help}")
+            lines.append(f"# TYPE {full} {kind}")
+            if name in self._callbacks:
+                lines.append(f"{full} {_number(self._callbacks[name]())}")
+            elif kind == "counter":
+                for labels, value in self._counters[name].items():
+                    lines.append(f"{full}{_labels(labels)} {_number(value)}")
+            else:
+                for labels, histogram in self._histograms[name].items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.bounds + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{full}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{full}_sum{_labels(labels)} {_number(histogram.sum)}")
+                    lines.append(f"{full}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Times every driver command by collection and operation; pass to the client's event_listeners."""
+
+    def __init__(self, metrics: Metrics, name: str = "mongo_command_seconds"):
+        self.metrics = metrics
+        self.name = name
+        metrics.histogram(name, "MongoDB command latency by collection and operation")
+        self._started: Dict[Tuple[int, int], Tuple[str, str]] = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = ""
+        self._started[(event.request_id, event.operation_id)] = (collection, event.command_name)
+
+    def _finished(self, event, outcome: str):
+        collection, op = self._started.pop((event.request_id, event.operation_id), ("", event.command_name))
+        self.metrics.observe_threadsafe(
+            self.name, event.duration_micros / 1e6, collection=collection, op=op, outcome=outcome
+        )
+
+    def succeeded(self, event):
+        self._finished(event, "ok")
+
+    def failed(self, event):
+        self._finished(event, "error")
+
+
+def instrument_socketio(sio, observe: Callable, namespace: str = "/"):
+    """Wrap the registered event handlers of `namespace` to record latency by event name.
+
+    connect/disconnect are left alone: Socket.IO picks their call signature by retrying
+    on TypeError, which a generic wrapper would hide.
+    """
+    for event, handler in list(sio.handlers.get(namespace, {}).items()):
+        if event not in ("connect", "disconnect"):
+            sio.handlers[namespace][event] = _timed(handler, observe, event)
+
+
+def _timed(handler, observe, event):
+    @functools.wraps(handler)
+    async def timed(*args):
+        started = time.perf_counter()
+        try:
+            return await handler(*args)
+        finally:
+            observe(time.perf_counter() - started, event=event)
+    return timed
+
+
+class RouteTimingMiddleware:
+    """ASGI middleware recording HTTP latency by route template, method and status."""
+
+    def __init__(self, app, observe: Callable):
+        self.app = app
+        self.observe = observe
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status: Optional[int] = None
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            # Label by the route template so path parameters do not explode cardinality
+            path = getattr(route, "path", None) or "unmatched"
+            self.observe(
+                time.perf_counter() - started, route=path, method=scope["method"], status=str(status or 500)
+            )
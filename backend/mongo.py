@@ -0,0 +1,159 @@
+"""MongoDB client settings, lazy creation and pool monitoring.
+
+Importing the server only describes the client. It is built on first use, so tools and
+tests that import the module never start pool monitors or resolve hosts. Pool size,
+timeouts and write concern come from the environment:
+
+    MONGO_MAX_POOL_SIZE              connections per host (default 100)
+    MONGO_MIN_POOL_SIZE              connections kept open when idle (default 0)
+    MONGO_MAX_IDLE_TIME_MS           close pooled connections idle this long
+    MONGO_CONNECT_TIMEOUT_MS         TCP connect timeout (default 5000)
+    MONGO_SERVER_SELECTION_TIMEOUT_MS  wait for a usable server (default 5000)
+    MONGO_SOCKET_TIMEOUT_MS          per-operation socket timeout (default none)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS      wait for a free pooled connection (default none)
+    MONGO_WRITE_CONCERN              w: a number or "majority" (default 1)
+    MONGO_JOURNAL                    "true" to wait for the journal on writes
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from motor import motor_asyncio
+from pymongo import monitoring
+
+INT_OPTIONS = {
+    "maxPoolSize": "MONGO_MAX_POOL_SIZE",
+    "minPoolSize": "MONGO_MIN_POOL_SIZE",
+    "maxIdleTimeMS": "MONGO_MAX_IDLE_TIME_MS",
+    "connectTimeoutMS": "MONGO_CONNECT_TIMEOUT_MS",
+    "serverSelectionTimeoutMS": "MONGO_SERVER_SELECTION_TIMEOUT_MS",
+    "socketTimeoutMS": "MONGO_SOCKET_TIMEOUT_MS",
+    "waitQueueTimeoutMS": "MONGO_WAIT_QUEUE_TIMEOUT_MS",
+}
+DEFAULTS = {"maxPoolSize": 100, "minPoolSize": 0, "connectTimeoutMS": 5000, "serverSelectionTimeoutMS": 5000}
+
+
+def client_options(environ=os.environ) -> dict:
+    options = dict(DEFAULTS)
+    for option, name in INT_OPTIONS.items():
+        if environ.get(name):
+            options[option] = int(environ[name])
+    w = environ.get("MONGO_WRITE_CONCERN")
+    if w:
+        options["w"] = int(w) if w.isdigit() else w
+    if environ.get("MONGO_JOURNAL", "").lower() == "true":
+        options["journal"] = True
+    return options
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Counts open and checked-out pooled connections; events arrive on driver threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+
+    def _add(self, field: str, delta: int):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + delta)
+
+    def connection_created(self, event):
+        self._add("open", 1)
+
+    def connection_closed(self, event):
+        self._add("open", -1)
+
+    def connection_checked_out(self, event):
+        self._add("checked_out", 1)
+
+    def connection_checked_in(self, event):
+        self._add("checked_out", -1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+
+class Mongo:
+    """The process's Motor client, created on first use with `client_options()`."""
+
+    def __init__(self, url: str, db_name: str, event_listeners: Optional[List] = None, options: Optional[dict] = None):
+        self.url = url
+        self.db_name = db_name
+        self.options = client_options() if options is None else options
+        self.pool = PoolMonitor()
+        self.event_listeners = [*(event_listeners or []), self.pool]
+        self._client = None
+        self.db = LazyDatabase(self)
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = motor_asyncio.AsyncIOMotorClient(
+                self.url, event_listeners=self.event_listeners, **self.options
+            )
+        return self._client
+
+    @property
+    def created(self) -> bool:
+        return self._client is not None
+
+    async def ping(self) -> float:
+        """Round-trip time of a ping command, in seconds."""
+        started = time.perf_counter()
+        await self.client[self.db_name].command("ping")
+        return time.perf_counter() - started
+
+    def pool_stats(self) -> Dict[str, float]:
+        size = self.options.get("maxPoolSize") or 0
+        return {
+            "open": self.pool.open,
+            "checked_out": self.pool.checked_out,
+            "max_pool_size": size,
+            "utilization": self.pool.checked_out / size if size else 0.0,
+        }
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+class LazyDatabase:
+    """Stands in for the Motor database until something touches it."""
+
+    __slots__ = ("_mongo", "_db")
+
+    def __init__(self, mongo: Mongo):
+        self._mongo = mongo
+        self._db = None
+
+    def _database(self):
+        if self._db is None or self._mongo._client is None:
+            self._db = self._mongo.client[self._mongo.db_name]
+        return self._db
+
+    def __getattr__(self, name):
+        return getattr(self._database(), name)
+
+    def __getitem__(self, name):
+        return self._database()[name]
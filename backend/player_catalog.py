@@ -0,0 +1,71 @@
+import hashlib
+import json
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+CATALOG_META_ID = "players"
+
+
+async def bump_catalog_version(db):
+    """Mark the players collection as changed so every process reloads its catalog."""
+    await db.catalog_meta.update_one({"_id": CATALOG_META_ID}, {"$inc": {"version": 1}}, upsert=True)
+
+
+class PlayerCatalog:
+    """Process-level, read-only view of the players collection.
+
+    Loaded once and kept in memory with id/role/country/rating indexes and a
+    pre-serialized JSON body for /api/players. A version stamp in `catalog_meta` is
+    checked at most every `check_interval` seconds and triggers a reload when it moves.
+    """
+
+    def __init__(self, db, check_interval: float = 5.0):
+        self.db = db
+        self.check_interval = check_interval
+        self.version = None
+        self.players: List[dict] = []
+        self.ids: Tuple[str, ...] = ()
+        self.by_id: Dict[str, dict] = {}
+        self.by_role: Dict[str, List[dict]] = {}
+        self.by_country: Dict[str, List[dict]] = {}
+        self.by_rating: Dict[int, List[dict]] = {}
+        self.json_body = b"[]"
+        self.etag = '"empty"'
+        self._checked_at = 0.0
+
+    def get(self, player_id: str) -> Optional[dict]:
+        return self.by_id.get(player_id)
+
+    async def _stored_version(self) -> int:
+        meta = await self.db.catalog_meta.find_one({"_id": CATALOG_META_ID})
+        return meta["version"] if meta else 0
+
+    async def load(self):
+        version = await self._stored_version()
+        players = await self.db.players.find({}, {"_id": 0}).to_list(None)
+
+        by_role, by_country, by_rating = defaultdict(list), defaultdict(list), defaultdict(list)
+        for player in players:
+            by_role[player["role"]].append(player)
+            by_country[player["country"]].append(player)
+            by_rating[player["rating"]].append(player)
+
+        body = json.dumps(players, separators=(",", ":")).encode()
+        self.players = players
+        self.ids = tuple(player["id"] for player in players)
+        self.by_id = {player["id"]: player for player in players}
+        self.by_role = dict(by_role)
+        self.by_country = dict(by_country)
+        self.by_rating = dict(by_rating)
+        self.json_body = body
+        self.etag = f'"{version}-{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        self.version = version
+        self._checked_at = time.monotonic()
+
+    async def ensure_fresh(self):
+        if self.version is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return
+        self._checked_at = time.monotonic()
+        if self.version is None or await self._stored_version() != self.version:
+            await self.load()
@@ -0,0 +1,236 @@
+"""Streaming, idempotent import of player catalogs.
+
+Rows are read from CSV or JSONL in chunks on a worker thread, validated a chunk at a
+time, and upserted with unordered bulk writes keyed on the natural key (name, country).
+New players get an id derived from that key, so re-running an import, or importing on
+another machine, neither duplicates players nor changes the ids rooms refer to. The
+read and validation of the next chunk overlap with the write of the current one.
+
+    python player_import.py players.csv [--chunk-size 5000]
+"""
+import asyncio
+import csv
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from player_catalog import bump_catalog_version
+
+logger = logging.getLogger(__name__)
+
+PLAYER_NAMESPACE = uuid.UUID("5b2f8a59-2c9c-4d0a-9d55-3f1b6c7e0a41")
+ROLES = {"batsman", "bowler", "all-rounder", "wicket-keeper"}
+PLAYER_FIELDS = ("name", "role", "base_price", "country", "rating")
+IMPORT_META_ID = "players_import"
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def player_id(name: str, country: str) -> str:
+    return str(uuid.uuid5(PLAYER_NAMESPACE, f"{name.strip().lower()}|{country.strip().lower()}"))
+
+
+def read_rows(path: Path) -> Iterator[dict]:
+    with open(path, newline="", encoding="utf-8") as source:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(source)
+
+
+def _number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return value
+    return int(number) if number.is_integer() else number
+
+
+def validate_chunk(rows: List[dict]) -> Tuple[List[dict], List[str]]:
+    """Normalize a chunk of raw rows into player documents; returns (players, errors)."""
+    players, errors = [], []
+    for row in rows:
+        try:
+            name = str(row["name"]).strip()
+            country = str(row["country"]).strip()
+            role = str(row["role"]).strip().lower()
+            base_price = float(row["base_price"])
+            rating = int(float(row["rating"]))
+        except (KeyError, TypeError, ValueError) as exc:
+            errors.append(f"{row!r}: {exc!r}")
+            continue
+        if not name or not country or role not in ROLES or base_price < 0 or not 1 <= rating <= 5:
+            errors.append(f"{row!r}: out of range")
+            continue
+        # Columns beyond the player fields (CSV) or an explicit stats object (JSONL)
+        stats = row.get("stats")
+        if not isinstance(stats, dict):
+            stats = {k: _number(v) for k, v in row.items() if k not in PLAYER_FIELDS and k != "id" and v not in ("", None)}
+        players.append({
+            "name": name, "role": role, "base_price": base_price,
+            "country": country, "rating": rating, "stats": stats,
+        })
+    return players, errors
+
+
+def _upserts(players: List[dict]) -> List[UpdateOne]:
+    return [
+        UpdateOne(
+            {"name": player["name"], "country": player["country"]},
+            {"$set": player, "$setOnInsert": {"id": player_id(player["name"], player["country"])}},
+            upsert=True,
+        )
+        for player in players
+    ]
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.invalid = 0
+        self.upserted = 0
+        self.modified = 0
+        self.seconds = 0.0
+        self.errors: List[str] = []  # first few, for the log
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.rows} rows ({self.invalid} invalid) in {self.seconds:.2f}s, "
+                f"{self.rows_per_sec:.0f} rows/s: {self.upserted} new, {self.modified} updated")
+
+
+async def import_players(db, rows: Iterable[dict], chunk_size: int = DEFAULT_CHUNK_SIZE) -> ImportReport:
+    report = ImportReport()
+    started = time.perf_counter()
+    rows = iter(rows)
+
+    def next_chunk():
+        chunk = list(islice(rows, chunk_size))
+        return len(chunk), validate_chunk(chunk)
+
+    async def write(operations):
+        result = await db.players.bulk_write(operations, ordered=False)
+        report.upserted += result.upserted_count
+        report.modified += result.modified_count
+
+    writing: Optional[asyncio.Task] = None
+    try:
+        while True:
+            count, (players, errors) = await asyncio.to_thread(next_chunk)
+            if writing is not None:
+                await writing
+                writing = None
+            if not count:
+                break
+            report.rows += count
+            report.invalid += len(errors)
+            report.errors.extend(errors[:max(0, 10 - len(report.errors))])
+            if players:
+                writing = asyncio.create_task(write(_upserts(players)))
+            logger.debug("Imported %d rows so far", report.rows)
+    finally:
+        if writing is not None:
+            writing.cancel()
+
+    report.seconds = time.perf_counter() - started
+    if report.upserted or report.modified:
+        await bump_catalog_version(db)
+    return report
+
+
+async def import_file(db, path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE, force: bool = False) -> Optional[ImportReport]:
+    """Import `path` unless this exact file was the last one imported."""
+    stat = path.stat()
+    fingerprint = {"path": str(path.resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    last = await db.catalog_meta.find_one({"_id": IMPORT_META_ID}, {"_id": 0})
+    if not force and last == fingerprint:
+        return None
+    report = await import_players(db, read_rows(path), chunk_size)
+    await db.catalog_meta.replace_one({"_id": IMPORT_META_ID}, fingerprint, upsert=True)
+    return report
+
+
+# Built-in catalog for fresh databases without an import file
+STAR_PLAYERS = [
+    ("Virat Kohli", "batsman", 1500, 5, "India"), ("Rohit Sharma", "batsman", 1400, 5, "India"),
+    ("KL Rahul", "wicket-keeper", 1100, 4, "India"), ("Hardik Pandya", "all-rounder", 1500, 5, "India"),
+    ("Jasprit Bumrah", "bowler", 1200, 5, "India"), ("Mohammed Shami", "bowler", 900, 4, "India"),
+    ("Ravindra Jadeja", "all-rounder", 1600, 5, "India"), ("Rishabh Pant", "wicket-keeper", 1600, 5, "India"),
+    ("Shubman Gill", "batsman", 800, 4, "India"), ("Yuzvendra Chahal", "bowler", 600, 4, "India"),
+    ("Bhuvneshwar Kumar", "bowler", 400, 3, "India"), ("Ishan Kishan", "wicket-keeper", 1520, 4, "India"),
+    ("Shreyas Iyer", "batsman", 1225, 4, "India"), ("Suryakumar Yadav", "batsman", 800, 4, "India"),
+    ("Washington Sundar", "all-rounder", 325, 3, "India"), ("Axar Patel", "all-rounder", 900, 4, "India"),
+    ("Mohammed Siraj", "bowler", 600, 4, "India"), ("Kuldeep Yadav", "bowler", 200, 3, "India"),
+    ("Deepak Chahar", "bowler", 1400, 3, "India"), ("Sanju Samson", "wicket-keeper", 1400, 4, "India"),
+    ("Prithvi Shaw", "batsman", 750, 3, "India"), ("Mayank Agarwal", "batsman", 1200, 3, "India"),
+    ("Shikhar Dhawan", "batsman", 850, 4, "India"), ("Dinesh Karthik", "wicket-keeper", 550, 3, "India"),
+    ("Krunal Pandya", "all-rounder", 850, 3, "India"), ("Rahul Chahar", "bowler", 525, 3, "India"),
+    ("Jos Buttler", "wicket-keeper", 1000, 5, "England"), ("Ben Stokes", "all-rounder", 1650, 5, "England"),
+    ("Jason Roy", "batsman", 200, 4, "England"), ("Liam Livingstone", "all-rounder", 1150, 4, "England"),
+    ("Jonny Bairstow", "wicket-keeper", 675, 4, "England"), ("Sam Curran", "all-rounder", 1850, 4, "England"),
+    ("David Warner", "batsman", 650, 5, "Australia"), ("Steve Smith", "batsman", 220, 5, "Australia"),
+    ("Glenn Maxwell", "all-rounder", 1100, 4, "Australia"), ("Pat Cummins", "bowler", 750, 5, "Australia"),
+    ("Mitchell Starc", "bowler", 2475, 5, "Australia"), ("Josh Hazlewood", "bowler", 175, 4, "Australia"),
+    ("Marcus Stoinis", "all-rounder", 900, 3, "Australia"), ("Aaron Finch", "batsman", 150, 4, "Australia"),
+    ("Kane Williamson", "batsman", 200, 5, "New Zealand"), ("Trent Boult", "bowler", 800, 4, "New Zealand"),
+    ("Mitchell Santner", "all-rounder", 200, 3, "New Zealand"), ("Tim Southee", "bowler", 150, 4, "New Zealand"),
+    ("Quinton de Kock", "wicket-keeper", 675, 4, "South Africa"), ("Kagiso Rabada", "bowler", 950, 5, "South Africa"),
+    ("Anrich Nortje", "bowler", 650, 4, "South Africa"), ("Aiden Markram", "batsman", 200, 4, "South Africa"),
+    ("Babar Azam", "batsman", 200, 5, "Pakistan"), ("Shaheen Afridi", "bowler", 800, 5, "Pakistan"),
+    ("Mohammad Rizwan", "wicket-keeper", 200, 4, "Pakistan"), ("Rashid Khan", "bowler", 1500, 5, "Afghanistan"),
+]
+FILLER_COUNTRIES = [
+    "India", "England", "Australia", "South Africa", "New Zealand",
+    "Pakistan", "West Indies", "Sri Lanka", "Bangladesh", "Afghanistan",
+]
+
+
+def default_rows(filler: int = 148, seed: int = 0) -> Iterator[dict]:
+    """The star players plus `filler` generated ones, identical for the same seed."""
+    for name, role, price, rating, country in STAR_PLAYERS:
+        yield {"name": name, "role": role, "base_price": price, "country": country, "rating": rating}
+    rng = random.Random(seed)
+    roles = sorted(ROLES)
+    for i in range(filler):
+        yield {
+            "name": f"Player {i + 1}",
+            "role": rng.choice(roles),
+            "base_price": rng.randint(20, 800),
+            "rating": rng.randint(2, 4),
+            "country": rng.choice(FILLER_COUNTRIES),
+        }
+
+
+def main():
+    import argparse
+
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Import a CSV/JSONL player catalog")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / ".env")
+    db = AsyncIOMotorClient(os.environ["MONGO_URL"])[os.environ["DB_NAME"]]
+    report = asyncio.run(import_file(db, args.path, args.chunk_size, force=True))
+    print(report)
+    for error in report.errors:
+        print(f"invalid: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import base64
+import json
+from typing import List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+SORT_FIELDS = ("name", "rating", "base_price")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Equality filters (role, country) first, then the sort/range field, then id as the
+# keyset tie-breaker, so every filtered page is a bounded index range scan
+PLAYER_INDEXES = [
+    IndexModel([("id", ASCENDING)], unique=True),
+    IndexModel([("role", ASCENDING), ("rating", ASCENDING), ("id", ASCENDING)]),
+    IndexModel([("role", ASCENDING), ("base_price", ASCENDING), ("id", ASCENDING)]),
+    IndexModel([("country", ASCENDING), ("rating", ASCENDING), ("id", ASCENDING)]),
+    IndexModel([("country", ASCENDING), ("base_price", ASCENDING), ("id", ASCENDING)]),
+    IndexModel([("rating", ASCENDING), ("id", ASCENDING)]),
+    IndexModel([("base_price", ASCENDING), ("id", ASCENDING)]),
+    IndexModel([("name", ASCENDING), ("id", ASCENDING)]),
+    # Natural key the catalog import upserts on
+    IndexModel([("name", ASCENDING), ("country", ASCENDING)], unique=True),
+]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+async def ensure_player_indexes(db):
+    await db.players.create_indexes(PLAYER_INDEXES)
+
+
+def parse_sort(sort: Optional[str]) -> Tuple[str, int]:
+    """Turn `rating` / `-base_price` style sort strings into (field, direction)."""
+    if not sort:
+        return "id", ASCENDING
+    field, direction = (sort[1:], DESCENDING) if sort.startswith("-") else (sort, ASCENDING)
+    if field not in SORT_FIELDS:
+        raise ValueError(f"Cannot sort by {field}")
+    return field, direction
+
+
+def encode_cursor(player: dict, field: str) -> str:
+    raw = json.dumps([player[field], player["id"]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        value, player_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    return [value, player_id]
+
+
+def build_player_query(
+    role: Optional[str] = None,
+    country: Optional[str] = None,
+    min_rating: Optional[int] = None,
+    max_rating: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+) -> dict:
+    query = {}
+    if role:
+        query["role"] = role
+    if country:
+        query["country"] = country
+    rating = {k: v for k, v in (("$gte", min_rating), ("$lte", max_rating)) if v is not None}
+    if rating:
+        query["rating"] = rating
+    price = {k: v for k, v in (("$gte", min_price), ("$lte", max_price)) if v is not None}
+    if price:
+        query["base_price"] = price
+    return query
+
+
+async def find_players_page(
+    players, query: dict, sort: Optional[str], limit: int, cursor: Optional[str]
+) -> Tuple[List[dict], Optional[str]]:
+    """Return one keyset page of players matching `query` and the cursor for the next one."""
+    field, direction = parse_sort(sort)
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        op = "$gt" if direction == ASCENDING else "$lt"
+        if field == "id":
+            after = {"id": {op: last_id}}
+        else:
+            after = {"$or": [{field: {op: value}}, {field: value, "id": {op: last_id}}]}
+        query = {"$and": [query, after]} if query else after
+
+    order = [(field, direction)] if field == "id" else [(field, direction), ("id", direction)]
+    page = await players.find(query, {"_id": 0}).sort(order).limit(limit + 1).to_list(limit + 1)
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1], field)
+    return page, next_cursor
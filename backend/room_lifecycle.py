@@ -0,0 +1,99 @@
+"""Room codes, expiry and archival.
+
+Live rooms are looked up by `code` through a unique index, so lookups cost the same
+however many rooms have existed. A room that never starts is deleted by a TTL index
+on `expires_at`. Starting an auction clears the expiry, and a completed auction is
+moved into `room_archive` in a compact form, which frees its code.
+"""
+import logging
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+logger = logging.getLogger(__name__)
+
+ROOM_INDEXES = [
+    IndexModel([("code", ASCENDING)], unique=True),
+    IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    # restore_timers scans active rooms at startup
+    IndexModel([("auction_state", ASCENDING)]),
+]
+ARCHIVE_INDEXES = [
+    IndexModel([("code", ASCENDING), ("completed_at", DESCENDING)]),
+]
+
+
+class RoomCodesExhausted(RuntimeError):
+    pass
+
+
+async def ensure_room_indexes(db):
+    try:
+        await db.rooms.create_indexes(ROOM_INDEXES)
+    except OperationFailure:
+        # Typically duplicate codes left from before the unique index; rooms still work
+        logger.exception("Could not create room indexes")
+    await db.room_archive.create_indexes(ARCHIVE_INDEXES)
+
+
+async def insert_room(db, room_doc: dict, waiting_ttl: timedelta, digits: int = 6, attempts: int = 10) -> str:
+    """Insert `room_doc` under a fresh random code, retrying on collisions."""
+    low = 10 ** (digits - 1)
+    room_doc = {**room_doc, "created_at": datetime.utcnow(), "expires_at": datetime.utcnow() + waiting_ttl}
+    for _ in range(attempts):
+        room_doc["code"] = str(low + secrets.randbelow(9 * low))
+        room_doc.pop("_id", None)
+        try:
+            await db.rooms.insert_one(room_doc)
+        except DuplicateKeyError:
+            continue
+        return room_doc["code"]
+    raise RoomCodesExhausted(f"No free {digits}-digit room code after {attempts} attempts")
+
+
+async def mark_started(db, code: str, **fields):
+    # Running auctions finish on their own (every lot has a timer), so they never expire
+    update = {"$unset": {"expires_at": ""}}
+    if fields:
+        update["$set"] = fields
+    await db.rooms.update_one({"code": code}, update)
+
+
+def compact_room(doc: dict, stats: Optional[dict] = None) -> dict:
+    return {
+        "_id": doc.get("id") or doc["code"],
+        "code": doc["code"],
+        "created_at": doc.get("created_at"),
+        "completed_at": datetime.utcnow(),
+        "order_id": doc.get("order_id", ""),
+        "player_count": doc.get("player_count", 0),
+        "sold_players": doc.get("sold_players", []),
+        "teams": [
+            {
+                "id": t["id"], "name": t["name"], "budget": t.get("budget"), "players": t.get("players", []),
+                "roles": t.get("roles", {}), "spent": t.get("spent", 0.0),
+            }
+            for t in doc.get("teams", [])
+        ],
+        "stats": stats,
+    }
+
+
+async def archive_room(db, code: str, stats: Optional[dict] = None) -> bool:
+    """Move a completed room into the archive, with its final stats; False when it is not completed."""
+    doc = await db.rooms.find_one({"code": code, "auction_state": "completed"}, {"_id": 0, "players_pool": 0})
+    if doc is None:
+        return False
+    archived = compact_room(doc, stats)
+    await db.room_archive.replace_one({"_id": archived["_id"]}, archived, upsert=True)
+    await db.rooms.delete_one({"code": code, "auction_state": "completed"})
+    return True
+
+
+async def find_archived(db, code: str) -> Optional[dict]:
+    cursor = db.room_archive.find({"code": code}, {"_id": 0}).sort("completed_at", DESCENDING).limit(1)
+    archived = await cursor.to_list(1)
+    return archived[0] if archived else None
@@ -1,36 +1,199 @@
-from fastapi import FastAPI, APIRouter
+import time
+STARTED = time.perf_counter()  # cold start is measured from the first import
+
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.responses import JSONResponse, StreamingResponse
 import socketio
 import os
+import json
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, List, Optional
 import uuid
+import secrets
 from datetime import datetime, timedelta
 import asyncio
-import random
+
+from auction_orders import AuctionOrders
+from auction_engine import (
+    BID_TIMER_SECONDS, MAX_PARALLEL_LOTS, MAX_TEAMS_PER_ROOM, ROOM_STATE_PROJECTION, UNSOLD_LOT_SECONDS,
+    AuctionEngine, BidRejected,
+)
+from auction_ordering import SET, SHUFFLE, STRATEGIES, order_player_ids, unsold_player_ids
+from auction_stats import GLOBAL_ID, AuctionStats, room_stats_id, summarize
+from auction_timers import TimerScheduler
+from bot_bidders import BotBidders, is_bot, new_bot_sid
+from cluster import Cluster, create_client_manager
+from event_log import EventLog, replay
+from flow_control import DROP_OLDEST, RateLimiter, install_send_queues
+from emit_coalescer import EmitCoalescer, merge_deltas
+from logging_setup import Sampler, configure_logging
+from mongo import Mongo
+from metrics import Metrics, MongoCommandTimer, RateMeter, RouteTimingMiddleware, instrument_socketio
+from room_lifecycle import archive_room, ensure_room_indexes, find_archived, insert_room, mark_started
+from room_stream import RoomStreams
+from sessions import SessionRegistry
+from spectators import SpectatorFanout
+from squad_rules import SquadRules
+from wire import JSON, KEYS, TIMESTAMP_KEYS, WIRE_VERSION, Wire
+from player_catalog import PlayerCatalog
+from player_import import default_rows, import_file, import_players
+from player_queries import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, build_player_query, ensure_player_indexes, find_players_page
+)
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Logging goes through a background listener thread; per-connection events are sampled
+log_settings = configure_logging()
+logger = logging.getLogger(__name__)
+sample_connection_log = Sampler(log_settings.event_sample_rate)
+
+# Hot-path metrics, scraped from /api/metrics
+metrics = Metrics()
+observe_event = metrics.histogram("socketio_event_seconds", "Socket.IO event handler latency")
+observe_route = metrics.histogram("http_request_seconds", "HTTP request latency by route")
+count_bid = metrics.counter("bids_total", "Accepted bids")
+count_throttled = metrics.counter("throttled_events_total", "Client events refused by a rate limit")
+count_send_overflow = metrics.counter("send_queue_overflows_total", "Slow clients that hit the send queue limit")
+bid_rate = RateMeter()
+connected_sids = set()
+
+# MongoDB connection; the client is created on first use with MONGO_* pool settings
+mongo = Mongo(os.environ['MONGO_URL'], os.environ['DB_NAME'], event_listeners=[MongoCommandTimer(metrics)])
+db = mongo.db
+READY_PING_TIMEOUT = float(os.environ.get('READY_PING_TIMEOUT', '2'))
+startup_timing = {}
+
+# In-memory player catalog, reloaded when the players collection changes
+catalog = PlayerCatalog(db)
+
+# Player orders shared by rooms; a room holds an order id and a cursor into it
+orders = AuctionOrders(db)
+
+async def order_players(order_id: str):
+    await catalog.ensure_fresh()
+    return [catalog.get(player_id) for player_id in await orders.get(order_id) or ()]
+
+# Squad size, role minimums and the budget for them bound every team's bids
+squad_rules = SquadRules(
+    order_players,
+    player_role=lambda player_id: (catalog.get(player_id) or {}).get("role"),
+    max_size=int(os.environ.get('SQUAD_MAX_SIZE', '15')),
+)
+
+# Live auction state, persisted to Mongo with write-behind batching; one scheduler
+# task closes lots for every room when their timers run out (keyed by room and player)
+lot_timers = TimerScheduler(lambda key, deadline: close_lot(*key, deadline))
+engine = AuctionEngine(
+    db,
+    flush_interval=float(os.environ.get('ROOM_FLUSH_INTERVAL', '0.05')),
+    bid_mode=os.environ.get('BID_MODE', 'memory'),
+    timers=lot_timers,
+    rules=squad_rules,
+    unsold_order=lambda room: unsold_order(room),
+    find_player=lambda player_id: find_player(player_id),
+)
+
+# Append-only ledger of room events, written in batches off the hot path
+event_log = EventLog(db)
+
+# Running analytics totals per room and overall, flushed in batches; summaries are
+# cached for STATS_CACHE_SECONDS (archived rooms for ARCHIVED_STATS_CACHE_SECONDS)
+stats = AuctionStats(db, cache_seconds=float(os.environ.get('STATS_CACHE_SECONDS', '5')))
+ARCHIVED_STATS_CACHE_SECONDS = float(os.environ.get('ARCHIVED_STATS_CACHE_SECONDS', '600'))
+
+# Bot teams bid from one shared scheduler; they place bids through the same handler as people
+bots = BotBidders(
+    engine,
+    place_bid=lambda room_code, sid, amount: handle_place_bid(room_code, sid, {'room_code': room_code, 'bid_amount': amount}),
+)
+
+# Versioned room-state stream: one snapshot on join, then sequenced deltas
+streams = RoomStreams(history=int(os.environ.get('ROOM_DELTA_HISTORY', '256')))
+
+# Clients of this process and their room/team; a disconnected team can be resumed
+# with its token until SESSION_RESUME_SECONDS pass
+sessions = SessionRegistry()
+SESSION_RESUME_SECONDS = float(os.environ.get('SESSION_RESUME_SECONDS', '120'))
+session_timers = TimerScheduler(lambda sid, deadline: expire_session(sid))
 
-# Socket.IO setup
+# Rooms that never start are deleted after ROOM_WAITING_TTL_HOURS
+ROOM_WAITING_TTL = timedelta(hours=float(os.environ.get('ROOM_WAITING_TTL_HOURS', '24')))
+
+# Socket.IO setup; SIO_MANAGER fans broadcasts out across worker processes
 sio = socketio.AsyncServer(
     async_mode='asgi',
     cors_allowed_origins='*',
-    logger=True,
-    engineio_logger=True
+    client_manager=create_client_manager(os.environ.get('SIO_MANAGER')),
+    logger=log_settings.socketio,
+    engineio_logger=log_settings.socketio
+)
+
+# Room state changes run on the single worker that owns the room
+cluster = Cluster(sio)
+
+# Token buckets checked before any other work; clients over their budget get an error
+bid_limits = RateLimiter(float(os.environ.get('BID_RATE_PER_SID', '5')), float(os.environ.get('BID_BURST_PER_SID', '10')))
+room_bid_limits = RateLimiter(float(os.environ.get('BID_RATE_PER_ROOM', '50')), float(os.environ.get('BID_BURST_PER_ROOM', '100')))
+event_limits = RateLimiter(float(os.environ.get('EVENT_RATE_PER_SID', '2')), float(os.environ.get('EVENT_BURST_PER_SID', '10')))
+
+# Each connection queues at most SEND_QUEUE_LIMIT packets for a slow client, then
+# drops its oldest messages or disconnects it (SEND_QUEUE_POLICY)
+install_send_queues(
+    sio,
+    limit=int(os.environ.get('SEND_QUEUE_LIMIT', '256')),
+    policy=os.environ.get('SEND_QUEUE_POLICY', DROP_OLDEST),
+    on_overflow=lambda policy: count_send_overflow(policy=policy),
 )
 
+# Room events go out as JSON, plus compact msgpack to clients that negotiated it
+wire = Wire(
+    sio,
+    enabled=os.environ.get('WIRE_COMPACT', 'on') != 'off',
+    shared_rooms=bool(os.environ.get('SIO_MANAGER')),
+)
+
+# Room broadcasts reach bidders first; spectators get them in batches every
+# SPECTATOR_BATCH_MS, stretched up to SPECTATOR_MAX_BATCH_MS while fan-out is slow,
+# with bursts of bids sampled down to the latest
+fanout = SpectatorFanout(
+    wire,
+    window=float(os.environ.get('SPECTATOR_BATCH_MS', '100')) / 1000,
+    max_window=float(os.environ.get('SPECTATOR_MAX_BATCH_MS', '1000')) / 1000,
+    merge={'room_delta': merge_deltas, 'new_bid': None},
+)
+
+# Rooms created with a broadcast window get their bid broadcasts coalesced
+coalescer = EmitCoalescer(fanout, merge={'room_delta': merge_deltas})
+
+metrics.gauge("connected_sids", "Connected Socket.IO clients", lambda: len(connected_sids))
+metrics.gauge("active_rooms", "Rooms loaded in this worker", lambda: len(engine.rooms))
+metrics.gauge("bids_per_second", "Accepted bids per second over the last 10s", bid_rate.rate)
+metrics.gauge("emit_queue_depth", "Coalesced broadcasts waiting for their window", coalescer.pending)
+metrics.gauge("coalesced_emits_total", "Broadcasts folded into a pending one", lambda: coalescer.collapsed, kind="counter")
+metrics.gauge("pending_room_writes", "Rooms waiting for the write-behind flush", engine.pending_writes)
+metrics.gauge("lot_timers", "Scheduled lot deadlines", lambda: len(lot_timers))
+metrics.gauge("event_log_queue", "Room events waiting to be written", lambda: len(event_log))
+metrics.gauge("pending_stats", "Analytics documents waiting for their $inc flush", lambda: len(stats))
+metrics.gauge("bot_rooms", "Rooms with bots bidding on the current lot", lambda: len(bots))
+metrics.gauge("compact_clients", "Clients receiving msgpack room events", lambda: len(wire))
+metrics.gauge("spectators", "Read-only clients watching a room", lambda: len(fanout))
+metrics.gauge("spectator_queue_depth", "Room events waiting for the next spectator batch", fanout.pending)
+metrics.gauge("spectator_sampled_total", "Room events folded into a later one for spectators", lambda: fanout.sampled, kind="counter")
+metrics.gauge("mongo_pool_open", "Open pooled MongoDB connections", lambda: mongo.pool.open)
+metrics.gauge("mongo_pool_checked_out", "Pooled MongoDB connections in use", lambda: mongo.pool.checked_out)
+metrics.gauge("startup_seconds", "Time from first import to serving", lambda: startup_timing.get("ready_seconds", 0.0))
+metrics.gauge("sessions", "Clients playing for a team", lambda: len(sessions))
+metrics.gauge("detached_sessions", "Disconnected teams inside their resume window", lambda: len(sessions.detached))
+
 # Create the main app
 app = FastAPI()
+app.state.ready = False
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -58,262 +221,737 @@ class Room(BaseModel):
     host_id: str
     teams: List[Team] = []
     current_player_index: int = 0
+    current_player_id: str = ""
     auction_state: str = "waiting"  # waiting, active, completed
     current_bid: float = 0
     current_bidder: str = ""
     timer_end: Optional[datetime] = None
-    players_pool: List[str] = []  # player IDs for auction
+    bid_seq: int = 0  # incremented by every accepted bid
+    order_id: str = ""  # auction_orders document listing the players in auction order
+    lots_opened: int = 0  # across both rounds, for the auction_completed summary
+    player_count: int = 0
     sold_players: List[str] = []
+    broadcast_window_ms: int = 0
+    ordering: str = SET  # strategy that orders the players when the auction starts
+    ordering_seed: Optional[int] = None
+    parallel_lots: int = 1
+    unsold_round: bool = False
+    unsold_lot_seconds: int = UNSOLD_LOT_SECONDS
+
+class BotRequest(BaseModel):
+    count: int = Field(1, ge=1, le=MAX_TEAMS_PER_ROOM)
+
+class RoomSettings(BaseModel):
+    # Coalesce bid broadcasts to at most one per window; 0 sends every bid immediately
+    broadcast_window_ms: int = Field(0, ge=0, le=1000)
+    # Player order, fixed when the auction starts; shuffles without a seed get a random one
+    ordering: str = Field(SET, pattern=f"^({'|'.join(STRATEGIES)})$")
+    ordering_seed: Optional[int] = Field(None, ge=0)
+    # Players on sale at the same time, each with its own timer
+    parallel_lots: int = Field(1, ge=1, le=MAX_PARALLEL_LOTS)
+    # Auction the unsold players once more at the end, with shorter timers
+    unsold_round: bool = False
+    unsold_lot_seconds: int = Field(UNSOLD_LOT_SECONDS, ge=1, le=BID_TIMER_SECONDS)
 
 # Initialize cricket players database
 async def init_players_db():
-    existing_count = await db.players.count_documents({})
-    if existing_count > 0:
+    # Runs in the background: the server takes traffic while a catalog is imported
+    import_path = os.environ.get('PLAYER_IMPORT_PATH')
+    try:
+        if import_path:
+            report = await import_file(db, Path(import_path))
+        elif await db.players.estimated_document_count() == 0:
+            report = await import_players(db, default_rows(seed=int(os.environ.get('PLAYER_SEED', '0'))))
+        else:
+            return
+    except Exception:
+        logger.exception("Player import failed")
         return
-    
-    # Create 200 cricket players
-    players_data = []
-    
-    # Indian Players
-    indian_players = [
-        ("Virat Kohli", "batsman", 1500, 5), ("Rohit Sharma", "batsman", 1400, 5),
-        ("KL Rahul", "wicket-keeper", 1100, 4), ("Hardik Pandya", "all-rounder", 1500, 5),
-        ("Jasprit Bumrah", "bowler", 1200, 5), ("Mohammed Shami", "bowler", 900, 4),
-        ("Ravindra Jadeja", "all-rounder", 1600, 5), ("Rishabh Pant", "wicket-keeper", 1600, 5),
-        ("Shubman Gill", "batsman", 800, 4), ("Yuzvendra Chahal", "bowler", 600, 4),
-        ("Bhuvneshwar Kumar", "bowler", 400, 3), ("Ishan Kishan", "wicket-keeper", 1520, 4),
-        ("Shreyas Iyer", "batsman", 1225, 4), ("Suryakumar Yadav", "batsman", 800, 4),
-        ("Washington Sundar", "all-rounder", 325, 3), ("Axar Patel", "all-rounder", 900, 4),
-        ("Mohammed Siraj", "bowler", 600, 4), ("Kuldeep Yadav", "bowler", 200, 3),
-        ("Deepak Chahar", "bowler", 1400, 3), ("Sanju Samson", "wicket-keeper", 1400, 4),
-        ("Prithvi Shaw", "batsman", 750, 3), ("Mayank Agarwal", "batsman", 1200, 3),
-        ("Shikhar Dhawan", "batsman", 850, 4), ("Dinesh Karthik", "wicket-keeper", 550, 3),
-        ("Krunal Pandya", "all-rounder", 850, 3), ("Rahul Chahar", "bowler", 525, 3),
-    ]
-    
-    # International Players
-    international_players = [
-        ("Jos Buttler", "wicket-keeper", 1000, 5, "England"), ("Ben Stokes", "all-rounder", 1650, 5, "England"),
-        ("Jason Roy", "batsman", 200, 4, "England"), ("Liam Livingstone", "all-rounder", 1150, 4, "England"),
-        ("Jonny Bairstow", "wicket-keeper", 675, 4, "England"), ("Sam Curran", "all-rounder", 1850, 4, "England"),
-        ("David Warner", "batsman", 650, 5, "Australia"), ("Steve Smith", "batsman", 220, 5, "Australia"),
-        ("Glenn Maxwell", "all-rounder", 1100, 4, "Australia"), ("Pat Cummins", "bowler", 750, 5, "Australia"),
-        ("Mitchell Starc", "bowler", 2475, 5, "Australia"), ("Josh Hazlewood", "bowler", 175, 4, "Australia"),
-        ("Marcus Stoinis", "all-rounder", 900, 3, "Australia"), ("Aaron Finch", "batsman", 150, 4, "Australia"),
-        ("Kane Williamson", "batsman", 200, 5, "New Zealand"), ("Trent Boult", "bowler", 800, 4, "New Zealand"),
-        ("Mitchell Santner", "all-rounder", 200, 3, "New Zealand"), ("Tim Southee", "bowler", 150, 4, "New Zealand"),
-        ("Quinton de Kock", "wicket-keeper", 675, 4, "South Africa"), ("Kagiso Rabada", "bowler", 950, 5, "South Africa"),
-        ("Anrich Nortje", "bowler", 650, 4, "South Africa"), ("Aiden Markram", "batsman", 200, 4, "South Africa"),
-        ("Babar Azam", "batsman", 200, 5, "Pakistan"), ("Shaheen Afridi", "bowler", 800, 5, "Pakistan"),
-        ("Mohammad Rizwan", "wicket-keeper", 200, 4, "Pakistan"), ("Rashid Khan", "bowler", 1500, 5, "Afghanistan"),
-    ]
-    
-    # Add more players to reach 200
-    additional_players = []
-    for i in range(148):  # 26 Indian + 26 International + 148 Additional = 200
-        roles = ["batsman", "bowler", "all-rounder", "wicket-keeper"]
-        countries = ["India", "England", "Australia", "South Africa", "New Zealand", "Pakistan", "West Indies", "Sri Lanka", "Bangladesh", "Afghanistan"]
-        
-        additional_players.append((
-            f"Player {i+1}",
-            random.choice(roles),
-            random.randint(20, 800),
-            random.randint(2, 4),
-            random.choice(countries)
-        ))
-    
-    # Create player objects
-    for name, role, price, rating in indian_players:
-        player = Player(
-            name=name,
-            role=role,
-            base_price=price,
-            country="India",
-            rating=rating
+    if report is not None:
+        logger.info("Player import: %s", report)
+        await catalog.load()
+
+# Room state stream
+async def broadcast(event: str, data: dict, room: str):
+    # Bids still waiting in a coalescing window go out first, so deltas keep their seq order
+    await coalescer.flush_room(room)
+    await fanout.emit(event, data, room=room)
+
+async def emit_delta(room_code: str, build_changes: Callable[[], dict], window: float = 0):
+    # The changes are read from the live room only once the room's stream lock is held,
+    # then sequenced and sent (or queued for a coalescing window) before it is released,
+    # so a higher seq can neither leave first nor carry older state
+    async with streams.sending(room_code):
+        if window:
+            await coalescer.emit('room_delta', streams.publish(room_code, build_changes()), room_code, window)
+            return
+        await coalescer.flush_room(room_code)
+        await fanout.emit('room_delta', streams.publish(room_code, build_changes()), room=room_code)
+
+async def emit_snapshot(sid: str, room_code: str, protocol: str = JSON):
+    room = await engine.get_room(room_code)
+    if room is None:
+        return
+    async with streams.sending(room_code):
+        await wire.send('room_snapshot', {**streams.position(room_code), 'state': room.snapshot()}, sid, protocol)
+
+async def catch_up(sid: str, room_code: str, protocol: str, epoch: Optional[str], last_seq: Optional[int]):
+    # Clients that know their stream position get only the deltas they missed, when still buffered
+    if last_seq is not None:
+        async with streams.sending(room_code):
+            missing = streams.missing_since(room_code, epoch, last_seq)
+            if missing is not None:
+                await wire.send('room_deltas', {'deltas': missing}, sid, protocol)
+                return
+    await emit_snapshot(sid, room_code, protocol)
+
+# Auction flow
+async def load_auction_player(room_code: str, index: int) -> Optional[dict]:
+    # The live room knows its order, which changes at start and for the unsold round
+    room = engine.rooms.get(room_code)
+    if room is not None and room.order_id:
+        player_id = await orders.player_at(room.order_id, index)
+    else:
+        room_data = await db.rooms.find_one(
+            {"code": room_code},
+            {"_id": 0, "order_id": 1, "players_pool": {"$slice": [index, 1]}}
         )
-        players_data.append(player.dict())
-    
-    for name, role, price, rating, country in international_players:
-        player = Player(
-            name=name,
-            role=role,
-            base_price=price,
-            country=country,
-            rating=rating
+        if not room_data:
+            return None
+        if room_data.get("order_id"):
+            player_id = await orders.player_at(room_data["order_id"], index)
+        else:
+            # Rooms created before auction orders carry their own players_pool
+            player_id = (room_data.get("players_pool") or [None])[0]
+    if player_id is None:
+        return None
+    return await find_player(player_id)
+
+async def find_player(player_id: str) -> Optional[dict]:
+    await catalog.ensure_fresh()
+    return catalog.get(player_id) or await db.players.find_one({"id": player_id}, {"_id": 0})
+
+async def unsold_order(room) -> Optional[str]:
+    # Players nobody bought in the main round, in their original order
+    sold = {player_id for team in room.teams.values() for player_id in team.players}
+    unsold = unsold_player_ids(await orders.get(room.order_id) or (), sold)
+    if not unsold:
+        return None
+    order_id, _ = await orders.ensure(unsold)
+    return order_id
+
+async def room_order(ordering: str, seed: Optional[int]) -> str:
+    # Computed once per catalog, strategy and seed; rooms with the same settings share it
+    await catalog.ensure_fresh()
+    player_ids = order_player_ids(catalog.players, ordering, seed)
+    order_id, _ = await orders.ensure(player_ids, key=(catalog.etag, ordering, seed))
+    return order_id
+
+def log_lot(room_code: str, room, opened):
+    for lot in opened:
+        event_log.append(
+            room_code, "lot_opened", index=lot.index, player_id=lot.player_id,
+            base_price=lot.bid, timer_end=lot.timer_end.isoformat()
         )
-        players_data.append(player.dict())
+    if room.auction_state == "completed":
+        event_log.append(room_code, "auction_completed", total_lots=room.lots_opened)
+
+def lot_event(room, lot) -> dict:
+    view = lot.view(room)
+    event = {
+        'current_player': lot.player,
+        'current_bid': lot.bid,
+        'current_player_index': lot.index,
+        'timer_end': view['timer_end'],
+        'max_affordable_bid': view['max_affordable_bid']
+    }
+    if room.unsold_round:
+        event['round'] = room.round
+    return event
+
+async def close_lot(room_code: str, player_id: str, deadline: datetime):
+    result = await engine.close_lot(room_code, player_id, deadline, load_auction_player)
+    if result is None:
+        return
     
-    for name, role, price, rating, country in additional_players:
-        player = Player(
-            name=name,
-            role=role,
-            base_price=price,
-            country=country,
-            rating=rating
-        )
-        players_data.append(player.dict())
+    team = result["team"]
+    room = engine.rooms[room_code]
+    event_log.append(
+        room_code, "lot_closed", player_id=result["player_id"], team_id=team.id if team else "", amount=result["amount"]
+    )
+    if result["new_round"]:
+        event_log.append(room_code, "round_started", round=room.round, order_id=room.order_id)
+    log_lot(room_code, room, result["opened"])
+    player = result["player"] if "role" in result["player"] else catalog.get(result["player_id"]) or result["player"]
+    stats.record_lot(room_code, player, team, result["amount"])
+    if room.auction_state == "completed":
+        stats.record_completion()
+    
+    if team is not None:
+        await broadcast('player_sold', {
+            'player_id': result["player_id"],
+            'team_id': team.id,
+            'team_name': team.name,
+            'amount': result["amount"],
+            'team_budget': team.budget
+        }, room=room_code)
+    else:
+        await broadcast('player_unsold', {'player_id': result["player_id"]}, room=room_code)
+    await emit_delta(room_code, lambda: closed_changes(room, team))
     
-    await db.players.insert_many(players_data)
+    if room.auction_state == "completed":
+        bots.forget(room_code)
+        await broadcast('auction_completed', {'total_lots': room.lots_opened}, room=room_code)
+        await finish_room(room_code)
+        return
+    if result["was_primary"]:
+        bots.value_lot(room)
+    for lot in result["opened"]:
+        await broadcast('next_player', lot_event(room, lot), room=room_code)
+
+def closed_changes(room, team) -> dict:
+    changes = room.lot_view()
+    if team is not None:
+        changes[f"teams.{team.id}"] = team.to_doc()
+    return changes
+
+async def evict_room(room_code: str):
+    room = engine.rooms.get(room_code)
+    await engine.evict(room_code)
+    streams.discard(room_code)
+    if room is not None:
+        forget_order(room.order_id)
+
+def forget_order(order_id: str):
+    # Cached orders and their pool floors go with the last live room walking them
+    if order_id and not any(room.order_id == order_id for room in engine.rooms.values()):
+        orders.discard(order_id)
+        squad_rules.discard(order_id)
+
+async def finish_room(room_code: str):
+    # Completed auctions leave the live collection for the compact archive
+    await evict_room(room_code)
+    totals = await stats.final_totals(room_code)
+    if await archive_room(db, room_code, stats=totals):
+        await stats.drop_room(room_code)
 
 # Socket.IO Events
 @sio.event
-async def connect(sid, environ):
-    print(f"Client {sid} connected")
+async def connect(sid, environ, auth=None):
+    connected_sids.add(sid)
+    wire.negotiate(sid, environ, auth)
+    if sample_connection_log():
+        logger.info("Client %s connected", sid, extra={"sid": sid, "event": "connect"})
 
 @sio.event
 async def disconnect(sid):
-    print(f"Client {sid} disconnected")
+    connected_sids.discard(sid)
+    wire.forget(sid)
+    fanout.forget(sid)
+    bid_limits.discard(sid)
+    event_limits.discard(sid)
+    if sessions.detach(sid) is not None:
+        session_timers.schedule(sid, datetime.utcnow() + timedelta(seconds=SESSION_RESUME_SECONDS))
+    if sample_connection_log():
+        logger.info("Client %s disconnected", sid, extra={"sid": sid, "event": "disconnect"})
+
+async def reject_throttled(sid: str, scope: str, message: str = 'Too many requests, slow down'):
+    count_throttled(scope=scope)
+    await sio.emit('error', {'message': message}, to=sid)
 
 @sio.event
 async def join_room(sid, data):
+    if not event_limits.allow(sid):
+        await reject_throttled(sid, 'sid')
+        return
+    if sessions.get(sid) is not None:
+        await sio.emit('error', {'message': 'Already playing in a room'}, to=sid)
+        return
     room_code = data.get('room_code')
-    team_name = data.get('team_name')
-    
-    # Find room by code
-    room_data = await db.rooms.find_one({"code": room_code}, {"_id": 0})
-    if not room_data:
-        await sio.emit('error', {'message': 'Room not found'}, to=sid)
+    # The room's owner may be another worker; it needs this client's wire format
+    joined = await cluster.dispatch('join_room', room_code, sid, {**data, 'protocol': wire.protocol(sid)})
+    if joined is not None:
+        await fanout.leave(sid)
+        await start_session(sid, room_code, joined)
+
+@sio.event
+async def watch_room(sid, data):
+    if not event_limits.allow(sid):
+        await reject_throttled(sid, 'sid')
         return
-    
-    room = Room(**room_data)
-    
-    # Check if room is full
-    if len(room.teams) >= 8:
-        await sio.emit('error', {'message': 'Room is full'}, to=sid)
+    if sessions.get(sid) is not None:
+        await sio.emit('error', {'message': 'Already playing in a room'}, to=sid)
         return
-    
-    # Create new team
-    team = Team(name=team_name, owner_id=sid)
-    room.teams.append(team)
-    
-    # Update room in database
-    await db.rooms.update_one(
-        {"code": room_code},
-        {"$set": {"teams": [team.dict() for team in room.teams]}}
-    )
-    
-    # Join socket room
-    await sio.enter_room(sid, room_code)
-    
-    # Notify all users in room
-    await sio.emit('team_joined', {
-        'team': team.dict(),
-        'total_teams': len(room.teams)
-    }, room=room_code)
+    await start_watching(sid, data.get('room_code'), data.get('epoch'), data.get('last_seq'))
+
+async def start_watching(sid: str, room_code: str, epoch: Optional[str] = None, last_seq: Optional[int] = None):
+    # Spectators never reach the room document or the team list: they join the
+    # room's spectator group here and read the owner's in-memory state
+    protocol = wire.protocol(sid)
+    await fanout.watch(sid, room_code, protocol)
+    state = await cluster.dispatch('room_state', room_code, epoch, last_seq)
+    if 'error' in state:
+        await fanout.leave(sid)
+        await sio.emit('error', {'message': state['error']}, to=sid)
+        return
+    if 'deltas' in state:
+        await wire.send('room_deltas', state, sid, protocol)
+    else:
+        await wire.send('room_snapshot', state, sid, protocol)
 
 @sio.event
-async def place_bid(sid, data):
+async def resume_session(sid, data):
+    if not event_limits.allow(sid):
+        await reject_throttled(sid, 'sid')
+        return
+    # A reconnected client takes its team back with the token it was given on join
     room_code = data.get('room_code')
-    bid_amount = data.get('bid_amount')
-    
-    room_data = await db.rooms.find_one({"code": room_code}, {"_id": 0})
-    if not room_data:
+    resumed = await cluster.dispatch(
+        'resume_session', room_code, sid, data.get('resume_token'), wire.protocol(sid), data.get('epoch'), data.get('last_seq')
+    )
+    if resumed is None:
+        await sio.emit('error', {'message': 'Session expired'}, to=sid)
         return
-    
-    room = Room(**room_data)
-    
-    # Validate bid
-    if bid_amount <= room.current_bid:
-        await sio.emit('error', {'message': 'Bid must be higher than current bid'}, to=sid)
+    await fanout.leave(sid)
+    await start_session(sid, room_code, resumed)
+
+async def start_session(sid: str, room_code: str, grant: dict):
+    sessions.bind(sid, room_code, grant['team_id'])
+    await sio.emit('session', {'room_code': room_code, **grant}, to=sid)
+
+async def expire_session(sid: str):
+    session = sessions.expire(sid)
+    if session is not None:
+        await cluster.dispatch('release_session', session.room_code, sid)
+
+@sio.event
+async def resync(sid, data):
+    if not event_limits.allow(sid):
+        await reject_throttled(sid, 'sid')
         return
-    
-    # Find team by owner_id
-    team = next((t for t in room.teams if t.owner_id == sid), None)
-    if not team:
+    if sid in fanout.watching:
+        await start_watching(sid, data.get('room_code'), data.get('epoch'), data.get('last_seq', 0))
         return
+    await cluster.dispatch('resync', data.get('room_code'), sid, {**data, 'protocol': wire.protocol(sid)})
+
+@sio.event
+async def place_bid(sid, data):
+    if not bid_limits.allow(sid):
+        await reject_throttled(sid, 'sid', 'Too many bids, slow down')
+        return {'accepted': False, 'message': 'Too many bids, slow down'}
+    # Only clients playing for a team in this room get past the session lookup
+    session = sessions.get(sid)
+    if session is None or session.room_code != data.get('room_code'):
+        return {'accepted': False, 'message': 'Not a team in this room'}
+    if not room_bid_limits.allow(session.room_code):
+        await reject_throttled(sid, 'room', 'Too many bids in this room, slow down')
+        return {'accepted': False, 'message': 'Too many bids in this room, slow down'}
+    # The return value is the bidder's acknowledgement, sent before any coalesced broadcast
+    return await cluster.dispatch('place_bid', session.room_code, sid, data)
+
+# Room-owner handlers
+@cluster.handler('join_room')
+async def handle_join_room(room_code, sid, data):
+    team_name = data.get('team_name')
     
-    # Check budget
-    if bid_amount > team.budget:
-        await sio.emit('error', {'message': 'Insufficient budget'}, to=sid)
+    team = Team(name=team_name, owner_id=sid)
+    try:
+        team_state, total_teams = await engine.add_team(room_code, team.dict())
+    except BidRejected as exc:
+        await sio.emit('error', {'message': str(exc)}, to=sid)
         return
+    event_log.append(room_code, "team_joined", team=team_state.to_doc())
+    resume_token = engine.issue_resume_token(engine.rooms[room_code], team_state.id)
     
-    # Update bid
-    room.current_bid = bid_amount
-    room.current_bidder = sid
-    room.timer_end = datetime.utcnow() + timedelta(seconds=30)
+    # Join socket room and send the joining client a full snapshot
+    protocol = data.get('protocol', JSON)
+    await wire.enter_room(sid, room_code, protocol)
+    await emit_snapshot(sid, room_code, protocol)
+    
+    await announce_team(room_code, team_state, total_teams)
+    return {'team_id': team_state.id, 'resume_token': resume_token}
+
+def team_changes(room_code: str, team_state) -> dict:
+    changes = {f"teams.{team_state.id}": team_state.to_doc()}
+    room = engine.rooms[room_code]
+    if team_state.id in room.bid_limits:
+        # Joined mid-auction: the newcomer's bid limits for the lots on sale
+        lot = room.lot_view()
+        changes["max_affordable_bid"] = lot["max_affordable_bid"]
+        if "lots" in lot:
+            changes["lots"] = lot["lots"]
+    return changes
+
+async def announce_team(room_code: str, team_state, total_teams: int):
+    # Notify all users in room
+    await broadcast('team_joined', {
+        'team': team_state.to_doc(),
+        'total_teams': total_teams
+    }, room=room_code)
+    await emit_delta(room_code, lambda: team_changes(room_code, team_state))
+
+@cluster.handler('add_bots')
+async def handle_add_bots(room_code, count):
+    room = await engine.get_room(room_code)
+    if room is None:
+        return {"error": "Room not found"}
+    added = []
+    for _ in range(count):
+        number = sum(is_bot(team.owner_id) for team in room.teams.values()) + 1
+        team = Team(name=f"Bot {number}", owner_id=new_bot_sid())
+        try:
+            team_state, total_teams = await engine.add_team(room_code, team.dict())
+        except BidRejected as exc:
+            if not added:
+                return {"error": str(exc)}
+            break
+        event_log.append(room_code, "team_joined", team=team_state.to_doc())
+        await announce_team(room_code, team_state, total_teams)
+        added.append(team_state.to_doc())
+    if room.auction_state == "active":
+        bots.value_lot(room)
+    return {"bots": added, "total_teams": len(room.teams)}
+
+@cluster.handler('resume_session')
+async def handle_resume_session(room_code, sid, resume_token, protocol=JSON, epoch=None, last_seq=None):
+    rebound = await engine.rebind_team(room_code, resume_token or "", sid)
+    if rebound is None:
+        return None
+    team, resume_token = rebound
+    event_log.append(room_code, "team_resumed", team_id=team.id, owner_id=sid)
+    await wire.enter_room(sid, room_code, protocol)
+    await catch_up(sid, room_code, protocol, epoch, last_seq)
+    await emit_delta(room_code, lambda: {f"teams.{team.id}": team.to_doc()})
+    return {'team_id': team.id, 'resume_token': resume_token}
+
+@cluster.handler('release_session')
+async def handle_release_session(room_code, sid):
+    room = engine.rooms.get(room_code)
+    if await engine.release_sid(room_code, sid):
+        streams.discard(room_code)
+        forget_order(room.order_id)
+
+@cluster.handler('resync')
+async def handle_resync(room_code, sid, data):
+    # Reconnecting clients send their stream position and get only what they missed
+    if await engine.get_room(room_code) is None:
+        await sio.emit('error', {'message': 'Room not found'}, to=sid)
+        return
+    protocol = data.get('protocol', JSON)
+    await wire.enter_room(sid, room_code, protocol)
+    await catch_up(sid, room_code, protocol, data.get('epoch'), data.get('last_seq', 0))
+
+@cluster.handler('place_bid')
+async def handle_place_bid(room_code, sid, data):
+    bid_amount = data.get('bid_amount')
     
-    # Update in database
-    await db.rooms.update_one(
-        {"code": room_code},
-        {"$set": {
-            "current_bid": room.current_bid,
-            "current_bidder": room.current_bidder,
-            "timer_end": room.timer_end
-        }}
+    # Validated by the engine: in memory with write-behind, or one compare-and-set in atomic mode;
+    # in parallel-lots rooms `player_id` names the lot (the oldest open one by default)
+    try:
+        accepted = await engine.place_bid(room_code, sid, bid_amount, data.get('player_id'))
+    except BidRejected as exc:
+        await sio.emit('error', {'message': str(exc)}, to=sid)
+        return {'accepted': False, 'message': str(exc)}
+    if accepted is None:
+        return {'accepted': False, 'message': 'Not a team in this room'}
+    team, timer_end, lot = accepted
+    count_bid()
+    bid_rate.mark()
+    room = engine.rooms[room_code]
+    event_log.append(
+        room_code, "bid", team_id=team.id, sid=sid, amount=bid_amount, bid_seq=room.bid_seq,
+        timer_end=timer_end.isoformat(), player_id=lot.player_id
     )
+    if lot is room.primary:
+        bots.on_bid(room_code)
     
-    # Broadcast bid to all users in room
-    await sio.emit('new_bid', {
+    # Broadcast bid to all users in room, or only the latest bid per window when coalescing
+    new_bid = {
         'bid_amount': bid_amount,
         'bidder_team': team.name,
-        'timer_end': room.timer_end.isoformat()
-    }, room=room_code)
+        'timer_end': timer_end.isoformat(),
+        'player_id': lot.player_id
+    }
+    if room.broadcast_window_ms:
+        window = room.broadcast_window_ms / 1000
+        await coalescer.emit('new_bid', new_bid, room_code, window)
+        await emit_delta(room_code, lambda: bid_changes(room, lot), window)
+    else:
+        await broadcast('new_bid', new_bid, room=room_code)
+        await emit_delta(room_code, lambda: bid_changes(room, lot))
+    return {'accepted': True, 'bid_amount': bid_amount, 'timer_end': new_bid['timer_end'], 'player_id': lot.player_id}
+
+def bid_changes(room, lot) -> dict:
+    # The bid fields of the primary lot, not its whole view
+    changes = {}
+    if lot is room.primary:
+        bidder = room.team_for(lot.bidder) if lot.bidder else None
+        changes.update(
+            current_bid=lot.bid,
+            current_bidder_team_id=bidder.id if bidder else "",
+            timer_end=lot.timer_end.isoformat() if lot.timer_end else None,
+        )
+    changes["bid_seq"] = room.bid_seq
+    if room.parallel_lots > 1:
+        # The bid changes what the bidder and the outbid team have committed, and with it
+        # their limits on every open lot. A lot closed meanwhile left with its close delta
+        changes["max_affordable_bid"] = room.max_bids(room.primary)
+        for open_lot in room.lots.values():
+            changes[f"lots.{open_lot.player_id}"] = open_lot.view(room)
+    return changes
 
 # API Routes
+@api_router.get("/metrics")
+async def get_metrics():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@api_router.get("/protocol")
+async def get_protocol():
+    # Key table for clients that connect with auth={"protocol": "msgpack"}
+    return {
+        "version": WIRE_VERSION,
+        "compact": wire.enabled,
+        "keys": KEYS,
+        "epoch_ms_keys": sorted(TIMESTAMP_KEYS),
+    }
+
+@api_router.get("/health/ready")
+async def readiness():
+    # 503 until startup has finished, cluster membership has settled and Mongo answers a ping
+    report = {
+        "ready": False,
+        "startup": startup_timing,
+        "cluster": {"members": len(cluster.members), "settled": cluster.settled.is_set()},
+        "mongo": {"pool": mongo.pool_stats()},
+    }
+    if app.state.ready and cluster.settled.is_set():
+        try:
+            report["mongo"]["rtt_ms"] = await asyncio.wait_for(mongo.ping(), READY_PING_TIMEOUT) * 1e3
+            report["ready"] = True
+        except Exception as exc:
+            report["mongo"]["error"] = str(exc) or type(exc).__name__
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
 @api_router.get("/")
 async def health_check():
     return {"status": "healthy", "message": "Cricket Auction API is running"}
 
 @api_router.post("/room/create")
-async def create_room():
-    # Generate 6-digit code
-    code = str(random.randint(100000, 999999))
-    
-    # Get all players for auction
-    all_players = await db.players.find({}, {"_id": 0}).to_list(1000)
-    player_ids = [player["id"] for player in all_players]
+async def create_room(settings: Optional[RoomSettings] = None):
+    # Rooms share the order of the current catalog instead of copying its ids
+    await catalog.ensure_fresh()
+    order_id, player_count = await orders.ensure(catalog.ids, key=catalog.etag)
     
     room = Room(
-        code=code,
+        code="",  # assigned by insert_room
         host_id="",
-        players_pool=player_ids
+        order_id=order_id,
+        player_count=player_count,
+        **(settings or RoomSettings()).dict()
     )
     
-    await db.rooms.insert_one(room.dict())
+    # Random 6-digit code, retried on collision with a live room
+    code = await insert_room(db, room.dict(), ROOM_WAITING_TTL)
+    event_log.append(
+        code, "room_created", order_id=order_id, player_count=player_count, broadcast_window_ms=room.broadcast_window_ms,
+        ordering=room.ordering, parallel_lots=room.parallel_lots, unsold_round=room.unsold_round,
+        unsold_lot_seconds=room.unsold_lot_seconds
+    )
     
     return {"room_code": code}
 
 @api_router.get("/room/{room_code}")
 async def get_room(room_code: str):
-    room_data = await db.rooms.find_one({"code": room_code}, {"_id": 0})
+    room_data = await db.rooms.find_one({"code": room_code}, {"_id": 0, "players_pool": 0})
     if not room_data:
+        archived = await find_archived(db, room_code)
+        if archived:
+            return {**archived, "auction_state": "completed"}
         return {"error": "Room not found"}
     
+    # Overlay live state that may not have been flushed yet
+    room = engine.rooms.get(room_code)
+    if room is not None:
+        room_data.update(room.field_values(ROOM_STATE_PROJECTION.keys() - {"_id", "code"}))
+    
     return room_data
 
+@api_router.get("/room/{room_code}/events")
+async def get_room_events(room_code: str, until: Optional[datetime] = None):
+    # The room's ledger as JSON lines, e.g. to record an auction for replay
+    await event_log.flush()
+    
+    async def lines():
+        async for event in event_log.events(room_code, until):
+            yield json.dumps(event, default=datetime.isoformat) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@api_router.get("/room/{room_code}/replay")
+async def replay_room(room_code: str, until: Optional[datetime] = None):
+    # Room state rebuilt from the ledger alone, optionally as of `until`
+    await event_log.flush()
+    events = [event async for event in event_log.events(room_code, until)]
+    if not events:
+        return {"error": "Room not found"}
+    return replay(events)
+
+@api_router.get("/room/{room_code}/state")
+async def get_room_state(room_code: str, epoch: Optional[str] = None, since: Optional[int] = None):
+    return await cluster.dispatch('room_state', room_code, epoch, since)
+
+@cluster.handler('room_state')
+async def handle_room_state(room_code, epoch, since):
+    # Served from memory: missed deltas when the caller's position is still buffered,
+    # otherwise a full snapshot without the player pool
+    room = await engine.get_room(room_code)
+    if room is None:
+        return {"error": "Room not found"}
+    if epoch is not None and since is not None:
+        missing = streams.missing_since(room_code, epoch, since)
+        if missing is not None:
+            return {"deltas": missing}
+    return {**streams.position(room_code), "state": room.snapshot()}
+
+@api_router.get("/room/{room_code}/stats")
+async def get_room_stats(room_code: str):
+    # Spend by team and role, premiums over base price and the top buys; served from
+    # the running totals (or the ledger for older rooms) and cached briefly
+    async def compute():
+        room_data = await db.rooms.find_one(
+            {"code": room_code}, {"_id": 0, "teams": 1, "auction_state": 1, "created_at": 1}
+        )
+        archived = None if room_data else await find_archived(db, room_code)
+        if room_data is None and archived is None:
+            return {"error": "Room not found"}, stats.cache_seconds
+        
+        room = engine.rooms.get(room_code)
+        if room is not None:
+            teams = [team.to_doc() for team in room.teams.values()]
+        elif room_data is not None:
+            teams = room_data.get("teams", [])
+        else:
+            teams = archived.get("teams", [])
+        
+        if archived is not None and archived.get("stats") is not None:
+            totals, source = archived["stats"], "archive"
+        else:
+            doc = room_data or archived
+            totals, source = await stats.room_totals(room_code, doc.get("created_at"), doc.get("completed_at"))
+        summary = {
+            "room_code": room_code,
+            "auction_state": "completed" if archived else room_data.get("auction_state"),
+            "source": source,
+            "teams": [
+                {
+                    "id": t["id"], "name": t["name"], "spent": t.get("spent", 0.0), "budget_left": t.get("budget"),
+                    "players": len(t.get("players", [])), "roles": t.get("roles", {}),
+                }
+                for t in teams
+            ],
+            **summarize(totals),
+        }
+        return summary, ARCHIVED_STATS_CACHE_SECONDS if archived else stats.cache_seconds
+    
+    return await stats.cache.get(room_stats_id(room_code), compute)
+
+@api_router.get("/stats")
+async def get_global_stats():
+    # Totals over every auction on this deployment, including those before the totals existed
+    async def compute():
+        totals = await stats.global_totals()
+        return {"auctions": totals.get("auctions", 0), **summarize(totals)}, stats.cache_seconds
+    
+    return await stats.cache.get(GLOBAL_ID, compute)
+
 @api_router.get("/players")
-async def get_players():
-    players = await db.players.find({}, {"_id": 0}).to_list(1000)
-    return players
+async def get_players(
+    request: Request,
+    role: Optional[str] = None,
+    country: Optional[str] = None,
+    min_rating: Optional[int] = None,
+    max_rating: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    sort: Optional[str] = Query(None, pattern=r"^-?(name|rating|base_price)$"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    query = build_player_query(role, country, min_rating, max_rating, min_price, max_price)
+    if query or sort or limit or cursor:
+        # Filtered or paged requests are keyset pages served by the players indexes
+        try:
+            players, next_cursor = await find_players_page(
+                db.players, query, sort, limit or DEFAULT_PAGE_SIZE, cursor
+            )
+        except InvalidCursor as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        return {"players": players, "next_cursor": next_cursor}
+    
+    # The full list is served from the catalog's pre-serialized body; unchanged catalogs answer 304
+    await catalog.ensure_fresh()
+    headers = {"ETag": catalog.etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == catalog.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=catalog.json_body, media_type="application/json", headers=headers)
+
+@api_router.post("/room/{room_code}/bots")
+async def add_bots(room_code: str, request: Optional[BotRequest] = None):
+    # Fill empty seats with server-side bidders
+    return await cluster.dispatch('add_bots', room_code, (request or BotRequest()).count)
 
 @api_router.post("/room/{room_code}/start")
 async def start_auction(room_code: str):
-    room_data = await db.rooms.find_one({"code": room_code}, {"_id": 0})
-    if not room_data:
-        return {"error": "Room not found"}
-    
-    # Start auction
-    await db.rooms.update_one(
-        {"code": room_code},
-        {"$set": {"auction_state": "active"}}
+    return await cluster.dispatch('start_auction', room_code)
+
+@cluster.handler('start_auction')
+async def handle_start_auction(room_code):
+    # The player order is fixed now, by the room's strategy, and stored once by id
+    settings = await db.rooms.find_one(
+        {"code": room_code, "auction_state": "waiting"}, {"_id": 0, "ordering": 1, "ordering_seed": 1}
     )
+    order_id, started = None, {}
+    if settings is not None and settings.get("ordering"):
+        seed = settings.get("ordering_seed")
+        if settings["ordering"] == SHUFFLE and seed is None:
+            seed = started["ordering_seed"] = secrets.randbelow(2**31)
+        order_id = await room_order(settings["ordering"], seed)
+    try:
+        room = await engine.start_auction(room_code, load_auction_player, order_id)
+    except BidRejected as exc:
+        return {"error": str(exc)}
+    if room is None:
+        return {"error": "Room not found"}
+    lot = room.lot_view()
+    event_log.append(room_code, "auction_started", order_id=room.order_id, **started)
+    log_lot(room_code, room, list(room.lots.values()))
+    bots.value_lot(room)
+    await mark_started(db, room_code, **started)
     
-    # Get first player
-    players = await db.players.find({}, {"_id": 0}).to_list(1000)
-    if players:
-        first_player = players[0]
-        await sio.emit('auction_started', {
-            'current_player': first_player,
-            'current_bid': first_player['base_price']
-        }, room=room_code)
+    if room.current_player:
+        started_event = {
+            'current_player': room.current_player,
+            'current_bid': room.current_bid,
+            'timer_end': room.timer_end.isoformat(),
+            'max_affordable_bid': lot['max_affordable_bid']
+        }
+        if 'lots' in lot:
+            started_event['lots'] = lot['lots']
+        await broadcast('auction_started', started_event, room=room_code)
+    await emit_delta(room_code, room.lot_view)
     
     return {"message": "Auction started"}
 
 # Include the router in the main app
 app.include_router(api_router)
 
+# Time every Socket.IO event and API route
+instrument_socketio(sio, observe_event)
+app.add_middleware(RouteTimingMiddleware, observe=observe_route)
+
 # Create Socket.IO ASGI app after routes are included
 socket_app = socketio.ASGIApp(sio, app)
+IMPORTED = time.perf_counter()
 
 app.add_middleware(
     CORSMiddleware,
@@ -323,20 +961,66 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+async def rebalance_rooms():
+    # Another worker joined or left: hand over rooms we no longer own, pick up new ones
+    for room_code in [code for code in engine.rooms if not cluster.owns(code)]:
+        await evict_room(room_code)
+        bots.forget(room_code)
+    for room_code, player_id in lot_timers.keys():
+        if not cluster.owns(room_code):
+            lot_timers.cancel((room_code, player_id))
+    await engine.restore_timers(owns=cluster.owns)
+
+cluster.on_membership_change = rebalance_rooms
+
+async def backfill_stats():
+    try:
+        await stats.backfill_global()
+    except Exception:
+        logger.exception("Backfilling global stats failed")
 
 @app.on_event("startup")
 async def startup_event():
-    await init_players_db()
+    warmup_started = time.perf_counter()
+    # Independent warm-up steps share the connection pool instead of running in turn
+    await asyncio.gather(ensure_player_indexes(db), ensure_room_indexes(db), catalog.load())
+    warmed_up = time.perf_counter()
+    app.state.player_import = asyncio.create_task(init_players_db())
+    engine.start()
+    event_log.start()
+    stats.start()
+    app.state.stats_backfill = asyncio.create_task(backfill_stats())
+    await cluster.start()
+    # Room ownership is only known once the other workers have been heard from
+    settling = time.perf_counter()
+    await cluster.wait_settled()
+    startup_timing["cluster_settle_seconds"] = time.perf_counter() - settling
+    await engine.restore_timers(owns=cluster.owns)
+    lot_timers.start()
+    session_timers.start()
+    bots.start()
+    startup_timing.update(
+        import_seconds=IMPORTED - STARTED,
+        warmup_seconds=warmed_up - warmup_started,
+        ready_seconds=time.perf_counter() - STARTED,
+    )
+    app.state.ready = True
+    logger.info("Ready in %.3fs", startup_timing["ready_seconds"], extra=startup_timing)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    app.state.ready = False
+    app.state.player_import.cancel()
+    await lot_timers.stop()
+    await session_timers.stop()
+    await bots.stop()
+    await engine.stop()
+    await event_log.stop()
+    app.state.stats_backfill.cancel()
+    await stats.stop()
+    await cluster.stop()
+    mongo.close()
+    log_settings.listener.stop()
 
 # Export the socket_app as the main application
 # This allows both FastAPI routes and Socket.io to work together
\ No newline at end of file
@@ -0,0 +1,53 @@
+from typing import Dict, Optional, Set
+
+
+class Session:
+    __slots__ = ("sid", "room_code", "team_id")
+
+    def __init__(self, sid: str, room_code: str, team_id: str):
+        self.sid = sid
+        self.room_code = room_code
+        self.team_id = team_id
+
+
+class SessionRegistry:
+    """Which room and team each connected client of this process plays for.
+
+    Looked up on every socket event, so a client that never joined is turned away
+    before any room is loaded or any owner is contacted. Disconnected sessions are
+    kept as detached until their resume window passes, then forgotten.
+    """
+
+    def __init__(self):
+        self.by_sid: Dict[str, Session] = {}
+        self.by_room: Dict[str, Set[str]] = {}
+        self.detached: Dict[str, Session] = {}
+
+    def __len__(self):
+        return len(self.by_sid)
+
+    def get(self, sid: str) -> Optional[Session]:
+        return self.by_sid.get(sid)
+
+    def bind(self, sid: str, room_code: str, team_id: str) -> Session:
+        session = self.by_sid[sid] = Session(sid, room_code, team_id)
+        self.by_room.setdefault(room_code, set()).add(sid)
+        return session
+
+    def sids_in(self, room_code: str) -> Set[str]:
+        return self.by_room.get(room_code, set())
+
+    def detach(self, sid: str) -> Optional[Session]:
+        session = self.by_sid.pop(sid, None)
+        if session is None:
+            return None
+        sids = self.by_room.get(session.room_code)
+        if sids is not None:
+            sids.discard(sid)
+            if not sids:
+                del self.by_room[session.room_code]
+        self.detached[sid] = session
+        return session
+
+    def expire(self, sid: str) -> Optional[Session]:
+        return self.detached.pop(sid, None)
@@ -0,0 +1,125 @@
+"""Read-only spectators, fanned out after a room's bidders.
+
+Spectators never become teams: they sit in their own Socket.IO room next to the
+bidders' one and the room document never hears of them. Every room broadcast goes
+to the bidders straight away; the spectators' copy is queued and sent by a separate
+task once per `window`, after the bidders' events and bid acknowledgements are out.
+Within a batch, bursts of bids are sampled down to the latest `new_bid` and a single
+merged `room_delta`. Other events (lots opening and closing, teams joining) are
+kept, in order. When fan-out is slow, e.g. ten thousand watchers of a marquee
+auction, the window stretches up to `max_window` so spectator traffic stays a
+bounded share of the event loop.
+"""
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from wire import compact_room
+
+logger = logging.getLogger(__name__)
+
+SPECTATOR_ROOM_SUFFIX = "~watch"
+# Fan-out may take up to 1/LOAD_FACTOR of the time between spectator batches
+LOAD_FACTOR = 4
+
+
+def spectator_room(room: str) -> str:
+    return room + SPECTATOR_ROOM_SUFFIX
+
+
+class SpectatorFanout:
+    """Room broadcasts to bidders now and to spectators in sampled batches.
+
+    Stands in for `Wire` wherever room events are broadcast. `merge` maps the events
+    that may be collapsed within a batch to a function folding a newer payload into
+    the pending one (None keeps only the newest).
+    """
+
+    def __init__(self, wire, window: float = 0.1, max_window: float = 1.0,
+                 merge: Optional[Dict[str, Optional[Callable[[dict, dict], dict]]]] = None):
+        self.wire = wire
+        self.window = window
+        self.max_window = max(max_window, window)
+        self.merge = merge or {}
+        self.sampled = 0
+        self.watching: Dict[str, str] = {}  # sid -> room, for spectators connected here
+        self._batches: Dict[str, List[list]] = {}  # room -> [[event, data], ...]
+        self._collapsible_from: Dict[str, int] = {}  # room -> index after the last kept event
+        self._windows: Dict[str, float] = {}
+        self._flushers: Dict[str, asyncio.Task] = {}
+
+    def __len__(self):
+        return len(self.watching)
+
+    def pending(self) -> int:
+        return sum(len(batch) for batch in self._batches.values())
+
+    def has_spectators(self, room: str) -> bool:
+        if self.wire.shared_rooms:
+            # Watchers may be connected to other workers
+            return True
+        rooms = self.wire.sio.manager.rooms.get("/", {})
+        watch = spectator_room(room)
+        return bool(rooms.get(watch) or rooms.get(compact_room(watch)))
+
+    async def watch(self, sid: str, room: str, protocol: str):
+        await self.leave(sid)
+        await self.wire.enter_room(sid, spectator_room(room), protocol)
+        self.watching[sid] = room
+
+    async def leave(self, sid: str):
+        room = self.watching.pop(sid, None)
+        if room is not None:
+            await self.wire.sio.leave_room(sid, spectator_room(room))
+            await self.wire.sio.leave_room(sid, compact_room(spectator_room(room)))
+
+    def forget(self, sid: str):
+        # Socket.IO drops a disconnected sid from its rooms itself
+        self.watching.pop(sid, None)
+
+    async def emit(self, event: str, data: dict, room: str):
+        # Queued before the bidders' emit yields, so concurrent broadcasts keep their order
+        if self.has_spectators(room):
+            self._queue(event, data, room)
+        await self.wire.emit(event, data, room=room)
+
+    def _queue(self, event: str, data: dict, room: str):
+        batch = self._batches.setdefault(room, [])
+        if event in self.merge:
+            # Bids only collapse with bids queued since the last event that must be kept
+            for entry in batch[self._collapsible_from.get(room, 0):]:
+                if entry[0] == event:
+                    merge = self.merge[event]
+                    entry[1] = merge(entry[1], data) if merge else data
+                    self.sampled += 1
+                    break
+            else:
+                batch.append([event, data])
+        else:
+            batch.append([event, data])
+            self._collapsible_from[room] = len(batch)
+        if room not in self._flushers:
+            window = self._windows.get(room, self.window)
+            self._flushers[room] = asyncio.create_task(self._flush_later(room, window))
+
+    async def _flush_later(self, room: str, window: float):
+        await asyncio.sleep(window)
+        self._flushers.pop(room, None)
+        started = time.perf_counter()
+        await self._send(room)
+        window = min(self.max_window, (time.perf_counter() - started) * LOAD_FACTOR)
+        # Only rooms whose fan-out outgrew the base window keep a longer one
+        if window > self.window:
+            self._windows[room] = window
+        else:
+            self._windows.pop(room, None)
+
+    async def _send(self, room: str):
+        batch = self._batches.pop(room, [])
+        self._collapsible_from.pop(room, None)
+        for event, data in batch:
+            try:
+                await self.wire.emit(event, data, room=spectator_room(room))
+            except Exception:
+                logger.exception("Spectator %s emit to %s failed", event, room)
@@ -0,0 +1,130 @@
+"""Squad composition and budget rules, validated in O(1) per bid.
+
+Every team carries running aggregates (`roles`, `spent`) that are updated when a
+lot closes. For each shared auction order, the cheapest base prices per role among
+the players still to come are precomputed once. From both, the rules work out the
+most each team may bid on the lot on sale when the lot opens (`bid_limits`). A bid
+then needs only one comparison. A team may not spend the money it needs to fill its
+remaining required slots, even at base prices, and may not take a player once the
+remaining slots are reserved for required roles.
+"""
+import bisect
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+MAX_SQUAD_SIZE = 15
+ROLE_MINIMUMS = {"batsman": 3, "bowler": 3, "all-rounder": 1, "wicket-keeper": 1}
+
+# Players of an auction order in order, None for ids missing from the catalog
+OrderLoader = Callable[[str], Awaitable[Sequence[Optional[dict]]]]
+
+
+class PoolFloors:
+    """Cheapest base prices per role among the players at positions >= i of an order.
+
+    `cost(i, role, k)` is the least that k more players of `role` can cost once the
+    auction has reached position i. Only as many prices as the role's minimum are kept.
+    Consecutive positions share one tuple while the cheapest prices do not change.
+    """
+
+    __slots__ = ("_sums",)
+
+    def __init__(self, players: Sequence[Optional[dict]], minimums: Dict[str, int]):
+        self._sums: Dict[str, List[Tuple[float, ...]]] = {}
+        for role, keep in minimums.items():
+            cheapest: List[float] = []
+            sums: Tuple[float, ...] = (0.0,)
+            suffix = [sums] * (len(players) + 1)
+            for index in range(len(players) - 1, -1, -1):
+                player = players[index]
+                if player is not None and player.get("role") == role and keep:
+                    price = player["base_price"]
+                    if len(cheapest) < keep or price < cheapest[-1]:
+                        bisect.insort(cheapest, price)
+                        del cheapest[keep:]
+                        running, sums = 0.0, (0.0,)
+                        for value in cheapest:
+                            running += value
+                            sums += (running,)
+                suffix[index] = sums
+            self._sums[role] = suffix
+
+    def cost(self, index: int, role: str, count: int) -> float:
+        suffix = self._sums.get(role)
+        if not count or suffix is None:
+            return 0.0
+        sums = suffix[min(index, len(suffix) - 1)]
+        # When the rest of the pool cannot fill the role, no budget can; reserve what it can
+        return sums[min(count, len(sums) - 1)]
+
+
+class SquadRules:
+    def __init__(
+        self,
+        load_order: OrderLoader,
+        player_role: Callable[[str], Optional[str]],
+        max_size: int = MAX_SQUAD_SIZE,
+        minimums: Optional[Dict[str, int]] = None,
+        max_cached: int = 256,
+    ):
+        self.load_order = load_order
+        self.player_role = player_role
+        self.max_size = max_size
+        self.minimums = dict(ROLE_MINIMUMS if minimums is None else minimums)
+        self.max_cached = max_cached
+        self._floors: "OrderedDict[str, PoolFloors]" = OrderedDict()  # least recently used first
+
+    def tally(self, room):
+        """Rebuild role counts of teams stored without them, e.g. before they were kept."""
+        for team in room.teams.values():
+            if sum(team.roles.values()) != len(team.players):
+                roles: Dict[str, int] = {}
+                for player_id in team.players:
+                    role = self.player_role(player_id)
+                    if role:
+                        roles[role] = roles.get(role, 0) + 1
+                team.roles = roles
+
+    async def floors(self, order_id: str) -> Optional[PoolFloors]:
+        if not order_id:
+            return None
+        floors = self._floors.get(order_id)
+        if floors is None:
+            # Orders never change, so each one is priced once while it stays cached
+            floors = PoolFloors(await self.load_order(order_id), self.minimums)
+        self._floors[order_id] = floors
+        self._floors.move_to_end(order_id)
+        while len(self._floors) > self.max_cached:
+            self._floors.popitem(last=False)
+        return floors
+
+    def discard(self, order_id: str):
+        self._floors.pop(order_id, None)
+
+    async def bid_limits(self, room, lot=None) -> Dict[str, Tuple[float, str]]:
+        """Most each team may bid on `lot` (the oldest lot on sale by default), with the reason a higher bid fails."""
+        lot = lot or room.primary
+        if room.auction_state != "active" or lot is None or lot.player is None:
+            return {}
+        floors = await self.floors(room.order_id)
+        # Players from next_index on have not been put on sale yet
+        return {team.id: self.limit(team, lot.player, floors, room.next_index) for team in room.teams.values()}
+
+    def limit(self, team, player: dict, floors: Optional[PoolFloors], next_index: int) -> Tuple[float, str]:
+        size = len(team.players)
+        if size >= self.max_size:
+            return 0.0, "Squad is full"
+        role = player.get("role")
+        open_slots = self.max_size - size - 1
+        needed = {
+            r: max(0, minimum - team.roles.get(r, 0) - (r == role))
+            for r, minimum in self.minimums.items()
+        }
+        if sum(needed.values()) > open_slots:
+            return 0.0, "Remaining squad slots are reserved for required roles"
+        if floors is None:
+            return team.budget, "Insufficient budget"
+        reserve = sum(floors.cost(next_index, r, count) for r, count in needed.items())
+        if not reserve:
+            return team.budget, "Insufficient budget"
+        return max(0.0, team.budget - reserve), f"Must keep {reserve:g} for the required players still to buy"
@@ -0,0 +1,152 @@
+"""Compact msgpack encoding of room broadcasts for clients that ask for it.
+
+A client opts in with `auth={"protocol": "msgpack"}` (or `?protocol=msgpack`) when it
+connects. Its sockets join a parallel group per room, and room events reach it as
+a single binary argument: msgpack with the short keys in `KEYS` and timestamps as
+epoch milliseconds. All other clients keep getting plain JSON objects. Each format
+is encoded once per broadcast, however many clients receive it. Replies to a
+client's own requests (session, errors, acknowledgements) stay JSON.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Any, Optional
+from urllib.parse import parse_qs
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - compact protocol is optional
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+JSON = "json"
+MSGPACK = "msgpack"
+WIRE_VERSION = 1
+COMPACT_ROOM_SUFFIX = "~mp"
+
+# Field name -> wire code; served from /api/protocol so clients can expand them
+KEYS = {
+    # room state and lots
+    "code": "c",
+    "teams": "T",
+    "auction_state": "s",
+    "current_player_index": "i",
+    "current_player_id": "pi",
+    "current_player": "p",
+    "current_bid": "b",
+    "current_bidder_team_id": "bt",
+    "timer_end": "te",
+    "bid_seq": "q",
+    "max_affordable_bid": "mb",
+    "lots": "L",
+    "player": "pl",
+    "index": "ix",
+    "round": "rd",
+    # room stream
+    "epoch": "E",
+    "seq": "S",
+    "from_seq": "fs",
+    "changes": "C",
+    "state": "st",
+    "deltas": "D",
+    # teams
+    "name": "n",
+    "owner_id": "o",
+    "budget": "B",
+    "players": "P",
+    "roles": "R",
+    "spent": "sp",
+    "team": "t",
+    "total_teams": "tt",
+    # players
+    "role": "r",
+    "country": "co",
+    "rating": "ra",
+    "base_price": "bp",
+    "stats": "x",
+    # bids and sales
+    "bid_amount": "a",
+    "bidder_team": "bn",
+    "player_id": "pd",
+    "team_id": "ti",
+    "team_name": "tn",
+    "amount": "am",
+    "team_budget": "tb",
+    "total_lots": "tl",
+}
+TIMESTAMP_KEYS = frozenset({"timer_end"})
+
+
+def epoch_ms(value: str) -> int:
+    return int(datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def compact(value: Any) -> Any:
+    """Shorten known keys (and the head of dotted delta paths) and convert timestamps."""
+    if isinstance(value, dict):
+        out = {}
+        for key, item in value.items():
+            if key in TIMESTAMP_KEYS and isinstance(item, str):
+                item = epoch_ms(item)
+            else:
+                item = compact(item)
+            if "." in key:
+                head, _, rest = key.partition(".")
+                key = f"{KEYS.get(head, head)}.{rest}"
+            else:
+                key = KEYS.get(key, key)
+            out[key] = item
+        return out
+    if isinstance(value, list):
+        return [compact(item) for item in value]
+    return value
+
+
+def encode(data: Any) -> bytes:
+    return msgpack.packb(compact(data), use_bin_type=True)
+
+
+def compact_room(room: str) -> str:
+    return room + COMPACT_ROOM_SUFFIX
+
+
+class Wire:
+    """Sends room events in each client's negotiated format."""
+
+    def __init__(self, sio, enabled: bool = True, shared_rooms: bool = False):
+        self.sio = sio
+        self.enabled = enabled and msgpack is not None
+        if enabled and msgpack is None:
+            logger.warning("msgpack is not installed; all clients get JSON")
+        # With a pub/sub client manager, room members may sit on other workers
+        self.shared_rooms = shared_rooms
+        self.compact_sids: set = set()
+
+    def __len__(self):
+        return len(self.compact_sids)
+
+    def negotiate(self, sid: str, environ: dict, auth: Optional[dict]) -> str:
+        requested = auth.get("protocol") if isinstance(auth, dict) else None
+        if requested is None:
+            requested = parse_qs(environ.get("QUERY_STRING", "")).get("protocol", [JSON])[0]
+        if requested == MSGPACK and self.enabled:
+            self.compact_sids.add(sid)
+            return MSGPACK
+        return JSON
+
+    def protocol(self, sid: str) -> str:
+        return MSGPACK if sid in self.compact_sids else JSON
+
+    def forget(self, sid: str):
+        self.compact_sids.discard(sid)
+
+    async def enter_room(self, sid: str, room: str, protocol: str = JSON):
+        await self.sio.enter_room(sid, compact_room(room) if protocol == MSGPACK else room)
+
+    async def send(self, event: str, data: dict, sid: str, protocol: str = JSON):
+        await self.sio.emit(event, encode(data) if protocol == MSGPACK else data, to=sid)
+
+    async def emit(self, event: str, data: dict, room: str):
+        await self.sio.emit(event, data, room=room)
+        if self.enabled and (self.shared_rooms or self.sio.manager.rooms.get("/", {}).get(compact_room(room))):
+            await self.sio.emit(event, encode(data), room=compact_room(room))
@@ -214,7 +214,7 @@ def main():
     print("=" * 50)
     
     # Setup
-    tester = CricketAuctionTester()
+    tester = CricketAuctionTester(*sys.argv[1:2])  # optional base URL, e.g. http://localhost:8001
     
     # Run API tests
     print("\n📡 API ENDPOINT TESTS")
@@ -18,6 +18,7 @@ function App() {
   const [currentView, setCurrentView] = useState('home'); // home, create, join, auction
   const [roomCode, setRoomCode] = useState('');
   const [teamName, setTeamName] = useState('');
+  const [spectating, setSpectating] = useState(false);
   const [socket, setSocket] = useState(null);
   const [gameState, setGameState] = useState({
     teams: [],
@@ -26,6 +27,8 @@ function App() {
     currentBidder: '',
     timeLeft: 30,
     myTeam: null,
+    maxAffordableBid: {},
+    lots: {}, // every lot on sale, by player id, when the room runs parallel lots
     auctionStarted: false
   });
 
@@ -34,16 +37,96 @@ function App() {
     if (currentView === 'auction' && roomCode) {
       const newSocket = io(BACKEND_URL);
       setSocket(newSocket);
+      // Token of the team we play for; reconnects take the same team back with it
+      let resumeToken = null;
+      // Our position in the room's delta stream. Deltas are applied in seq order; a gap or
+      // a new epoch (the room restarted its stream) means we missed some and must resync
+      const stream = { epoch: null, seq: 0, resyncing: false };
+
+      const resync = () => {
+        if (!stream.resyncing) {
+          stream.resyncing = true;
+          newSocket.emit('resync', { room_code: roomCode, epoch: stream.epoch, last_seq: stream.seq });
+        }
+      };
 
       newSocket.on('connect', () => {
         console.log('Connected to server');
-        newSocket.emit('join_room', { room_code: roomCode, team_name: teamName });
+        // Reconnects send our stream position, so only the missed deltas come back;
+        // until the reply (deltas or a snapshot) is in, live deltas wait on it
+        const position = stream.epoch ? { epoch: stream.epoch, last_seq: stream.seq } : {};
+        stream.resyncing = true;
+        // Spectators only watch: they never take a team slot
+        if (spectating) {
+          newSocket.emit('watch_room', { room_code: roomCode, ...position });
+        } else if (resumeToken) {
+          newSocket.emit('resume_session', { room_code: roomCode, resume_token: resumeToken, ...position });
+        } else {
+          newSocket.emit('join_room', { room_code: roomCode, team_name: teamName });
+        }
+      });
+
+      newSocket.on('room_snapshot', (data) => {
+        const state = data.state;
+        stream.epoch = data.epoch;
+        stream.seq = data.seq;
+        stream.resyncing = false;
+        setGameState(prev => ({
+          ...prev,
+          teams: Object.values(state.teams || {}),
+          currentPlayer: state.current_player || prev.currentPlayer,
+          currentBid: state.current_bid || prev.currentBid,
+          maxAffordableBid: state.max_affordable_bid || prev.maxAffordableBid,
+          lots: state.lots || {},
+          auctionStarted: state.auction_state === 'active'
+        }));
+      });
+
+      newSocket.on('session', (data) => {
+        resumeToken = data.resume_token;
+        setGameState(prev => ({ ...prev, myTeam: data.team_id }));
+      });
+
+      const applyChanges = (changes) => {
+        if (changes.max_affordable_bid) {
+          setGameState(prev => ({ ...prev, maxAffordableBid: changes.max_affordable_bid }));
+        }
+        // Parallel lots: "lots" replaces the set on sale, "lots.<player id>" one lot's bid
+        setGameState(prev => {
+          let lots = changes.lots || prev.lots;
+          Object.keys(changes).filter(key => key.startsWith('lots.')).forEach(key => {
+            lots = { ...lots, [key.slice(5)]: changes[key] };
+          });
+          return lots === prev.lots ? prev : { ...prev, lots };
+        });
+      };
+
+      const applyDelta = (delta) => {
+        // Before the snapshot, or while a resync is answered, the reply covers these deltas
+        if (stream.epoch === null || stream.resyncing || delta.seq <= stream.seq) {
+          return;
+        }
+        // Coalesced deltas cover every seq from from_seq on
+        if (delta.epoch !== stream.epoch || (delta.from_seq || delta.seq) > stream.seq + 1) {
+          resync();
+          return;
+        }
+        stream.seq = delta.seq;
+        applyChanges(delta.changes || {});
+      };
+
+      newSocket.on('room_delta', applyDelta);
+
+      // The deltas we missed, in order, in reply to a resync or a reconnect
+      newSocket.on('room_deltas', (data) => {
+        stream.resyncing = false;
+        (data.deltas || []).forEach(applyDelta);
       });
 
       newSocket.on('team_joined', (data) => {
         setGameState(prev => ({
           ...prev,
-          teams: [...prev.teams, data.team]
+          teams: [...prev.teams.filter(team => team.id !== data.team.id), data.team]
         }));
       });
 
@@ -52,21 +135,46 @@ function App() {
           ...prev,
           currentPlayer: data.current_player,
           currentBid: data.current_bid,
+          maxAffordableBid: data.max_affordable_bid || {},
+          lots: data.lots || {},
           auctionStarted: true,
           timeLeft: 30
         }));
       });
 
-      newSocket.on('new_bid', (data) => {
+      newSocket.on('next_player', (data) => {
         setGameState(prev => ({
           ...prev,
-          currentBid: data.bid_amount,
-          currentBidder: data.bidder_team,
+          currentPlayer: data.current_player,
+          currentBid: data.current_bid,
+          currentBidder: '',
+          maxAffordableBid: data.max_affordable_bid || {},
           timeLeft: 30
         }));
       });
 
+      newSocket.on('new_bid', (data) => {
+        setGameState(prev => {
+          // Bids on other parallel lots arrive through room_delta
+          if (data.player_id && prev.currentPlayer && data.player_id !== prev.currentPlayer.id) {
+            return prev;
+          }
+          return {
+            ...prev,
+            currentBid: data.bid_amount,
+            currentBidder: data.bidder_team,
+            timeLeft: 30
+          };
+        });
+      });
+
       newSocket.on('error', (data) => {
+        if (resumeToken && data.message === 'Session expired') {
+          // The team was released while we were away: join again as a new one
+          resumeToken = null;
+          newSocket.emit('join_room', { room_code: roomCode, team_name: teamName });
+          return;
+        }
         alert(data.message);
       });
 
@@ -74,7 +182,7 @@ function App() {
         newSocket.disconnect();
       };
     }
-  }, [currentView, roomCode, teamName]);
+  }, [currentView, roomCode, teamName, spectating]);
 
   // Timer countdown
   useEffect(() => {
@@ -101,6 +209,14 @@ function App() {
 
   const joinRoom = () => {
     if (roomCode && teamName) {
+      setSpectating(false);
+      setCurrentView('auction');
+    }
+  };
+
+  const watchRoom = () => {
+    if (roomCode) {
+      setSpectating(true);
       setCurrentView('auction');
     }
   };
@@ -113,10 +229,25 @@ function App() {
     }
   };
 
+  // The server pushes each team's highest allowed bid for every lot on sale, already net of
+  // what the team owes for the other lots it is winning
+  const maxBid = gameState.myTeam in gameState.maxAffordableBid ? gameState.maxAffordableBid[gameState.myTeam] : Infinity;
+  const canBid = gameState.currentBid + 25 <= maxBid;
+
   const placeBid = () => {
-    if (socket) {
+    if (socket && canBid) {
       const bidAmount = gameState.currentBid + 25; // Increment by 25 lakhs
-      socket.emit('place_bid', { room_code: roomCode, bid_amount: bidAmount });
+      socket.emit('place_bid', { room_code: roomCode, bid_amount: bidAmount, player_id: gameState.currentPlayer.id });
+    }
+  };
+
+  const parallelLots = Object.entries(gameState.lots);
+  const lotMaxBid = (lot) => gameState.myTeam in lot.max_affordable_bid ? lot.max_affordable_bid[gameState.myTeam] : Infinity;
+  const teamNameOf = (teamId) => (gameState.teams.find(team => team.id === teamId) || {}).name;
+
+  const placeLotBid = (playerId, lot) => {
+    if (socket && lot.current_bid + 25 <= lotMaxBid(lot)) {
+      socket.emit('place_bid', { room_code: roomCode, bid_amount: lot.current_bid + 25, player_id: playerId });
     }
   };
 
@@ -205,6 +336,15 @@ function App() {
                 <Users className="w-6 h-6 mr-3" />
                 Join Auction
               </Button>
+              <Button 
+                onClick={watchRoom}
+                disabled={!roomCode}
+                variant="outline"
+                className="w-full h-12 text-lg font-semibold bg-white/10 border-white/30 text-white hover:bg-white/20 rounded-xl disabled:opacity-50"
+              >
+                <Star className="w-5 h-5 mr-3" />
+                Watch as Spectator
+              </Button>
             </CardContent>
           </Card>
         </div>
@@ -261,6 +401,11 @@ function App() {
             <Badge variant="secondary" className="bg-yellow-400/20 text-yellow-400 border-yellow-400/30">
               Room: {roomCode}
             </Badge>
+            {spectating && (
+              <Badge variant="secondary" className="bg-white/10 text-white border-white/30">
+                Spectating
+              </Badge>
+            )}
           </div>
           <div className="flex items-center space-x-4">
             <Badge variant="secondary" className="bg-blue-400/20 text-blue-200 border-blue-400/30">
@@ -306,7 +451,35 @@ function App() {
                   </div>
                 </CardHeader>
                 <CardContent>
-                  {gameState.currentPlayer && (
+                  {parallelLots.length > 0 && (
+                    <div className="grid md:grid-cols-2 gap-4">
+                      {parallelLots.map(([playerId, lot]) => (
+                        <div key={playerId} className="bg-white/10 rounded-xl p-4 text-center">
+                          {lot.player && (
+                            <>
+                              <h3 className="text-xl font-bold text-white">{lot.player.name}</h3>
+                              <p className="text-blue-200 text-sm mb-2">{lot.player.role} · {lot.player.country}</p>
+                            </>
+                          )}
+                          <p className="text-2xl font-bold text-white">₹{lot.current_bid} L</p>
+                          {lot.current_bidder_team_id && (
+                            <p className="text-yellow-400 text-sm">Leading: {teamNameOf(lot.current_bidder_team_id)}</p>
+                          )}
+                          {!spectating && (
+                            <Button
+                              onClick={() => placeLotBid(playerId, lot)}
+                              disabled={lot.current_bid + 25 > lotMaxBid(lot)}
+                              className="mt-3 bg-gradient-to-r from-yellow-500 to-orange-600 hover:from-yellow-600 hover:to-orange-700 text-white border-0 rounded-xl"
+                            >
+                              <Gavel className="w-4 h-4 mr-2" />
+                              Bid ₹{lot.current_bid + 25} L
+                            </Button>
+                          )}
+                        </div>
+                      ))}
+                    </div>
+                  )}
+                  {parallelLots.length === 0 && gameState.currentPlayer && (
                     <div className="space-y-6">
                       <div className="text-center">
                         <Avatar className="w-32 h-32 mx-auto mb-4 bg-gradient-to-br from-blue-400 to-purple-600">
@@ -337,15 +510,18 @@ function App() {
                         </div>
                       </div>
                       
+                      {!spectating && (
                       <div className="text-center">
                         <Button 
                           onClick={placeBid}
+                          disabled={!canBid}
                           className="h-16 px-12 text-xl font-semibold bg-gradient-to-r from-yellow-500 to-orange-600 hover:from-yellow-600 hover:to-orange-700 text-white border-0 rounded-xl transform hover:scale-105 transition-all duration-200"
                         >
                           <Gavel className="w-6 h-6 mr-3" />
                           Bid ₹{gameState.currentBid + 25} L
                         </Button>
                       </div>
+                      )}
                     </div>
                   )}
                 </CardContent>
@@ -0,0 +1,179 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import mongomock_motor
+import pytest
+
+from auction_engine import AuctionEngine, BidRejected
+from squad_rules import SquadRules
+
+PLAYERS = [
+    {"id": "p0", "name": "Opener", "role": "batsman", "base_price": 100.0},
+    {"id": "p1", "name": "Finisher", "role": "batsman", "base_price": 100.0},
+    {"id": "p2", "name": "Quick", "role": "bowler", "base_price": 100.0},
+]
+
+
+async def make_room(db, **fields) -> str:
+    await db.players.insert_many([dict(player) for player in PLAYERS])
+    await db.rooms.insert_one({
+        "code": "123456",
+        "auction_state": "active",
+        "teams": [{
+            "id": "team-a", "name": "A", "owner_id": "sid-a", "budget": 1000.0,
+            "players": ["p0"], "roles": {"batsman": 1}, "spent": 100.0,
+        }],
+        "current_player_index": 1,
+        "current_player_id": "p1",
+        "current_bid": 100.0,
+        "current_bidder": "",
+        "timer_end": datetime.utcnow(),
+        "next_index": 2,
+        **fields,
+    })
+    return "123456"
+
+
+def test_reloaded_lot_keeps_squad_limits():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        code = await make_room(db)
+        # The last slot of a two-player squad is reserved for the missing bowler
+        rules = SquadRules(lambda order_id: None, lambda player_id: None, max_size=2, minimums={"bowler": 1})
+        engine = AuctionEngine(db, rules=rules)
+        room = await engine.get_room(code)
+        assert room.current_player["role"] == "batsman"
+        assert room.max_bid(room.teams["team-a"]) == (0.0, "Remaining squad slots are reserved for required roles")
+        with pytest.raises(BidRejected):
+            await engine.place_bid(code, "sid-a", 500.0)
+
+    asyncio.run(scenario())
+
+
+def test_reloaded_lot_signs_the_player_role():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        code = await make_room(db)
+        engine = AuctionEngine(db)
+        await engine.place_bid(code, "sid-a", 150.0)
+        await engine.flush()
+        # A restarted process reloads the room from Mongo and closes the lot
+        engine = AuctionEngine(db)
+
+        async def load_player(room_code, index):
+            return PLAYERS[index] if index < len(PLAYERS) else None
+
+        result = await engine.close_lot(code, "p1", datetime.utcnow() + timedelta(days=1), load_player)
+        assert result["team"].roles == {"batsman": 2}
+        assert result["team"].budget == 850.0
+        assert [lot.player_id for lot in result["opened"]] == ["p2"]
+        await engine.flush()
+        stored = await db.rooms.find_one({"code": code})
+        assert stored["teams"][0]["players"] == ["p0", "p1"]
+        assert stored["current_player_id"] == "p2"
+
+    asyncio.run(scenario())
+
+
+def test_atomic_bid_for_a_closed_lot_is_rejected():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        code = await make_room(db)
+        engine = AuctionEngine(db, bid_mode="atomic")
+        with pytest.raises(BidRejected, match="not on sale"):
+            await engine.place_bid(code, "sid-a", 150.0, player_id="p0")
+        team, _, lot = await engine.place_bid(code, "sid-a", 150.0, player_id="p1")
+        assert (team.id, lot.player_id, lot.bid) == ("team-a", "p1", 150.0)
+        stored = await db.rooms.find_one({"code": code})
+        assert (stored["current_bid"], stored["current_bidder"]) == (150.0, "sid-a")
+
+    asyncio.run(scenario())
+
+
+def test_unsold_round_counts_every_lot():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        await db.rooms.insert_one({
+            "code": "654321", "auction_state": "waiting", "order_id": "main", "unsold_round": True,
+            "teams": [{"id": "team-a", "name": "A", "owner_id": "sid-a", "budget": 1000.0, "players": []}],
+        })
+        orders = {"main": ["p0", "p1", "p2"], "unsold": ["p1", "p2"]}
+        players = {player["id"]: player for player in PLAYERS}
+
+        async def load_player(code, index):
+            order = orders[engine.rooms[code].order_id]
+            return players[order[index]] if index < len(order) else None
+
+        async def unsold_order(room):
+            return "unsold"
+
+        engine = AuctionEngine(db, unsold_order=unsold_order)
+        room = await engine.start_auction("654321", load_player)
+        await engine.place_bid("654321", "sid-a", 120.0)
+        rounds = []
+        while room.auction_state == "active":
+            result = await engine.close_lot("654321", room.current_player_id, datetime.utcnow() + timedelta(days=1), load_player)
+            rounds.append((result["player_id"], room.round))
+        # The round reported is the room's after the close: p2 closing starts the unsold round
+        assert rounds == [("p0", 0), ("p1", 0), ("p2", 1), ("p1", 1), ("p2", 1)]
+        assert room.teams["team-a"].players == ["p0"]
+        assert room.lots_opened == 5
+        stored = await db.rooms.find_one({"code": "654321"})
+        assert (stored["auction_state"], stored["lots_opened"]) == ("completed", 5)
+
+    asyncio.run(scenario())
+
+
+def test_parallel_lots_survive_a_reload():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        await db.players.insert_many([dict(player) for player in PLAYERS])
+        await db.rooms.insert_one({
+            "code": "777777", "auction_state": "waiting", "parallel_lots": 2,
+            "teams": [{"id": "team-a", "name": "A", "owner_id": "sid-a", "budget": 1000.0, "players": []}],
+        })
+
+        async def load_player(code, index):
+            return PLAYERS[index] if index < len(PLAYERS) else None
+
+        engine = AuctionEngine(db)
+        await engine.start_auction("777777", load_player)
+        await engine.place_bid("777777", "sid-a", 180.0, player_id="p1")
+        await engine.flush()
+
+        engine = AuctionEngine(db)
+        room = await engine.get_room("777777")
+        assert list(room.lots) == ["p0", "p1"]
+        assert (room.lots["p1"].bid, room.lots["p1"].bidder, room.lots["p1"].player["name"]) == (180.0, "sid-a", "Finisher")
+        assert room.next_index == 2
+        result = await engine.close_lot("777777", "p1", datetime.utcnow() + timedelta(days=1), load_player)
+        assert result["team"].players == ["p1"] and result["team"].roles == {"batsman": 1}
+        assert [lot.player_id for lot in result["opened"]] == ["p2"] and list(room.lots) == ["p0", "p2"]
+
+    asyncio.run(scenario())
+
+
+def test_limits_pushed_to_clients_are_net_of_lots_being_won():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        await db.players.insert_many([dict(player) for player in PLAYERS])
+        await db.rooms.insert_one({
+            "code": "777777", "auction_state": "waiting", "parallel_lots": 2,
+            "teams": [{"id": "team-a", "name": "A", "owner_id": "sid-a", "budget": 1000.0, "players": []}],
+        })
+
+        async def load_player(code, index):
+            return PLAYERS[index] if index < len(PLAYERS) else None
+
+        rules = SquadRules(lambda order_id: None, lambda player_id: None, minimums={})
+        engine = AuctionEngine(db, rules=rules)
+        room = await engine.start_auction("777777", load_player)
+        await engine.place_bid("777777", "sid-a", 180.0, player_id="p1")
+        view = room.lot_view()
+        assert view["max_affordable_bid"] == {"team-a": 820.0}
+        assert view["lots"]["p0"]["max_affordable_bid"] == {"team-a": 820.0}
+        assert view["lots"]["p1"]["max_affordable_bid"] == {"team-a": 1000.0}
+        with pytest.raises(BidRejected, match="the lots you are winning"):
+            await engine.place_bid("777777", "sid-a", 900.0, player_id="p0")
+
+    asyncio.run(scenario())
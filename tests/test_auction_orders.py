@@ -0,0 +1,26 @@
+import asyncio
+
+import mongomock_motor
+
+from auction_orders import AuctionOrders, order_id_for
+
+
+def test_orders_cache_keeps_only_the_most_recently_used():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["crickbid"]
+        orders = AuctionOrders(db, max_cached=2)
+        first, _ = await orders.ensure(["p1", "p2"], key="etag-1")
+        second, _ = await orders.ensure(["p2", "p1"], key="etag-2")
+        await orders.get(first)
+        third, _ = await orders.ensure(["p3"], key="etag-3")
+        assert list(orders._orders) == [first, third]
+        assert "etag-1" not in orders._by_key
+        # Evicted orders are read back from Mongo
+        assert await orders.get(second) == ("p2", "p1")
+        assert await db.auction_orders.count_documents({}) == 3
+
+        orders.discard(third)
+        assert third not in orders._orders and "etag-3" not in orders._by_key
+        assert await orders.ensure(["p3"], key="etag-3") == (order_id_for(["p3"]), 1)
+
+    asyncio.run(scenario())
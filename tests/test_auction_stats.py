@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+import mongomock_motor
+
+from auction_stats import AuctionStats, TTLCache, add_increments, empty_totals, lot_increments, summarize
+
+OPENER = {"id": "p1", "name": "Opener", "role": "batsman", "country": "India", "rating": 4, "base_price": 100.0}
+QUICK = {"id": "p2", "name": "Quick", "role": "bowler", "country": "Australia", "rating": 4, "base_price": 200.0}
+
+
+def test_running_totals_summarize_to_averages_and_premiums():
+    totals = empty_totals()
+    for player, amount, sold in ((OPENER, 150.0, True), (QUICK, 200.0, True), (QUICK, 0.0, False)):
+        add_increments(totals, lot_increments(player, amount, sold))
+    summary = summarize(totals)
+    assert (summary["lots"], summary["sold"], summary["unsold"], summary["total_spend"]) == (3, 2, 1, 350.0)
+    assert summary["roles"]["batsman"] == {"count": 1, "spend": 150.0, "avg_price": 150.0}
+    assert summary["premium_by_country"]["India"]["premium"] == 0.5
+    assert summary["premium_by_rating"]["4"] == {"count": 2, "avg_price": 175.0, "avg_base_price": 150.0, "premium": 350.0 / 300.0 - 1}
+
+
+def test_recorded_lots_are_written_together_for_the_room_and_globally():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        stats = AuctionStats(db)
+        team = SimpleNamespace(id="team-a", name="A")
+        stats.record_lot("123456", OPENER, team, 150.0)
+        stats.record_lot("123456", QUICK, None, 0.0)
+        stats.record_completion()
+        assert len(stats) == 2
+        assert await db.auction_stats.count_documents({}) == 0
+
+        room = await stats.final_totals("123456")
+        assert len(stats) == 0
+        assert (room["lots"], room["sold"], room["unsold"], room["spend"]) == (2, 1, 1, 150.0)
+        assert [buy["player_id"] for buy in room["top_buys"]] == ["p1"]
+        assert (await stats.global_totals())["auctions"] == 1
+
+        await stats.drop_room("123456")
+        assert await db.auction_stats.count_documents({}) == 1
+
+    asyncio.run(scenario())
+
+
+def test_cache_shares_one_computation_between_concurrent_misses():
+    async def scenario():
+        cache = TTLCache()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"lots": len(calls)}, 60
+
+        first, second = await asyncio.gather(cache.get("room:1", compute), cache.get("room:1", compute))
+        assert first is second and calls == [1]
+        assert await cache.get("room:1", compute) == {"lots": 1}
+        cache.discard("room:1")
+        assert await cache.get("room:1", compute) == {"lots": 2}
+
+    asyncio.run(scenario())
@@ -0,0 +1,52 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from auction_timers import TimerScheduler
+
+
+def test_due_keys_fire_once_in_deadline_order():
+    async def scenario():
+        fired = []
+
+        async def callback(key, deadline):
+            fired.append((key, deadline))
+
+        timers = TimerScheduler(callback)
+        timers.start()
+        now = datetime.utcnow()
+        timers.schedule(("room", "p2"), now + timedelta(milliseconds=40))
+        timers.schedule(("room", "p1"), now + timedelta(milliseconds=20))
+        # Rescheduling supersedes the earlier deadline; a cancelled key never fires
+        timers.schedule(("room", "p1"), now + timedelta(milliseconds=60))
+        timers.schedule(("other", "p1"), now + timedelta(milliseconds=10))
+        timers.cancel(("other", "p1"))
+        assert len(timers) == 2
+        await asyncio.sleep(0.15)
+        await timers.stop()
+        assert fired == [(("room", "p2"), now + timedelta(milliseconds=40)), (("room", "p1"), now + timedelta(milliseconds=60))]
+        assert len(timers) == 0
+
+    asyncio.run(scenario())
+
+
+def test_an_earlier_deadline_wakes_the_runner_and_failures_are_contained():
+    async def scenario():
+        fired = []
+
+        async def callback(key, deadline):
+            fired.append(key)
+            if key == "bad":
+                raise RuntimeError("close failed")
+
+        timers = TimerScheduler(callback)
+        timers.start()
+        timers.schedule("late", datetime.utcnow() + timedelta(hours=1))
+        await asyncio.sleep(0.01)
+        timers.schedule("bad", datetime.utcnow())
+        timers.schedule("soon", datetime.utcnow() + timedelta(milliseconds=20))
+        await asyncio.sleep(0.1)
+        assert fired == ["bad", "soon"]
+        assert timers.keys() == ["late"]
+        await timers.stop()
+
+    asyncio.run(scenario())
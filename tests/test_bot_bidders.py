@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+from bot_bidders import BotBidders, bid_increment, is_bot, new_bot_sid
+
+
+def bot_team(number, budget=1000.0, roles=None):
+    return SimpleNamespace(id=f"bot-team-{number}", owner_id=f"bot:{number}", budget=budget, roles=dict(roles or {}))
+
+
+def bot_room(*teams, current_bid=100.0, limits=None):
+    limits = limits or {}
+    return SimpleNamespace(
+        code="123456", auction_state="active", current_bid=current_bid, current_bidder="",
+        current_player={"id": "p1", "role": "bowler", "rating": 4, "base_price": 100.0},
+        teams={team.id: team for team in teams},
+        max_bid=lambda team: (limits.get(team.id, team.budget), "Insufficient budget"),
+    )
+
+
+def test_bot_sids_and_increments():
+    assert is_bot(new_bot_sid()) and not is_bot("sid-a")
+    assert [bid_increment(bid) for bid in (100, 500, 1500)] == [10.0, 20.0, 50.0]
+
+
+def test_bots_bid_up_to_their_valuation_within_the_squad_rules():
+    bots = BotBidders(engine=None, place_bid=None, seed=1)
+    full = bot_team(2, roles={"batsman": 5, "bowler": 5, "all-rounder": 3, "wicket-keeper": 2})
+    room = bot_room(bot_team(1), full, bot_team(3), limits={"bot-team-3": 105.0})
+    bots.value_lot(room)
+    sids, limits = bots._limits["123456"]
+    # A full squad values nothing; the squad rules cap the third bot
+    assert limits[1] == 0.0 and limits[2] == 105.0 and limits[0] > 110.0
+    assert bots.decide(room) == ("bot:1", 110.0)
+    room.current_bidder = "bot:1"
+    assert bots.decide(room) is None  # nobody else will pay 110
+    bots.forget("123456")
+    assert len(bots) == 0 and len(bots.timers) == 0
+
+
+def test_a_turn_places_the_chosen_bid():
+    async def scenario():
+        placed = []
+
+        async def place_bid(room_code, sid, amount):
+            placed.append((room_code, sid, amount))
+
+        room = bot_room(bot_team(1))
+        engine = SimpleNamespace(rooms={room.code: room})
+        bots = BotBidders(engine, place_bid, think_time=(0.0, 0.01), seed=1)
+        bots.start()
+        bots.value_lot(room)
+        await asyncio.sleep(0.05)
+        await bots.stop()
+        assert placed == [("123456", "bot:1", 110.0)]
+
+        # A room gone from memory is forgotten on its next turn
+        engine.rooms.clear()
+        await bots._turn(room.code, None)
+        assert len(bots) == 0
+
+    asyncio.run(scenario())
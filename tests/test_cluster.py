@@ -0,0 +1,119 @@
+import asyncio
+import pickle
+import socket
+from types import SimpleNamespace
+
+import pytest
+
+from cluster import Cluster, ClusterRoutingMixin, DeliveryFailed, UnixSocketPubSubManager
+
+
+class LoopbackManager(ClusterRoutingMixin):
+    """Stands in for a pub/sub manager: records what the cluster publishes."""
+
+    def __init__(self, host_id, fail=None):
+        self.host_id = host_id
+        self.fail = fail
+        self.published = []
+
+    async def _publish(self, data):
+        if self.fail is not None:
+            raise self.fail
+        self.published.append(data)
+
+
+def cluster_of(host_id, *others, fail=None):
+    cluster = Cluster(SimpleNamespace(manager=LoopbackManager(host_id, fail)))
+    cluster.members.update({host: 0.0 for host in others})
+    cluster.settled.set()
+    return cluster
+
+
+def test_rooms_are_owned_by_one_worker_and_routed_there():
+    async def scenario():
+        first, second = cluster_of("w1", "w2"), cluster_of("w2", "w1")
+        codes = [f"{n:06d}" for n in range(50)]
+        assert all(first.owner(code) == second.owner(code) for code in codes)
+        assert all(first.owns(code) != second.owns(code) for code in codes)
+
+        @second.handler("echo")
+        async def echo(room_code, value):
+            return {"room": room_code, "value": value}
+
+        code = next(code for code in codes if second.owns(code))
+        call = asyncio.create_task(first.dispatch("echo", code, 7))
+        await asyncio.sleep(0)
+        [route] = first.manager.published
+        assert (route["target"], route["name"]) == ("w2", "echo")
+        second.handle_message(route)
+        await asyncio.sleep(0.01)
+        first.handle_message(second.manager.published[-1])
+        assert await call == {"room": code, "value": 7}
+
+    asyncio.run(scenario())
+
+
+def test_dispatch_fails_at_once_when_the_owner_cannot_be_reached():
+    async def scenario():
+        cluster = cluster_of("w1", "w2", fail=DeliveryFailed("No worker at w2.sock"))
+        cluster.call_timeout = 30
+        code = next(f"{n:06d}" for n in range(50) if not cluster.owns(f"{n:06d}"))
+        with pytest.raises(DeliveryFailed):
+            await asyncio.wait_for(cluster.dispatch("echo", code), 1)
+        assert not cluster._pending
+
+    asyncio.run(scenario())
+
+
+def test_an_undeliverable_result_comes_back_as_an_error():
+    async def scenario():
+        cluster = cluster_of("w2", "w1")
+
+        @cluster.handler("lock")
+        async def lock(room_code):
+            return asyncio.Lock()  # cannot be pickled
+
+        code = next(f"{n:06d}" for n in range(50) if cluster.owns(f"{n:06d}"))
+        sent = []
+
+        async def publish(data):
+            if "result" in data:
+                raise TypeError("cannot pickle '_asyncio.Lock' object")
+            sent.append(data)
+
+        cluster.manager._publish = publish
+        await cluster._serve({"host_id": "w1", "id": 3, "name": "lock", "room": code, "args": ()})
+        assert sent[0]["target"] == "w1" and sent[0]["error"].startswith("Reply not delivered")
+
+    asyncio.run(scenario())
+
+
+def test_unix_publish_retries_a_busy_peer_and_reports_a_missing_one(tmp_path):
+    async def scenario():
+        manager = UnixSocketPubSubManager(str(tmp_path))
+        peer = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        peer.bind(str(tmp_path / "w2.sock"))
+        peer.setblocking(False)
+        received = []
+
+        async def read_later():
+            # Fill the peer's queue first, then drain it while the sender backs off
+            await asyncio.sleep(0.02)
+            while len(received) < 30:
+                try:
+                    received.append(peer.recv(1024))
+                except BlockingIOError:
+                    await asyncio.sleep(0.001)
+
+        reader = asyncio.create_task(read_later())
+        for n in range(30):
+            await manager._publish({"method": "route", "target": "w2", "id": n})
+        await reader
+        assert [pickle.loads(message)["id"] for message in received] == list(range(30))
+
+        with pytest.raises(DeliveryFailed):
+            await manager._publish({"method": "route_reply", "target": "gone", "id": 0})
+        peer.close()
+        manager.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,42 @@
+import asyncio
+
+from emit_coalescer import EmitCoalescer, merge_deltas
+
+
+class SlowSio:
+    def __init__(self):
+        self.sent = []
+
+    async def emit(self, event, data, room=None):
+        await asyncio.sleep(0.01)
+        self.sent.append((event, data["seq"]))
+
+
+def delta(seq, **changes):
+    return {"seq": seq, "changes": changes}
+
+
+def test_merge_keeps_first_seq_and_newest_changes():
+    merged = merge_deltas(delta(3, current_bid=100, bid_seq=1), delta(4, current_bid=150, bid_seq=2))
+    assert merged == {"seq": 4, "from_seq": 3, "changes": {"current_bid": 150, "bid_seq": 2}}
+    assert merge_deltas(merged, delta(5, timer_end="t"))["from_seq"] == 3
+
+
+def test_flush_room_waits_for_a_flush_in_flight():
+    async def scenario():
+        sio = SlowSio()
+        coalescer = EmitCoalescer(sio, merge={"room_delta": merge_deltas})
+        await coalescer.emit("room_delta", delta(1), "room", window=10)
+        await coalescer.emit("room_delta", delta(2), "room", window=10)
+        assert coalescer.collapsed == 1
+
+        async def direct(seq):
+            # What server.broadcast does for a delta published after the coalesced ones
+            await coalescer.flush_room("room")
+            sio.sent.append(("room_delta", seq))
+
+        await asyncio.gather(coalescer.flush_room("room"), direct(3))
+        assert sio.sent == [("room_delta", 2), ("room_delta", 3)]
+        assert coalescer.pending() == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,78 @@
+import asyncio
+
+import mongomock_motor
+
+from auction_engine import TeamState
+from event_log import EventLog, replay
+
+
+def event(kind, **data):
+    return {"room": "123456", "at": "2026-01-01T00:00:00", "type": kind, "data": data}
+
+
+TEAMS = [{"id": "t1", "name": "A", "owner_id": "s1", "budget": 1000.0, "players": []},
+         {"id": "t2", "name": "B", "owner_id": "s2", "budget": 1000.0, "players": []}]
+
+
+def auction():
+    return [
+        event("room_created", order_id="main", player_count=3),
+        *(event("team_joined", team=dict(team)) for team in TEAMS),
+        event("team_resumed", team_id="t2", owner_id="s3"),
+        event("auction_started", order_id="rating"),
+        event("lot_opened", index=0, player_id="p1", base_price=100.0, timer_end="t0"),
+        event("lot_opened", index=1, player_id="p2", base_price=200.0, timer_end="t0"),
+        event("bid", team_id="t2", amount=250.0, timer_end="t1", player_id="p2"),
+        # Recorded before bids named their lot: it is for the oldest open one
+        event("bid", team_id="t1", amount=150.0, timer_end="t2"),
+        event("lot_closed", player_id="p1", team_id="t1", amount=150.0),
+    ]
+
+
+def test_replay_tracks_parallel_lots():
+    state = replay(auction())
+    assert state["order_id"] == "rating"
+    assert state["teams"]["t2"]["owner_id"] == "s3"
+    assert state["bids"] == 2
+    assert state["teams"]["t1"]["budget"] == 850.0 and state["teams"]["t1"]["players"] == ["p1"]
+    # p2 is the only lot left, so the current_* fields follow it
+    assert list(state["lots"]) == ["p2"]
+    assert (state["current_player_id"], state["current_bid"], state["current_bidder_team_id"]) == ("p2", 250.0, "t2")
+
+
+def test_replay_finishes_with_the_unsold_round():
+    events = auction() + [
+        event("lot_closed", player_id="p2", team_id="t2", amount=250.0),
+        event("round_started", round=1, order_id="unsold"),
+        event("lot_opened", index=0, player_id="p3", base_price=50.0, timer_end="t3"),
+        event("lot_closed", player_id="p3", team_id="", amount=50.0),
+        event("auction_completed", total_lots=4),
+    ]
+    state = replay(events)
+    assert (state["round"], state["order_id"], state["auction_state"]) == (1, "unsold", "completed")
+    assert state["sold_players"] == ["p1", "p2"]
+    assert state["lots"] == {} and state["current_player_id"] == ""
+
+
+def test_a_reused_code_starts_over():
+    state = replay(auction() + [event("room_created", order_id="next")])
+    assert (state["order_id"], state["teams"], state["events"]) == ("next", {}, 1)
+
+
+def test_replay_after_a_flush_that_follows_purchases():
+    async def scenario():
+        log = EventLog(mongomock_motor.AsyncMongoMockClient()["crickbid"])
+        team = TeamState("t1", "A", "s1", 1000.0, [])
+        log.append("123456", "room_created", order_id="main", player_count=2)
+        log.append("123456", "team_joined", team=team.to_doc())
+        for player_id, amount in (("p1", 150.0), ("p2", 200.0)):
+            # The team buys before the queued team_joined is written
+            team.sign({"id": player_id, "role": "bowler"}, amount)
+            log.append("123456", "lot_closed", player_id=player_id, team_id="t1", amount=amount)
+        await log.flush()
+        return replay([event async for event in log.events("123456")])
+
+    state = asyncio.run(scenario())
+    assert state["teams"]["t1"]["players"] == ["p1", "p2"]
+    assert state["teams"]["t1"]["roles"] == {}
+    assert state["teams"]["t1"]["budget"] == 650.0
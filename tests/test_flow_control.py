@@ -0,0 +1,61 @@
+import asyncio
+
+from engineio import packet as eio_packet
+
+from flow_control import DISCONNECT, BoundedSendQueue, RateLimiter
+
+
+def message(text):
+    return eio_packet.Packet(eio_packet.MESSAGE, data=text)
+
+
+def queued(queue):
+    return [pkt.data if pkt is not None else None for pkt in queue._queue]
+
+
+def test_drop_oldest_discards_whole_messages_and_keeps_pings():
+    async def scenario():
+        overflows = []
+        queue = BoundedSendQueue(3, on_overflow=overflows.append)
+        queue.put_nowait(eio_packet.Packet(eio_packet.PING))
+        queue.put_nowait(message('51-["new_bid",{"_placeholder":true,"num":0}]'))
+        queue.put_nowait(eio_packet.Packet(eio_packet.MESSAGE, data=b"\x81"))
+        queue.put_nowait(message('2["room_delta",{"seq":2}]'))
+        # The binary event and its attachment go together
+        assert [pkt.packet_type for pkt in queue._queue] == [eio_packet.PING, eio_packet.MESSAGE]
+        assert queued(queue)[1:] == ['2["room_delta",{"seq":2}]']
+        assert overflows == ["drop-oldest"]
+        for _ in range(queue.qsize()):
+            queue.get_nowait()
+            queue.task_done()
+        await asyncio.wait_for(queue.join(), 1)
+
+    asyncio.run(scenario())
+
+
+def test_disconnect_policy_clears_the_queue_and_closes():
+    async def scenario():
+        overflows = []
+        queue = BoundedSendQueue(2, DISCONNECT, overflows.append)
+        for seq in range(2):
+            queue.put_nowait(message(f'2["room_delta",{{"seq":{seq}}}]'))
+        queue.put_nowait(message('2["room_delta",{"seq":2}]'))
+        assert queued(queue) == [None]
+        assert overflows == ["disconnect"]
+        queue.put_nowait(message('2["room_delta",{"seq":3}]'))
+        assert queued(queue) == [None]
+        queue.get_nowait()
+        queue.task_done()
+        await asyncio.wait_for(queue.join(), 1)
+
+    asyncio.run(scenario())
+
+
+def test_rate_limiter_refills_over_time():
+    now = [0.0]
+    limiter = RateLimiter(rate=2, burst=3, clock=lambda: now[0])
+    assert [limiter.allow("sid") for _ in range(4)] == [True, True, True, False]
+    now[0] = 0.5
+    assert limiter.allow("sid") and not limiter.allow("sid")
+    assert limiter.allow("other-sid")
+    assert RateLimiter(rate=0, burst=1).allow("sid")
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import mongomock_motor
+
+from player_catalog import PlayerCatalog, bump_catalog_version
+
+PLAYERS = [
+    {"id": "p1", "name": "Opener", "role": "batsman", "country": "India", "rating": 3, "base_price": 200.0},
+    {"id": "p2", "name": "Quick", "role": "bowler", "country": "Australia", "rating": 2, "base_price": 150.0},
+]
+
+
+def test_catalog_indexes_players_and_tags_the_body():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        await db.players.insert_many([dict(player) for player in PLAYERS])
+        catalog = PlayerCatalog(db)
+        await catalog.load()
+        assert catalog.ids == ("p1", "p2")
+        assert catalog.get("p2")["name"] == "Quick"
+        assert [player["id"] for player in catalog.by_role["bowler"]] == ["p2"]
+        assert json.loads(catalog.json_body) == PLAYERS
+        assert catalog.etag.startswith('"0-')
+
+        # The same players load to the same ETag, so clients keep getting 304s
+        again = PlayerCatalog(db)
+        await again.load()
+        assert again.etag == catalog.etag
+
+    asyncio.run(scenario())
+
+
+def test_a_version_bump_reloads_with_a_new_etag():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        await db.players.insert_many([dict(player) for player in PLAYERS])
+        catalog = PlayerCatalog(db, check_interval=0)
+        await catalog.ensure_fresh()
+        etag = catalog.etag
+
+        await db.players.update_one({"id": "p1"}, {"$set": {"base_price": 250.0}})
+        await catalog.ensure_fresh()
+        # Unversioned writes go unnoticed until the version moves
+        assert catalog.etag == etag and catalog.get("p1")["base_price"] == 200.0
+
+        await bump_catalog_version(db)
+        await catalog.ensure_fresh()
+        assert catalog.etag != etag and catalog.etag.startswith('"1-')
+        assert catalog.get("p1")["base_price"] == 250.0
+
+    asyncio.run(scenario())
+
+
+def test_freshness_is_checked_at_most_once_per_interval():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        catalog = PlayerCatalog(db, check_interval=60)
+        await catalog.ensure_fresh()
+        assert catalog.etag.startswith('"0-')
+        await bump_catalog_version(db)
+        await catalog.ensure_fresh()
+        assert catalog.version == 0
+
+    asyncio.run(scenario())
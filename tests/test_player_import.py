@@ -0,0 +1,50 @@
+import asyncio
+
+import mongomock_motor
+
+from player_import import import_file, import_players, player_id, validate_chunk
+
+ROWS = [
+    {"name": "Virat Kohli", "role": "Batsman", "base_price": "1500", "country": "India", "rating": "5", "strike_rate": "138.5"},
+    {"name": "Jasprit Bumrah", "role": "bowler", "base_price": 1200, "country": "India", "rating": 5},
+    {"name": "Nobody", "role": "umpire", "base_price": 100, "country": "India", "rating": 3},
+]
+
+
+def test_validate_chunk_normalizes_rows_and_reports_bad_ones():
+    players, errors = validate_chunk(ROWS + [{"name": "No price"}])
+    assert [player["name"] for player in players] == ["Virat Kohli", "Jasprit Bumrah"]
+    assert players[0]["role"] == "batsman" and players[0]["stats"] == {"strike_rate": 138.5}
+    assert len(errors) == 2
+
+
+def test_reimporting_neither_duplicates_players_nor_changes_ids():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        first = await import_players(db, ROWS, chunk_size=1)
+        assert (first.rows, first.invalid, first.upserted) == (3, 1, 2)
+        ids = {doc["name"]: doc["id"] async for doc in db.players.find()}
+        assert ids["Virat Kohli"] == player_id(" virat kohli ", "INDIA")
+
+        changed = [dict(ROWS[0], base_price="1600"), ROWS[1]]
+        second = await import_players(db, changed)
+        assert (second.upserted, second.modified) == (0, 1)
+        assert await db.players.count_documents({}) == 2
+        assert {doc["name"]: doc["id"] async for doc in db.players.find()} == ids
+        # Each import that changed players moved the catalog version once
+        assert (await db.catalog_meta.find_one({"_id": "players"}))["version"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_the_same_file_is_imported_once(tmp_path):
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        path = tmp_path / "players.jsonl"
+        path.write_text('{"name": "Rashid Khan", "role": "bowler", "base_price": 1500, "country": "Afghanistan", "rating": 5}\n')
+        report = await import_file(db, path)
+        assert report.upserted == 1
+        assert await import_file(db, path) is None
+        assert (await import_file(db, path, force=True)).upserted == 0
+
+    asyncio.run(scenario())
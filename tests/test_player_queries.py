@@ -0,0 +1,48 @@
+import asyncio
+
+import mongomock_motor
+import pytest
+
+from player_queries import InvalidCursor, build_player_query, decode_cursor, find_players_page
+
+PLAYERS = [
+    {"id": f"p{i:02d}", "name": f"Player {i:02d}", "role": "bowler" if i % 2 else "batsman",
+     "country": "India", "rating": i % 3 + 1, "base_price": float(100 + i % 4 * 50)}
+    for i in range(23)
+]
+
+
+def all_pages(sort, query=None, limit=5):
+    async def scenario():
+        players = mongomock_motor.AsyncMongoMockClient()["test"].players
+        await players.insert_many([dict(player) for player in PLAYERS])
+        seen, cursor = [], None
+        while True:
+            page, cursor = await find_players_page(players, query or {}, sort, limit, cursor)
+            assert len(page) <= limit
+            seen.extend(page)
+            if cursor is None:
+                return seen
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("sort", [None, "rating", "-rating", "base_price", "-base_price", "name"])
+def test_cursors_visit_every_player_once_in_order(sort):
+    seen = all_pages(sort)
+    assert sorted(player["id"] for player in seen) == [player["id"] for player in PLAYERS]
+    if sort:
+        field, reverse = sort.lstrip("-"), sort.startswith("-")
+        keys = [(player[field], player["id"]) for player in seen]
+        assert keys == sorted(keys, reverse=reverse)
+
+
+def test_cursors_respect_filters():
+    seen = all_pages("-base_price", build_player_query(role="bowler", min_rating=2))
+    assert seen and all(player["role"] == "bowler" and player["rating"] >= 2 for player in seen)
+    assert len(seen) == sum(1 for player in PLAYERS if player["role"] == "bowler" and player["rating"] >= 2)
+
+
+def test_bad_cursor_is_rejected():
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor")
@@ -0,0 +1,69 @@
+import asyncio
+from datetime import timedelta
+
+import mongomock_motor
+import pytest
+
+import room_lifecycle
+from auction_engine import AuctionEngine
+from room_lifecycle import (
+    RoomCodesExhausted, archive_room, ensure_room_indexes, find_archived, insert_room, mark_started,
+)
+
+from .test_auction_engine import make_room
+
+
+def test_codes_retry_on_collision_and_starting_clears_the_expiry(monkeypatch):
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        await ensure_room_indexes(db)
+        codes = iter([123, 123, 456, 456, 456])
+        monkeypatch.setattr(room_lifecycle.secrets, "randbelow", lambda _: next(codes))
+        first = await insert_room(db, {"auction_state": "waiting"}, timedelta(hours=1))
+        second = await insert_room(db, {"auction_state": "waiting"}, timedelta(hours=1))
+        assert (first, second) == ("100123", "100456")
+        with pytest.raises(RoomCodesExhausted):
+            await insert_room(db, {"auction_state": "waiting"}, timedelta(hours=1), attempts=2)
+
+        await mark_started(db, first, ordering="set")
+        started = await db.rooms.find_one({"code": first})
+        assert "expires_at" not in started and started["ordering"] == "set"
+        assert "expires_at" in await db.rooms.find_one({"code": second})
+
+    asyncio.run(scenario())
+
+
+def test_completed_rooms_move_to_the_archive_and_free_their_code():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        code = await make_room(db, id="room-1")
+        assert await archive_room(db, code) is False
+
+        await db.rooms.update_one({"code": code}, {"$set": {"auction_state": "completed"}})
+        assert await archive_room(db, code, stats={"lots": 1}) is True
+        assert await db.rooms.count_documents({"code": code}) == 0
+        archived = await find_archived(db, code)
+        assert archived["stats"] == {"lots": 1}
+        assert archived["teams"][0]["players"] == ["p0"] and archived["teams"][0]["spent"] == 100.0
+
+    asyncio.run(scenario())
+
+
+def test_evicted_rooms_are_written_out_first():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        code = await make_room(db)
+        engine = AuctionEngine(db, flush_interval=60)
+        await engine.place_bid(code, "sid-a", 150.0)
+        await engine.evict(code)
+        assert code not in engine.rooms
+        assert (await db.rooms.find_one({"code": code}))["current_bid"] == 150.0
+
+        # A waiting room whose last client is released leaves memory too
+        await db.rooms.update_one({"code": code}, {"$set": {"auction_state": "waiting"}})
+        room = await engine.get_room(code)
+        room.owners = {"sid-a": "team-a"}
+        assert await engine.release_sid(code, "sid-a") is True
+        assert code not in engine.rooms
+
+    asyncio.run(scenario())
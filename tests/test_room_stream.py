@@ -0,0 +1,61 @@
+import asyncio
+
+from room_stream import RoomStreams
+
+
+def test_missing_since_returns_only_the_deltas_after_last_seq():
+    streams = RoomStreams(history=8)
+    epoch = streams.position("room")["epoch"]
+    for bid in (100, 125, 150):
+        streams.publish("room", {"current_bid": bid})
+    missing = streams.missing_since("room", epoch, 1)
+    assert [delta["seq"] for delta in missing] == [2, 3]
+    assert missing[-1]["changes"] == {"current_bid": 150}
+    # Deltas carry the epoch, so clients notice when the stream restarted under them
+    assert missing[-1]["epoch"] == epoch
+    assert streams.missing_since("room", epoch, 3) == []
+
+
+def test_missing_since_needs_a_snapshot_when_deltas_are_gone():
+    streams = RoomStreams(history=2)
+    epoch = streams.position("room")["epoch"]
+    for seq in range(5):
+        streams.publish("room", {"bid_seq": seq})
+    # Only seq 4 and 5 are still buffered
+    assert streams.missing_since("room", epoch, 2) is None
+    assert [delta["seq"] for delta in streams.missing_since("room", epoch, 3)] == [4, 5]
+    assert streams.missing_since("room", "other-epoch", 3) is None
+    assert streams.missing_since("room", epoch, 6) is None
+    assert streams.missing_since("unknown", epoch, 0) is None
+
+
+def test_discard_starts_a_new_epoch():
+    streams = RoomStreams()
+    before = streams.position("room")
+    streams.publish("room", {"auction_state": "active"})
+    streams.discard("room")
+    after = streams.position("room")
+    assert after["seq"] == 0 and after["epoch"] != before["epoch"]
+    assert streams.missing_since("room", before["epoch"], 1) is None
+
+
+def test_deltas_sent_under_the_lock_keep_seq_and_state_order():
+    async def scenario():
+        streams = RoomStreams()
+        room = {"current_bid": 0}
+        sent = []
+
+        async def bid(amount, delay):
+            room["current_bid"] = amount
+            # Whatever else the handler awaits before its delta goes out
+            await asyncio.sleep(delay)
+            async with streams.sending("room"):
+                delta = streams.publish("room", dict(room))
+                await asyncio.sleep(0.01)
+                sent.append(delta)
+
+        await asyncio.gather(bid(100, 0.02), bid(150, 0))
+        assert [delta["seq"] for delta in sent] == [1, 2]
+        assert sent[-1]["changes"] == {"current_bid": 150}
+
+    asyncio.run(scenario())
@@ -0,0 +1,49 @@
+import asyncio
+
+import mongomock_motor
+
+from auction_engine import AuctionEngine
+from sessions import SessionRegistry
+
+from .test_auction_engine import make_room
+
+
+def test_detached_sessions_wait_for_expiry():
+    sessions = SessionRegistry()
+    sessions.bind("sid-a", "123456", "team-a")
+    sessions.bind("sid-b", "123456", "team-b")
+    assert sessions.get("sid-a").team_id == "team-a" and len(sessions) == 2
+
+    assert sessions.detach("sid-a").team_id == "team-a"
+    assert sessions.get("sid-a") is None and sessions.sids_in("123456") == {"sid-b"}
+    sessions.detach("sid-b")
+    assert sessions.sids_in("123456") == set()
+    assert sessions.detach("sid-b") is None
+    assert sessions.expire("sid-a").room_code == "123456"
+    assert sessions.expire("sid-a") is None
+    assert set(sessions.detached) == {"sid-b"}
+
+
+def test_a_resume_token_takes_the_team_and_its_standing_bid_back_once():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        code = await make_room(db)
+        engine = AuctionEngine(db)
+        room = await engine.get_room(code)
+        token = engine.issue_resume_token(room, "team-a")
+        await engine.place_bid(code, "sid-a", 150.0)
+
+        team, new_token = await engine.rebind_team(code, token, "sid-a2")
+        assert team.id == "team-a" and team.owner_id == "sid-a2" and new_token != token
+        assert room.team_for("sid-a2") is team and room.team_for("sid-a") is None
+        assert room.lot_view()["current_bidder_team_id"] == "team-a"
+        # Tokens are single use; the new one works
+        assert await engine.rebind_team(code, token, "sid-a3") is None
+        assert (await engine.rebind_team(code, new_token, "sid-a3"))[0] is team
+
+        # Once the window passes the released client's tokens stop working
+        latest = engine.issue_resume_token(room, "team-a")
+        assert await engine.release_sid(code, "sid-a3") is False
+        assert await engine.rebind_team(code, latest, "sid-a4") is None
+
+    asyncio.run(scenario())
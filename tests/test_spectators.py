@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+
+from emit_coalescer import merge_deltas
+from spectators import SpectatorFanout
+
+
+class RecordingWire:
+    def __init__(self, watched=()):
+        self.shared_rooms = False
+        self.sent = []
+        self.sio = SimpleNamespace(manager=SimpleNamespace(rooms={"/": {f"{room}~watch": {"sid-w": True} for room in watched}}))
+
+    async def emit(self, event, data, room):
+        self.sent.append((event, data, room))
+
+
+def delta(seq, **changes):
+    return {"seq": seq, "changes": changes}
+
+
+def test_spectators_get_sampled_batches_after_the_bidders():
+    async def scenario():
+        wire = RecordingWire(watched=["123456"])
+        fanout = SpectatorFanout(wire, window=0.02, merge={"new_bid": None, "room_delta": merge_deltas})
+        await fanout.emit("new_bid", {"bid_amount": 110.0}, "123456")
+        await fanout.emit("room_delta", delta(1, current_bid=110.0), "123456")
+        await fanout.emit("new_bid", {"bid_amount": 120.0}, "123456")
+        await fanout.emit("room_delta", delta(2, current_bid=120.0), "123456")
+        await fanout.emit("player_sold", {"player_id": "p1"}, "123456")
+        await fanout.emit("new_bid", {"bid_amount": 100.0}, "123456")
+        # Bidders got everything at once; spectators nothing yet
+        assert [room for _, _, room in wire.sent] == ["123456"] * 6
+        assert fanout.pending() == 4
+
+        await asyncio.sleep(0.05)
+        watched = [(event, data) for event, data, room in wire.sent if room == "123456~watch"]
+        assert watched == [
+            ("new_bid", {"bid_amount": 120.0}),
+            ("room_delta", {"seq": 2, "from_seq": 1, "changes": {"current_bid": 120.0}}),
+            ("player_sold", {"player_id": "p1"}),
+            # Bids after a kept event never merge with the ones before it
+            ("new_bid", {"bid_amount": 100.0}),
+        ]
+        assert fanout.sampled == 2 and fanout.pending() == 0
+
+    asyncio.run(scenario())
+
+
+def test_rooms_without_spectators_queue_nothing():
+    async def scenario():
+        wire = RecordingWire()
+        fanout = SpectatorFanout(wire)
+        await fanout.emit("new_bid", {"bid_amount": 110.0}, "123456")
+        assert fanout.pending() == 0 and len(wire.sent) == 1
+
+    asyncio.run(scenario())
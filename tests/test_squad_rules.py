@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from squad_rules import PoolFloors, SquadRules
+
+ORDER = [
+    {"id": "b1", "role": "bowler", "base_price": 300.0},
+    {"id": "k1", "role": "wicket-keeper", "base_price": 200.0},
+    {"id": "b2", "role": "bowler", "base_price": 100.0},
+    None,  # no longer in the catalog
+    {"id": "b3", "role": "bowler", "base_price": 150.0},
+]
+
+
+def team(players=(), roles=None, budget=1000.0):
+    return SimpleNamespace(players=list(players), roles=dict(roles or {}), budget=budget)
+
+
+def test_pool_floors_sum_the_cheapest_players_still_to_come():
+    floors = PoolFloors(ORDER, {"bowler": 2, "wicket-keeper": 1})
+    assert floors.cost(0, "bowler", 2) == 250.0
+    assert floors.cost(0, "bowler", 1) == 100.0
+    # Past b2 only b3 is left: the reserve is what the pool can still supply
+    assert floors.cost(3, "bowler", 2) == 150.0
+    assert floors.cost(2, "wicket-keeper", 1) == 0.0
+    assert floors.cost(len(ORDER), "bowler", 2) == 0.0
+    assert floors.cost(0, "batsman", 3) == 0.0
+    assert floors.cost(0, "bowler", 0) == 0.0
+
+
+@pytest.fixture
+def rules():
+    return SquadRules(lambda order_id: None, lambda player_id: None, max_size=4, minimums={"bowler": 2})
+
+
+def test_limit_keeps_money_for_required_roles(rules):
+    floors = PoolFloors(ORDER, {"bowler": 2})
+    batsman = {"id": "x", "role": "batsman"}
+    assert rules.limit(team(), batsman, floors, 1) == (750.0, "Must keep 250 for the required players still to buy")
+    # Buying a bowler counts towards the minimum itself
+    bowler = {"id": "b1", "role": "bowler"}
+    assert rules.limit(team(), bowler, floors, 1) == (900.0, "Must keep 100 for the required players still to buy")
+    assert rules.limit(team(), batsman, None, 1) == (1000.0, "Insufficient budget")
+
+
+def test_limit_reserves_slots_and_stops_full_squads(rules):
+    batsman = {"id": "x", "role": "batsman"}
+    two_batsmen = team(["a", "b"], {"batsman": 2})
+    assert rules.limit(two_batsmen, batsman, None, 0) == (0.0, "Remaining squad slots are reserved for required roles")
+    assert rules.limit(two_batsmen, {"id": "b1", "role": "bowler"}, None, 0)[0] == 1000.0
+    assert rules.limit(team(["a", "b", "c", "d"]), batsman, None, 0) == (0.0, "Squad is full")
+
+
+def test_floors_cache_is_bounded_and_discarded_per_order():
+    async def scenario():
+        loads = []
+
+        async def load_order(order_id):
+            loads.append(order_id)
+            return ORDER
+
+        rules = SquadRules(load_order, lambda player_id: None, minimums={"bowler": 2}, max_cached=2)
+        for order_id in ("a", "b", "a", "c", "a"):
+            await rules.floors(order_id)
+        assert loads == ["a", "b", "c"]
+        assert list(rules._floors) == ["c", "a"]
+        rules.discard("a")
+        await rules.floors("a")
+        assert loads == ["a", "b", "c", "a"]
+
+    asyncio.run(scenario())
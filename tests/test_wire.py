@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+
+import msgpack
+
+from wire import JSON, MSGPACK, Wire, compact, encode
+
+
+def test_compact_shortens_keys_delta_paths_and_timestamps():
+    delta = {
+        "seq": 4,
+        "changes": {
+            "current_bid": 150.0,
+            "timer_end": "2026-01-01T00:00:01",
+            "teams.team-a": {"budget": 850.0, "players": ["p1"]},
+            "custom": {"kept": True},
+        },
+    }
+    assert compact(delta) == {
+        "S": 4,
+        "C": {"b": 150.0, "te": 1767225601000, "T.team-a": {"B": 850.0, "P": ["p1"]}, "custom": {"kept": True}},
+    }
+    assert msgpack.unpackb(encode(delta)) == compact(delta)
+
+
+class RecordingSio:
+    def __init__(self, rooms=None):
+        self.sent = []
+        self.manager = SimpleNamespace(rooms={"/": rooms or {}})
+
+    async def emit(self, event, data, room=None, to=None):
+        self.sent.append((event, data, room or to))
+
+    async def enter_room(self, sid, room):
+        self.sent.append(("enter", sid, room))
+
+
+def test_clients_get_the_protocol_they_negotiated():
+    async def scenario():
+        sio = RecordingSio(rooms={"123456~mp": {"sid-m": True}})
+        wire = Wire(sio)
+        assert wire.negotiate("sid-m", {}, {"protocol": "msgpack"}) == MSGPACK
+        assert wire.negotiate("sid-q", {"QUERY_STRING": "protocol=msgpack"}, None) == MSGPACK
+        assert wire.negotiate("sid-j", {}, None) == JSON
+        wire.forget("sid-q")
+        assert wire.compact_sids == {"sid-m"}
+
+        await wire.enter_room("sid-m", "123456", MSGPACK)
+        await wire.emit("new_bid", {"bid_amount": 150.0}, room="123456")
+        await wire.send("room_snapshot", {"seq": 0}, "sid-m", MSGPACK)
+        assert sio.sent == [
+            ("enter", "sid-m", "123456~mp"),
+            ("new_bid", {"bid_amount": 150.0}, "123456"),
+            ("new_bid", msgpack.packb({"a": 150.0}), "123456~mp"),
+            ("room_snapshot", msgpack.packb({"S": 0}), "sid-m"),
+        ]
+
+        # With no compact client in the room nothing is encoded for it
+        sio.sent.clear()
+        await wire.emit("new_bid", {"bid_amount": 175.0}, room="654321")
+        assert [room for _, _, room in sio.sent] == ["654321"]
+
+    asyncio.run(scenario())